@@ -0,0 +1,174 @@
+"""
+公开API路由
+- 提示词原文：复制按钮按需获取，列表页只需输出预览摘要
+- 只读JSON接口：投影行直接转为字典由orjson序列化，序列化结果按ETag缓存
+- 点赞：按IP哈希去重
+"""
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.assets import IMMUTABLE_CACHE_CONTROL
+from app.cache import (
+    LocalCache, register_cache, get_cache_stamp,
+    ALL_SCOPES, SCOPE_CATEGORIES, SCOPE_TAGS, SCOPE_PROMPTS
+)
+from app.auth import get_client_ip, like_key, rate_limit
+from app.crud import get_prompt_rows, get_category_rows, get_tag_rows, like_prompt
+from app.database import get_db
+from app.http_cache import make_etag, build_validators, is_not_modified, not_modified_response
+from app.models import Prompt
+from app.schemas import MessageResponse
+from app.serialization import ORJSONResponse, dump_json, page_payload, prompt_row_dict
+
+router = APIRouter(prefix="/api", tags=["公开API"])
+
+# 不带版本号的原文URL：短期缓存，过期后按ETag校验
+RAW_CACHE_CONTROL = "public, max-age=300"
+
+# 原文缓存：{(提示词ID, 更新时间): (UTF-8原文, ETag)}
+# 键中带更新时间，内容修改后自然失效；只缓存最常被复制的原文
+raw_cache = LocalCache("prompt_raw", scopes=(), maxsize=512)
+
+# 序列化结果缓存：{ETag: JSON字节}
+# ETag已包含数据版本号，作用域失效只用于及时释放旧版本占用的内存
+json_cache = register_cache("public_api", scopes=ALL_SCOPES, maxsize=256)
+
+
+def raw_version(updated_at: datetime) -> str:
+    """原文版本号（更新时间的微秒时间戳）"""
+    return format(int(updated_at.timestamp() * 1_000_000), "x")
+
+
+def raw_prompt_url(prompt) -> str:
+    """带版本号的原文URL（版本号与当前内容一致时可永久缓存）"""
+    return f"/api/prompts/{prompt.id}/raw?v={raw_version(prompt.updated_at)}"
+
+
+@router.get("/prompts/{prompt_id}/raw")
+async def get_prompt_raw(
+    prompt_id: int,
+    request: Request,
+    v: Optional[str] = Query(None, description="内容版本号"),
+    db: Session = Depends(get_db)
+):
+    """获取提示词原文（text/plain，ETag为内容哈希）"""
+    updated_at = db.execute(
+        select(Prompt.updated_at).where(Prompt.id == prompt_id, Prompt.is_active.is_(True))
+    ).scalar()
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="提示词不存在")
+
+    key = (prompt_id, updated_at)
+    cached = raw_cache.get(key)
+    if cached is None:
+        content = db.execute(
+            select(Prompt.content_markdown).where(Prompt.id == prompt_id)
+        ).scalar_one()
+        body = content.encode("utf-8")
+        cached = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        raw_cache.set(key, cached)
+    body, etag = cached
+
+    # 版本号与当前内容一致时URL对应的内容不会再变化
+    cache_control = IMMUTABLE_CACHE_CONTROL if v == raw_version(updated_at) else RAW_CACHE_CONTROL
+    headers = build_validators(etag, updated_at, cache_control=cache_control)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    return Response(body, media_type="text/plain; charset=utf-8", headers=headers)
+
+
+@router.post("/prompts/{prompt_id}/like", response_model=MessageResponse)
+@rate_limit(max_requests=10, window_minutes=1)
+async def like_prompt_api(request: Request, prompt_id: int, db: Session = Depends(get_db)):
+    """点赞提示词（同一IP对同一提示词只计一次；按IP限频，超过时返回429）"""
+    result = like_prompt(db, prompt_id, like_key(get_client_ip(request)))
+    if result is None:
+        raise HTTPException(status_code=404, detail="提示词不存在")
+    liked, like_count = result
+    return MessageResponse(
+        message="点赞成功" if liked else "已经点过赞了",
+        success=True,
+        data={"liked": liked, "like_count": like_count}
+    )
+
+
+def api_validators(request: Request, scopes: Iterable[str]) -> dict:
+    """根据相关作用域的数据版本戳计算ETag和Last-Modified（不查询数据库）"""
+    versions, last_modified = get_cache_stamp(scopes)
+    etag = make_etag(
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        *versions
+    )
+    return build_validators(etag, last_modified)
+
+
+def cached_json(request: Request, scopes: Iterable[str], build) -> Response:
+    """
+    返回按ETag缓存的JSON响应
+    - 条件请求命中时直接返回304
+    - 同一数据版本只查询和序列化一次
+    """
+    validators = api_validators(request, scopes)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+
+    body = json_cache.get(validators["ETag"])
+    if body is None:
+        body = dump_json(build())
+        json_cache.set(validators["ETag"], body)
+    return ORJSONResponse(body, headers=validators)
+
+
+@router.get("/prompts", response_class=ORJSONResponse)
+async def list_prompts_api(
+    request: Request,
+    page: int = Query(1, ge=1, description="页码"),
+    per_page: int = Query(20, ge=1, le=100, description="每页数量"),
+    sort: str = Query("created_at", description="排序方式"),
+    category_id: Optional[int] = Query(None, description="分类ID筛选"),
+    tag_id: Optional[int] = Query(None, description="标签ID筛选"),
+    is_featured: Optional[bool] = Query(None, description="是否精选"),
+    db: Session = Depends(get_db)
+):
+    """获取激活的提示词列表（字段与 PromptList 一致，列表中不含完整内容）"""
+    def build():
+        rows, total = get_prompt_rows(
+            db,
+            skip=(page - 1) * per_page,
+            limit=per_page,
+            order_by=sort,
+            category_id=category_id,
+            tag_id=tag_id,
+            is_featured=is_featured,
+            is_active=True
+        )
+        return page_payload([prompt_row_dict(row) for row in rows], total, page, per_page)
+
+    return cached_json(request, ALL_SCOPES, build)
+
+
+@router.get("/categories", response_class=ORJSONResponse)
+async def list_categories_api(request: Request, db: Session = Depends(get_db)):
+    """获取激活的分类列表（带激活提示词数量）"""
+    def build():
+        rows = get_category_rows(db)
+        return {"items": [row._asdict() for row in rows], "total": len(rows)}
+
+    return cached_json(request, (SCOPE_CATEGORIES, SCOPE_PROMPTS), build)
+
+
+@router.get("/tags", response_class=ORJSONResponse)
+async def list_tags_api(request: Request, db: Session = Depends(get_db)):
+    """获取激活的标签列表（带使用次数）"""
+    def build():
+        rows = get_tag_rows(db)
+        return {"items": [row._asdict() for row in rows], "total": len(rows)}
+
+    return cached_json(request, (SCOPE_TAGS, SCOPE_PROMPTS), build)
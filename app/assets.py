@@ -0,0 +1,179 @@
+"""
+静态资源指纹模块
+- 启动时为 static/ 下的每个文件计算内容哈希，生成资源清单
+- 模板中的 url_for('static', path=...) 输出带哈希的URL
+- 带哈希的URL返回 immutable 长期缓存头
+- 存在预压缩的同名文件（.br / .zst / .gz）时直接发送，由服务器零拷贝传输
+"""
+import hashlib
+import mimetypes
+import os
+import stat
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+from jinja2 import pass_context
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from app.compression import parse_accept_encoding, accepts, compress, AVAILABLE_ENCODINGS
+
+STATIC_DIR = Path("static")
+
+# 带哈希URL的缓存策略：内容变化时URL随之变化，可以永久缓存
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 预压缩文件后缀（按优先级排列）
+PRECOMPRESSED_SUFFIXES = ((".br", "br"), (".zst", "zstd"), (".gz", "gzip"))
+_ENCODING_SUFFIXES = {encoding: suffix for suffix, encoding in PRECOMPRESSED_SUFFIXES}
+
+
+class AssetManifest:
+    """静态资源清单：{原始路径: 带哈希路径}"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.files: Dict[str, str] = {}
+        self.reverse: Dict[str, str] = {}
+        self.fingerprint = ""
+
+    def build(self) -> "AssetManifest":
+        """扫描目录并计算每个文件的内容哈希"""
+        files = {}
+        digest = hashlib.blake2b(digest_size=8)
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            if path.suffix in _ENCODING_SUFFIXES.values():
+                continue
+            content_hash = hashlib.sha256(path.read_bytes()).hexdigest()[:10]
+            logical = path.relative_to(self.directory).as_posix()
+            files[logical] = path.with_name(
+                f"{path.stem}.{content_hash}{path.suffix}"
+            ).relative_to(self.directory).as_posix()
+            digest.update(f"{logical}={content_hash}\n".encode("utf-8"))
+
+        self.files = files
+        self.reverse = {hashed: logical for logical, hashed in files.items()}
+        self.fingerprint = digest.hexdigest()
+        return self
+
+    def url_path(self, path: str) -> str:
+        """原始路径 -> 带哈希路径（不在清单中的路径原样返回）"""
+        prefix = "/" if path.startswith("/") else ""
+        hashed = self.files.get(path.lstrip("/"))
+        return prefix + hashed if hashed else path
+
+    def resolve(self, path: str) -> Optional[str]:
+        """带哈希路径 -> 原始路径"""
+        return self.reverse.get(path)
+
+
+manifest = AssetManifest(STATIC_DIR)
+
+
+def install_asset_helpers(templates: Jinja2Templates) -> None:
+    """让模板中的 url_for('static', path=...) 输出带哈希的URL"""
+    request_url_for = templates.env.globals["url_for"]
+
+    @pass_context
+    def url_for(context: dict, name: str, /, **path_params) -> str:
+        if name == "static" and "path" in path_params:
+            path_params["path"] = manifest.url_path(path_params["path"])
+        return request_url_for(context, name, **path_params)
+
+    templates.env.globals["url_for"] = url_for
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """
+    支持带哈希URL的静态文件服务
+    - 带哈希的路径映射回原始文件，并加上 immutable 缓存头
+    - 原始路径保持默认的 ETag / Last-Modified 校验
+    - 客户端接受时优先发送不旧于原文件的预压缩文件
+    """
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        logical = self.manifest.resolve(path)
+        response = await self._precompressed_response(logical or path, scope)
+        if response is None:
+            response = await super().get_response(logical or path, scope)
+        if logical is not None and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    async def _precompressed_response(self, path: str, scope: Scope) -> Optional[Response]:
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        request_headers = Headers(scope=scope)
+        if "range" in request_headers:
+            return None
+        offered = parse_accept_encoding(request_headers.get("accept-encoding", ""))
+        if not offered:
+            return None
+
+        found = await anyio.to_thread.run_sync(self._find_precompressed, path, offered)
+        if found is None:
+            return None
+        full_path, stat_result, encoding = found
+
+        response = FileResponse(
+            full_path,
+            stat_result=stat_result,
+            media_type=mimetypes.guess_type(path)[0] or "text/plain",
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _find_precompressed(
+        self, path: str, offered: Dict[str, float]
+    ) -> Optional[Tuple[str, os.stat_result, str]]:
+        original_path, original_stat = self.lookup_path(path)
+        if original_stat is None or not stat.S_ISREG(original_stat.st_mode):
+            return None
+        for suffix, encoding in PRECOMPRESSED_SUFFIXES:
+            if not accepts(offered, encoding):
+                continue
+            full_path, stat_result = self.lookup_path(path + suffix)
+            if (
+                stat_result is not None
+                and stat.S_ISREG(stat_result.st_mode)
+                and stat_result.st_mtime >= original_stat.st_mtime
+            ):
+                return full_path, stat_result, encoding
+        return None
+
+
+def precompress_static(directory: Path = STATIC_DIR) -> int:
+    """为可压缩的静态文件生成预压缩的同名文件，返回生成数量"""
+    count = 0
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file() or path.suffix in _ENCODING_SUFFIXES.values():
+            continue
+        media_type = mimetypes.guess_type(path.name)[0] or ""
+        if not media_type.startswith(("text/", "application/javascript", "application/json", "image/svg+xml")):
+            continue
+        body = path.read_bytes()
+        for encoding in AVAILABLE_ENCODINGS:
+            target = path.with_name(path.name + _ENCODING_SUFFIXES[encoding])
+            target.write_bytes(compress(body, encoding))
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    # 用法: python -m app.assets [static目录]
+    target_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else STATIC_DIR
+    print(f"✅ 已生成 {precompress_static(target_dir)} 个预压缩文件")
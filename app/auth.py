@@ -28,6 +28,10 @@ def hash_ip(ip: str) -> str:
     """对IP地址进行哈希处理以保护隐私"""
     return hashlib.sha256(ip.encode()).hexdigest()[:16]
 
+def like_key(ip: str) -> int:
+    """IP地址哈希的64位有符号整数（点赞去重键，与 hash_ip 取同样的前8字节）"""
+    return int.from_bytes(hashlib.sha256(ip.encode()).digest()[:8], "big", signed=True)
+
 def verify_admin_credentials(credentials: HTTPBasicCredentials = Depends(security)) -> bool:
     """验证管理员凭证"""
     # 使用constant_time_compare防止时序攻击
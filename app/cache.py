@@ -0,0 +1,246 @@
+"""
+进程内缓存与跨进程失效模块
+- 进程内LRU缓存注册表（按作用域失效）
+- cache_versions 版本表：在写事务内递增
+- PRAGMA data_version 轮询：发现其他进程的提交后按作用域定向失效
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import CacheVersion
+
+# 缓存作用域：每个作用域对应一类数据的写入
+SCOPE_PROMPTS = "prompts"
+SCOPE_CATEGORIES = "categories"
+SCOPE_TAGS = "tags"
+ALL_SCOPES = (SCOPE_PROMPTS, SCOPE_CATEGORIES, SCOPE_TAGS)
+
+# 版本轮询间隔（秒），即其他worker写入后本进程缓存失效的最大延迟
+CACHE_POLL_INTERVAL = float(os.getenv("CACHE_POLL_INTERVAL", "1.0"))
+
+_SESSION_SCOPES_KEY = "cache_scopes"
+
+
+class LocalCache:
+    """进程内LRU缓存，依赖的作用域有写入时整体失效"""
+
+    def __init__(self, name: str, scopes: Iterable[str], maxsize: int = 1024):
+        self.name = name
+        self.scopes = frozenset(scopes)
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存（读取前按间隔检查跨进程版本，不依赖作用域的缓存跳过检查）"""
+        if self.scopes:
+            sync_cache_versions()
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+                return self._data[key]
+            except KeyError:
+                return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """移除单个条目"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# 缓存注册表：{name: LocalCache}
+_registry: Dict[str, LocalCache] = {}
+
+
+def register_cache(name: str, scopes: Iterable[str], maxsize: int = 1024) -> LocalCache:
+    """注册一个进程内缓存，同名缓存只创建一次"""
+    cache = _registry.get(name)
+    if cache is None:
+        cache = LocalCache(name, scopes, maxsize)
+        _registry[name] = cache
+    return cache
+
+
+def invalidate(scopes: Iterable[str]) -> None:
+    """按作用域失效本进程内的缓存"""
+    scopes = set(scopes)
+    if not scopes:
+        return
+    for cache in list(_registry.values()):
+        if cache.scopes & scopes:
+            cache.clear()
+
+
+def touch(db: Session, *scopes: str) -> None:
+    """
+    在当前写事务内递增作用域版本号
+    - 版本号随事务一起提交/回滚
+    - 提交后立即失效本进程缓存，其他进程通过版本轮询失效
+    """
+    if not scopes:
+        return
+    now = datetime.utcnow()
+    stmt = sqlite_insert(CacheVersion).values(
+        [{"scope": scope, "version": 1, "updated_at": now} for scope in scopes]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CacheVersion.scope],
+        set_={
+            "version": CacheVersion.version + 1,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+    db.info.setdefault(_SESSION_SCOPES_KEY, set()).update(scopes)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    """事务提交后失效本进程缓存，并让下一次读取重新同步版本号"""
+    scopes = session.info.pop(_SESSION_SCOPES_KEY, None)
+    if scopes:
+        invalidate(scopes)
+        _watcher.mark_stale()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    """事务回滚后丢弃待失效的作用域"""
+    session.info.pop(_SESSION_SCOPES_KEY, None)
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """解析SQLAlchemy写入的时间字符串"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+class CacheVersionWatcher:
+    """
+    跨进程版本监视器
+    - 使用独立的SQLite连接轮询 PRAGMA data_version（无I/O，仅在其他连接提交后变化）
+    - data_version 变化时才读取 cache_versions，对版本号变化的作用域做定向失效
+    """
+
+    def __init__(self, database_path: str, poll_interval: float = CACHE_POLL_INTERVAL):
+        self.database_path = database_path
+        self.poll_interval = poll_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._versions: Dict[str, int] = {}
+        self._updated_at: Dict[str, Optional[datetime]] = {}
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.database_path, check_same_thread=False, isolation_level=None
+            )
+        return self._conn
+
+    def mark_stale(self) -> None:
+        """强制下一次同步重新读取版本号"""
+        self._last_poll = 0.0
+        self._data_version = None
+
+    def poll(self, force: bool = False) -> List[str]:
+        """检查版本变化，返回发生变化的作用域"""
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return []
+        with self._lock:
+            self._last_poll = now
+            try:
+                conn = self._connection()
+                data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if data_version == self._data_version:
+                    return []
+                rows = conn.execute(
+                    "SELECT scope, version, updated_at FROM cache_versions"
+                ).fetchall()
+            except sqlite3.Error:
+                # 版本表尚未创建或数据库暂不可用，下次再试
+                return []
+            self._data_version = data_version
+            changed = [
+                scope for scope, version, _ in rows
+                if self._versions.get(scope) != version
+            ]
+            self._versions = {scope: version for scope, version, _ in rows}
+            self._updated_at = {
+                scope: _parse_timestamp(updated_at) for scope, _, updated_at in rows
+            }
+        return changed
+
+    def versions(self) -> Dict[str, int]:
+        """当前已知的作用域版本号"""
+        return dict(self._versions)
+
+    def stamp(self, scopes: Iterable[str]) -> Tuple[Tuple[int, ...], Optional[datetime]]:
+        """作用域版本号元组及其中最近的写入时间"""
+        scopes = sorted(scopes)
+        versions = tuple(self._versions.get(scope, 0) for scope in scopes)
+        timestamps = [self._updated_at.get(scope) for scope in scopes]
+        timestamps = [ts for ts in timestamps if ts is not None]
+        return versions, max(timestamps) if timestamps else None
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_watcher = CacheVersionWatcher(engine.url.database)
+
+
+def sync_cache_versions(force: bool = False) -> None:
+    """同步跨进程版本号，失效其他进程写入过的作用域"""
+    changed = _watcher.poll(force=force)
+    if changed:
+        invalidate(changed)
+
+
+def get_cache_versions() -> Dict[str, int]:
+    """获取本进程已知的作用域版本号"""
+    sync_cache_versions()
+    return _watcher.versions()
+
+
+def get_cache_stamp(scopes: Iterable[str]) -> Tuple[Tuple[int, ...], Optional[datetime]]:
+    """
+    获取作用域的数据版本戳（无数据库查询，最多每个轮询间隔同步一次）
+    返回 (版本号元组, 最近写入时间UTC)
+    """
+    sync_cache_versions()
+    return _watcher.stamp(scopes)
@@ -10,8 +10,10 @@ from app.database import get_db
 from app.auth import verify_admin_credentials
 from app.crud import (
     create_category, get_category_by_id, get_category_by_name, 
-    get_categories, update_category, delete_category
+    get_categories, get_category_dicts, update_category, delete_category
 )
+from app.projections import CATEGORY_FIELDS, CATEGORY_EXPANDS, parse_names
+from app.serialization import ORJSONResponse, page_payload
 from app.schemas import (
     CategoryCreate, CategoryUpdate, CategoryRead, CategoryList,
     MessageResponse, ErrorResponse
@@ -60,11 +62,34 @@ async def get_categories_endpoint(
     per_page: int = Query(20, ge=1, le=100, description="每页数量"),
     active_only: bool = Query(False, description="仅显示激活的分类"),
     include_count: bool = Query(True, description="包含提示词数量"),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,name）"),
+    expand: Optional[str] = Query(None, description="展开的关联（prompt_count），指定 fields 或 expand 时不再按 include_count 统计"),
     admin_verified: bool = Depends(verify_admin_credentials),
     db: Session = Depends(get_db)
 ):
     """获取分类列表"""
     skip = (page - 1) * per_page
+    
+    # 稀疏字段集：只查询请求的列，计数按需统计
+    if fields is not None or expand is not None:
+        try:
+            field_names = parse_names(fields, CATEGORY_FIELDS, "字段")
+            expand_names = parse_names(expand, CATEGORY_EXPANDS, "关联")
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        items, total = get_category_dicts(
+            db,
+            fields=list(CATEGORY_FIELDS) if field_names is None else field_names,
+            expand=expand_names or (),
+            skip=skip,
+            limit=per_page,
+            active_only=active_only
+        )
+        return ORJSONResponse(page_payload(items, total, page, per_page))
+    
     categories, total = get_categories(
         db, 
         skip=skip, 
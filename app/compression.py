@@ -0,0 +1,279 @@
+"""
+响应压缩模块
+- 按 Accept-Encoding 协商 br / zstd / gzip（br、zstd 为可选依赖）
+- 完整响应体按 (路径, ETag) 或内容哈希缓存压缩结果，每个内容版本只压缩一次
+- 流式响应逐块压缩并刷新，保持边生成边发送
+- HTML 空白压缩
+"""
+import gzip
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import LocalCache
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+# 按优先级排列的可用编码
+AVAILABLE_ENCODINGS: List[str] = (
+    (["br"] if brotli else []) + (["zstd"] if zstandard else []) + ["gzip"]
+)
+
+# 可压缩的内容类型前缀
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# 超过该大小的完整响应体不缓存压缩结果
+MAX_CACHED_BODY = 1024 * 1024
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """解析 Accept-Encoding 为 {编码: q值}"""
+    offered = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name] = quality
+    return offered
+
+
+def accepts(offered: Dict[str, float], encoding: str) -> bool:
+    """客户端是否接受某种编码"""
+    return offered.get(encoding, offered.get("*", 0.0)) > 0
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """根据 Accept-Encoding 选择服务端支持的最优编码"""
+    offered = parse_accept_encoding(accept_encoding)
+    for encoding in AVAILABLE_ENCODINGS:
+        if accepts(offered, encoding):
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """一次性压缩完整响应体"""
+    if encoding == "br":
+        return brotli.compress(body, quality=9)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(body)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class StreamCompressor:
+    """流式压缩器：每个数据块压缩后立即刷新，保证客户端能及时收到"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=4)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        else:
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        if self.encoding == "zstd":
+            return (self._compressor.compress(chunk)
+                    + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK))
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+# 压缩结果缓存：{(缓存键, 编码): 压缩后的字节}
+compressed_variants = LocalCache("compressed_variants", scopes=(), maxsize=512)
+
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件
+    - 已带 Content-Encoding、非200、no-transform 或非文本类型的响应原样透传
+    - 单消息响应体：查缓存或压缩一次后缓存
+    - 多消息（流式）响应体：逐块压缩
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(scope, send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """单个请求的响应压缩状态"""
+
+    def __init__(self, scope: Scope, send: Send, encoding: Optional[str], minimum_size: int):
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.active = False
+        self.stream: Optional[StreamCompressor] = None
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            compressible = (
+                message["status"] == 200
+                and _is_compressible(headers)
+                and "content-encoding" not in headers
+                and "content-range" not in headers
+                and "no-transform" not in headers.get("cache-control", "")
+            )
+            if compressible:
+                _add_vary(MutableHeaders(raw=message["headers"]))
+            if compressible and self.encoding:
+                # 推迟发送响应头，等看到第一个响应体消息再决定
+                self.start_message = message
+                self.active = True
+            else:
+                await self.downstream(message)
+            return
+
+        if not self.active:
+            await self.downstream(message)
+            return
+
+        if message_type != "http.response.body":
+            # 例如 http.response.pathsend：交给服务器零拷贝发送原文件
+            self.active = False
+            await self.downstream(self.start_message)
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None and not more_body:
+            await self._send_complete(body)
+            self.active = False
+            return
+
+        if self.stream is None:
+            self.stream = StreamCompressor(self.encoding)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            del headers["content-length"]
+            self._set_encoding_headers(headers)
+            await self.downstream(self.start_message)
+
+        chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+            self.active = False
+        if chunk or not more_body:
+            await self.downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_complete(self, body: bytes) -> None:
+        """完整响应体：过小则原样发送，否则使用缓存的压缩结果"""
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if len(body) < self.minimum_size:
+            await self.downstream(self.start_message)
+            await self.downstream({"type": "http.response.body", "body": body, "more_body": False})
+            return
+
+        key = self._cache_key(headers, body)
+        compressed = compressed_variants.get(key)
+        if compressed is None:
+            compressed = compress(body, self.encoding)
+            if len(body) <= MAX_CACHED_BODY:
+                compressed_variants.set(key, compressed)
+
+        headers["Content-Length"] = str(len(compressed))
+        self._set_encoding_headers(headers)
+        await self.downstream(self.start_message)
+        await self.downstream({"type": "http.response.body", "body": compressed, "more_body": False})
+
+    def _cache_key(self, headers: MutableHeaders, body: bytes) -> Tuple:
+        """有ETag时按 (路径, 查询串, ETag) 缓存，否则按内容哈希缓存"""
+        etag = headers.get("etag")
+        if etag:
+            return (self.scope["path"], self.scope.get("query_string", b""), etag, self.encoding)
+        return (hashlib.blake2b(body, digest_size=16).digest(), self.encoding)
+
+    def _set_encoding_headers(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        # 压缩后的表示与原表示语义等价，强ETag降级为弱ETag
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+
+_PRESERVE_RE = re.compile(r"<(pre|textarea)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"[ \t]*\n\s*")
+
+
+def minify_html(html: str) -> str:
+    """
+    压缩HTML空白
+    - 删除HTML注释、行首缩进、行尾空白和空行（保留换行，内联脚本不受影响）
+    - <pre> / <textarea> 内容原样保留
+    """
+    parts = []
+    position = 0
+    for match in _PRESERVE_RE.finditer(html):
+        parts.append(_minify_segment(html[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(_minify_segment(html[position:]))
+    return "".join(parts).strip()
+
+
+def _minify_segment(segment: str) -> str:
+    segment = _COMMENT_RE.sub("", segment)
+    return _WHITESPACE_RE.sub("\n", segment)
@@ -2,12 +2,29 @@
 数据库CRUD操作函数
 提供基础的增删改查操作
 """
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import text, func, and_
-from sqlalchemy.exc import IntegrityError
-from app.models import Category, Tag, Prompt, PromptTag, PromptLike
-from app.schemas import CategoryCreate, CategoryUpdate, TagCreate, TagUpdate, PromptCreate, PromptUpdate
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import Row, Select, select, insert, update, delete, literal, text, func, and_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.models import Category, Tag, Prompt, PromptTag, PromptLike, make_excerpt, utcnow_millis
+from app.projections import (
+    CategoryRow, TagRow, PromptRow, CATEGORY_ROW_COLUMNS, TAG_ROW_COLUMNS, PROMPT_ROW_COLUMNS,
+    CATEGORY_FIELDS, TAG_FIELDS, PROMPT_FIELDS, PROMPT_TAG_IDS_FIELD
+)
+from app.cache import touch, SCOPE_CATEGORIES, SCOPE_TAGS, SCOPE_PROMPTS
+from app.schemas import (
+    CategoryCreate, CategoryUpdate, TagCreate, TagUpdate, PromptCreate, PromptUpdate, PromptImport,
+    PromptSelection
+)
+
+def _field_columns(field_map: Dict, names: Sequence[str]) -> list:
+    """稀疏字段集对应的列（始终包含id，按输出字段名命名）"""
+    names = ["id", *(name for name in names if name != "id" and name in field_map)]
+    return [field_map[name].label(name) for name in names]
 
 # 分类CRUD操作
 def create_category(db: Session, category_data: CategoryCreate) -> Category:
@@ -19,6 +36,7 @@ def create_category(db: Session, category_data: CategoryCreate) -> Category:
             is_active=category_data.is_active
         )
         db.add(db_category)
+        touch(db, SCOPE_CATEGORIES)
         db.commit()
         db.refresh(db_category)
         return db_category
@@ -70,6 +88,53 @@ def get_categories(
     
     return categories, total
 
+def get_category_rows(db: Session, active_only: bool = True) -> List[CategoryRow]:
+    """获取分类投影及激活提示词数量（一次分组查询）"""
+    statement = (
+        select(*CATEGORY_ROW_COLUMNS, func.count(Prompt.id))
+        .outerjoin(Prompt, and_(Prompt.category_id == Category.id, Prompt.is_active == True))
+        .group_by(Category.id)
+        .order_by(Category.name)
+    )
+    if active_only:
+        statement = statement.where(Category.is_active == True)
+    return [CategoryRow(*row) for row in db.execute(statement)]
+
+def get_category_dicts(
+    db: Session,
+    fields: Sequence[str],
+    expand: Sequence[str] = (),
+    skip: int = 0,
+    limit: int = 100,
+    active_only: bool = False
+) -> Tuple[List[dict], int]:
+    """
+    按需选择字段的分类列表（稀疏字段集）
+    只查询请求的列；请求 prompt_count 时用一次分组查询统计本页分类的提示词数量
+    """
+    statement = select(*_field_columns(CATEGORY_FIELDS, fields))
+    count_statement = select(func.count(Category.id))
+    if active_only:
+        statement = statement.where(Category.is_active == True)
+        count_statement = count_statement.where(Category.is_active == True)
+    
+    total = db.execute(count_statement).scalar()
+    items = [
+        dict(row._mapping)
+        for row in db.execute(statement.order_by(Category.name).offset(skip).limit(limit))
+    ]
+    
+    if "prompt_count" in expand and items:
+        counts = dict(db.execute(
+            select(Prompt.category_id, func.count(Prompt.id))
+            .where(Prompt.category_id.in_([item["id"] for item in items]), Prompt.is_active == True)
+            .group_by(Prompt.category_id)
+        ).all())
+        for item in items:
+            item["prompt_count"] = counts.get(item["id"], 0)
+    
+    return items, total
+
 def update_category(db: Session, category_id: int, category_data: CategoryUpdate) -> Optional[Category]:
     """更新分类"""
     category = db.query(Category).filter(Category.id == category_id).first()
@@ -82,6 +147,7 @@ def update_category(db: Session, category_id: int, category_data: CategoryUpdate
         for field, value in update_data.items():
             setattr(category, field, value)
         
+        touch(db, SCOPE_CATEGORIES)
         db.commit()
         db.refresh(category)
         return category
@@ -92,7 +158,10 @@ def update_category(db: Session, category_id: int, category_data: CategoryUpdate
         raise
 
 def delete_category(db: Session, category_id: int, force: bool = False) -> bool:
-    """删除分类"""
+    """
+    删除分类
+    force 时分类下的提示词及其标签关联、点赞记录由外键 ON DELETE CASCADE 在数据库中级联删除（一条语句）
+    """
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
         return False
@@ -106,6 +175,7 @@ def delete_category(db: Session, category_id: int, force: bool = False) -> bool:
             raise ValueError(f"无法删除分类，存在 {prompt_count} 个关联的提示词")
     
     db.delete(category)
+    touch(db, SCOPE_CATEGORIES, SCOPE_PROMPTS)
     db.commit()
     return True
 
@@ -119,6 +189,7 @@ def create_tag(db: Session, tag_data: TagCreate) -> Tag:
             is_active=tag_data.is_active
         )
         db.add(db_tag)
+        touch(db, SCOPE_TAGS)
         db.commit()
         db.refresh(db_tag)
         return db_tag
@@ -131,7 +202,7 @@ def get_tag_by_id(db: Session, tag_id: int, include_count: bool = False) -> Opti
     tag = db.query(Tag).filter(Tag.id == tag_id).first()
     if tag and include_count:
         # 添加使用次数
-        usage_count = db.query(func.count(PromptTag.id)).filter(
+        usage_count = db.query(func.count()).select_from(PromptTag).filter(
             and_(PromptTag.tag_id == tag_id, 
                  PromptTag.prompt.has(Prompt.is_active == True))
         ).scalar()
@@ -164,7 +235,7 @@ def get_tags(
     # 如果需要包含使用次数
     if include_count:
         for tag in tags:
-            usage_count = db.query(func.count(PromptTag.id)).filter(
+            usage_count = db.query(func.count()).select_from(PromptTag).filter(
                 and_(PromptTag.tag_id == tag.id,
                      PromptTag.prompt.has(Prompt.is_active == True))
             ).scalar()
@@ -172,6 +243,59 @@ def get_tags(
     
     return tags, total
 
+def get_tag_rows(db: Session, active_only: bool = True) -> List[TagRow]:
+    """获取标签投影及激活提示词使用次数（一次分组查询）"""
+    statement = (
+        select(*TAG_ROW_COLUMNS, func.count(Prompt.id))
+        .outerjoin(PromptTag, PromptTag.tag_id == Tag.id)
+        .outerjoin(Prompt, and_(Prompt.id == PromptTag.prompt_id, Prompt.is_active == True))
+        .group_by(Tag.id)
+        .order_by(Tag.name)
+    )
+    if active_only:
+        statement = statement.where(Tag.is_active == True)
+    return [TagRow(*row) for row in db.execute(statement)]
+
+def _tag_usage_counts(db: Session, tag_ids) -> Dict[int, int]:
+    """一次分组查询统计一批标签在激活提示词中的使用次数"""
+    return dict(db.execute(
+        select(PromptTag.tag_id, func.count())
+        .join(Prompt, Prompt.id == PromptTag.prompt_id)
+        .where(PromptTag.tag_id.in_(tag_ids), Prompt.is_active == True)
+        .group_by(PromptTag.tag_id)
+    ).all())
+
+def get_tag_dicts(
+    db: Session,
+    fields: Sequence[str],
+    expand: Sequence[str] = (),
+    skip: int = 0,
+    limit: int = 100,
+    active_only: bool = False
+) -> Tuple[List[dict], int]:
+    """
+    按需选择字段的标签列表（稀疏字段集）
+    只查询请求的列；请求 usage_count 时用一次分组查询统计本页标签的使用次数
+    """
+    statement = select(*_field_columns(TAG_FIELDS, fields))
+    count_statement = select(func.count(Tag.id))
+    if active_only:
+        statement = statement.where(Tag.is_active == True)
+        count_statement = count_statement.where(Tag.is_active == True)
+    
+    total = db.execute(count_statement).scalar()
+    items = [
+        dict(row._mapping)
+        for row in db.execute(statement.order_by(Tag.name).offset(skip).limit(limit))
+    ]
+    
+    if "usage_count" in expand and items:
+        counts = _tag_usage_counts(db, [item["id"] for item in items])
+        for item in items:
+            item["usage_count"] = counts.get(item["id"], 0)
+    
+    return items, total
+
 def update_tag(db: Session, tag_id: int, tag_data: TagUpdate) -> Optional[Tag]:
     """更新标签"""
     tag = db.query(Tag).filter(Tag.id == tag_id).first()
@@ -184,6 +308,7 @@ def update_tag(db: Session, tag_id: int, tag_data: TagUpdate) -> Optional[Tag]:
         for field, value in update_data.items():
             setattr(tag, field, value)
         
+        touch(db, SCOPE_TAGS)
         db.commit()
         db.refresh(tag)
         return tag
@@ -194,41 +319,113 @@ def update_tag(db: Session, tag_id: int, tag_data: TagUpdate) -> Optional[Tag]:
         raise
 
 def delete_tag(db: Session, tag_id: int, force: bool = False) -> bool:
-    """删除标签"""
+    """删除标签（force 时标签关联由外键级联删除）"""
     tag = db.query(Tag).filter(Tag.id == tag_id).first()
     if not tag:
         return False
     
     # 检查是否有关联的提示词
     if not force:
-        usage_count = db.query(func.count(PromptTag.id)).filter(
+        usage_count = db.query(func.count()).select_from(PromptTag).filter(
             PromptTag.tag_id == tag_id
         ).scalar()
         if usage_count > 0:
             raise ValueError(f"无法删除标签，存在 {usage_count} 个关联的提示词")
     
     db.delete(tag)
+    touch(db, SCOPE_TAGS, SCOPE_PROMPTS)
     db.commit()
     return True
 
+def merge_tag(db: Session, tag_id: int, target_id: int) -> Optional[int]:
+    """
+    把标签合并到目标标签并删除原标签（一个事务内的几条集合语句）
+    - 原标签的关联改为目标标签，已有目标标签的提示词由 INSERT OR IGNORE 跳过
+    - 受影响提示词的更新时间统一刷新（卡片片段缓存按更新时间区分版本）
+    原标签不存在时返回None，否则返回受影响的提示词数量
+    """
+    if tag_id == target_id:
+        raise ValueError("不能把标签合并到自身")
+    found = set(db.scalars(select(Tag.id).where(Tag.id.in_((tag_id, target_id)))))
+    if tag_id not in found:
+        return None
+    if target_id not in found:
+        raise ValueError(f"目标标签 ID {target_id} 不存在")
+    
+    try:
+        touch(db, SCOPE_TAGS, SCOPE_PROMPTS)
+        tagged = select(PromptTag.prompt_id).where(PromptTag.tag_id == tag_id)
+        affected = db.execute(
+            update(Prompt.__table__).where(Prompt.id.in_(tagged)).values(updated_at=utcnow_millis())
+        ).rowcount
+        db.execute(
+            insert(PromptTag.__table__).prefix_with("OR IGNORE").from_select(
+                ["prompt_id", "tag_id"],
+                select(PromptTag.prompt_id, literal(target_id)).where(PromptTag.tag_id == tag_id)
+            )
+        )
+        # 原标签剩余的关联由外键级联删除
+        db.execute(delete(Tag.__table__).where(Tag.id == tag_id))
+        db.commit()
+        return affected
+    except Exception:
+        db.rollback()
+        raise
+
 # 提示词CRUD操作
-def create_prompt(db: Session, prompt_data: PromptCreate) -> Prompt:
-    """创建提示词"""
+def _load_category_row(db: Session, category_id: int) -> CategoryRow:
+    """加载分类投影（一次查询），不存在时抛出ValueError"""
+    row = db.execute(select(*CATEGORY_ROW_COLUMNS).where(Category.id == category_id)).first()
+    if row is None:
+        raise ValueError(f"分类 ID {category_id} 不存在")
+    return CategoryRow(*row)
+
+def _load_tag_rows(db: Session, tag_ids: Sequence[int]) -> Dict[int, TagRow]:
+    """一次IN查询加载并校验一批标签，有不存在的ID时抛出ValueError"""
+    if not tag_ids:
+        return {}
+    tags = {row.id: TagRow(*row) for row in db.execute(select(*TAG_ROW_COLUMNS).where(Tag.id.in_(tag_ids)))}
+    missing = [str(tag_id) for tag_id in tag_ids if tag_id not in tags]
+    if missing:
+        raise ValueError(f"标签 ID {', '.join(missing)} 不存在")
+    return tags
+
+def _insert_prompt_tags(db: Session, prompt_id: int, tag_ids: Sequence[int]) -> None:
+    """一次 executemany 写入标签关联（不取回关联ID，避免ORM逐行 INSERT ... RETURNING）"""
+    if tag_ids:
+        db.execute(insert(PromptTag.__table__), [{"prompt_id": prompt_id, "tag_id": tag_id} for tag_id in tag_ids])
+
+def _written_prompt_row(
+    db: Session,
+    prompt: Prompt,
+    category: Optional[CategoryRow],
+    tags: Sequence[TagRow]
+) -> PromptRow:
+    """
+    由刚写入（已flush、未提交）的提示词构造响应投影，提交后无需重新查询
+    标签使用次数在同一事务内一次分组查询统计（已包含本次写入）
+    """
+    counts = _tag_usage_counts(db, [tag.id for tag in tags]) if tags else {}
+    tags = tuple(tag._replace(usage_count=counts.get(tag.id, 0)) for tag in tags)
+    return PromptRow(
+        *(getattr(prompt, column.key) for column in PROMPT_ROW_COLUMNS),
+        category=category,
+        tags=tags,
+        tag_ids=tuple(tag.id for tag in tags),
+        content=prompt.content_markdown
+    )
+
+def create_prompt(db: Session, prompt_data: PromptCreate) -> PromptRow:
+    """
+    创建提示词
+    分类一次查询、标签一次IN查询校验，提示词和标签关联在同一个事务内写入
+    返回带分类和标签的投影
+    """
     try:
-        # 验证分类是否存在
-        if prompt_data.category_id:
-            category = get_category_by_id(db, prompt_data.category_id)
-            if not category:
-                raise ValueError(f"分类 ID {prompt_data.category_id} 不存在")
-        
-        # 验证标签是否存在
-        if prompt_data.tag_ids:
-            for tag_id in prompt_data.tag_ids:
-                tag = get_tag_by_id(db, tag_id)
-                if not tag:
-                    raise ValueError(f"标签 ID {tag_id} 不存在")
+        category = _load_category_row(db, prompt_data.category_id) if prompt_data.category_id else None
+        tag_ids = list(dict.fromkeys(prompt_data.tag_ids))
+        tags = _load_tag_rows(db, tag_ids)
         
-        # 创建提示词
         db_prompt = Prompt(
             title=prompt_data.title,
             content_markdown=prompt_data.content,
@@ -238,17 +435,12 @@ def create_prompt(db: Session, prompt_data: PromptCreate) -> Prompt:
             is_active=prompt_data.is_active
         )
         db.add(db_prompt)
+        touch(db, SCOPE_PROMPTS)
+        db.flush()
+        _insert_prompt_tags(db, db_prompt.id, tag_ids)
+        row = _written_prompt_row(db, db_prompt, category, [tags[tag_id] for tag_id in sorted(tag_ids)])
         db.commit()
-        db.refresh(db_prompt)
-        
-        # 创建标签关联
-        if prompt_data.tag_ids:
-            for tag_id in prompt_data.tag_ids:
-                prompt_tag = PromptTag(prompt_id=db_prompt.id, tag_id=tag_id)
-                db.add(prompt_tag)
-        
-        db.commit()
-        return db_prompt
+        return row
     except Exception as e:
         db.rollback()
         raise e
@@ -272,21 +464,14 @@ def get_prompt_by_id(db: Session, prompt_id: int, include_relations: bool = Fals
     
     return prompt
 
-def get_prompts(
-    db: Session, 
-    skip: int = 0, 
-    limit: int = 100,
+def _filter_prompts(
+    query: Union[Query, Select],
     category_id: Optional[int] = None,
     tag_id: Optional[int] = None,
     is_featured: Optional[bool] = None,
-    is_active: Optional[bool] = None,
-    include_relations: bool = False,
-    order_by: str = "created_at"
-) -> Tuple[List[Prompt], int]:
-    """获取提示词列表（支持分页和筛选）"""
-    query = db.query(Prompt)
-    
-    # 应用筛选条件
+    is_active: Optional[bool] = None
+) -> Union[Query, Select]:
+    """应用提示词列表筛选条件（ORM查询和投影查询通用）"""
     if category_id is not None:
         query = query.filter(Prompt.category_id == category_id)
     
@@ -299,30 +484,46 @@ def get_prompts(
     if is_active is not None:
         query = query.filter(Prompt.is_active == is_active)
     
-    # 获取总数
-    total = query.count()
-    
-    # 根据排序参数选择排序方式
+    return query
+
+def _order_prompts(query: Union[Query, Select], order_by: str) -> Union[Query, Select]:
+    """根据排序参数选择排序方式"""
     if order_by == "like_count":
-        query = query.order_by(Prompt.like_count.desc(), Prompt.created_at.desc())
-    elif order_by == "copy_count":
-        query = query.order_by(Prompt.copy_count.desc(), Prompt.created_at.desc())
-    elif order_by == "hot":
+        return query.order_by(Prompt.like_count.desc(), Prompt.created_at.desc())
+    if order_by == "copy_count":
+        return query.order_by(Prompt.copy_count.desc(), Prompt.created_at.desc())
+    if order_by == "hot":
         # 热门排序：综合点赞数和复制数
-        query = query.order_by((Prompt.like_count + Prompt.copy_count).desc(), Prompt.created_at.desc())
-    else:
-        # 默认按创建时间倒序
-        query = query.order_by(Prompt.created_at.desc())
+        return query.order_by((Prompt.like_count + Prompt.copy_count).desc(), Prompt.created_at.desc())
+    # 默认按创建时间倒序
+    return query.order_by(Prompt.created_at.desc())
+
+def get_prompts(
+    db: Session, 
+    skip: int = 0, 
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    tag_id: Optional[int] = None,
+    is_featured: Optional[bool] = None,
+    is_active: Optional[bool] = None,
+    include_relations: bool = False,
+    order_by: str = "created_at"
+) -> Tuple[List[Prompt], int]:
+    """获取提示词列表（支持分页和筛选）"""
+    query = _filter_prompts(db.query(Prompt), category_id, tag_id, is_featured, is_active)
+    
+    # 获取总数
+    total = query.count()
     
     # 分页查询
-    prompts = query.offset(skip).limit(limit).all()
+    prompts = _order_prompts(query, order_by).offset(skip).limit(limit).all()
     
     # 如果需要包含关联信息
     if include_relations:
         for prompt in prompts:
             # 加载分类信息
             if prompt.category_id:
-                prompt.category = get_category_by_id(db, prompt.category_id)
+                set_committed_value(prompt, "category", get_category_by_id(db, prompt.category_id))
             
             # 加载标签信息
             tag_ids = db.query(PromptTag.tag_id).filter(PromptTag.prompt_id == prompt.id).all()
@@ -335,125 +536,656 @@ def get_prompts(
     
     return prompts, total
 
-def get_prompts_by_category_name(
+def count_prompts(
     db: Session,
-    category_name: str,
-    skip: int = 0,
-    limit: int = 20,
-    order_by: str = "created_at"
-) -> Tuple[List[Prompt], int, Optional[Category]]:
-    """根据分类名称获取提示词列表"""
-    # 查找分类
-    category = get_category_by_name(db, category_name)
-    if not category:
-        return [], 0, None
-    
-    # 获取该分类下的提示词
-    prompts, total = get_prompts(
-        db=db,
-        skip=skip,
-        limit=limit,
-        category_id=category.id,
-        is_active=True,
-        include_relations=True,
-        order_by=order_by
+    category_id: Optional[int] = None,
+    tag_id: Optional[int] = None,
+    is_featured: Optional[bool] = None,
+    is_active: Optional[bool] = None
+) -> int:
+    """统计符合筛选条件的提示词数量（直接 COUNT，不生成选取全部列的子查询）"""
+    statement = select(func.count(Prompt.id)).select_from(Prompt)
+    return db.execute(_filter_prompts(statement, category_id, tag_id, is_featured, is_active)).scalar()
+
+def _attach_prompt_relations(db: Session, rows: List, tag_counts: bool = False) -> List[PromptRow]:
+    """
+    为一批提示词投影行加载分类和标签（每批固定两次查询）
+    查询结果带 content 列时一并保留完整内容；tag_counts 时再用一次分组查询统计标签使用次数
+    """
+    if not rows:
+        return []
+    
+    category_ids = {row.category_id for row in rows if row.category_id}
+    categories = {}
+    if category_ids:
+        categories = {
+            row.id: CategoryRow(*row)
+            for row in db.execute(select(*CATEGORY_ROW_COLUMNS).where(Category.id.in_(category_ids)))
+        }
+    
+    tags_by_prompt = defaultdict(list)
+    tag_rows = db.execute(
+        select(PromptTag.prompt_id, *TAG_ROW_COLUMNS)
+        .join(Tag, Tag.id == PromptTag.tag_id)
+        .where(PromptTag.prompt_id.in_([row.id for row in rows]))
+        .order_by(PromptTag.prompt_id, PromptTag.tag_id)
     )
+    for prompt_id, *tag in tag_rows:
+        tags_by_prompt[prompt_id].append(TagRow(*tag))
     
-    return prompts, total, category
+    if tag_counts and tags_by_prompt:
+        counts = _tag_usage_counts(db, {tag.id for tags in tags_by_prompt.values() for tag in tags})
+        for tags in tags_by_prompt.values():
+            tags[:] = [tag._replace(usage_count=counts.get(tag.id, 0)) for tag in tags]
+    
+    result = []
+    for row in rows:
+        tags = tags_by_prompt[row.id]
+        result.append(PromptRow(
+            *row[:len(PROMPT_ROW_COLUMNS)],
+            category=categories.get(row.category_id),
+            tags=tuple(tags),
+            tag_ids=tuple(tag.id for tag in tags),
+            content=row.content if "content" in row._fields else None
+        ))
+    return result
+
+def get_prompt_rows_by_ids(db: Session, prompt_ids: Sequence[int]) -> Dict[int, PromptRow]:
+    """
+    批量获取提示词（含完整内容、分类和带使用次数的标签）
+    一次IN查询加上整批关联查询，返回 {提示词ID: 投影行}，不存在的ID不在结果中
+    """
+    if not prompt_ids:
+        return {}
+    rows = db.execute(
+        select(*PROMPT_ROW_COLUMNS, Prompt.content_markdown.label("content"))
+        .where(Prompt.id.in_(set(prompt_ids)))
+    ).all()
+    return {row.id: row for row in _attach_prompt_relations(db, rows, tag_counts=True)}
 
-def get_prompts_by_tag_name(
+def get_prompt_rows(
     db: Session,
-    tag_name: str,
     skip: int = 0,
-    limit: int = 20,
-    order_by: str = "created_at"
-) -> Tuple[List[Prompt], int, Optional[Tag]]:
-    """根据标签名称获取提示词列表"""
-    # 查找标签
-    tag = get_tag_by_name(db, tag_name)
-    if not tag:
-        return [], 0, None
-    
-    # 获取该标签下的提示词
-    prompts, total = get_prompts(
-        db=db,
-        skip=skip,
-        limit=limit,
-        tag_id=tag.id,
-        is_active=True,
-        include_relations=True,
-        order_by=order_by
+    limit: int = 100,
+    order_by: str = "created_at",
+    **filters
+) -> Tuple[List[PromptRow], int]:
+    """
+    获取提示词列表投影（只读列表页用）
+    只查询列表需要的列和预览摘要，不加载完整内容、不实例化ORM对象
+    """
+    total = count_prompts(db, **filters)
+    statement = _order_prompts(_filter_prompts(select(*PROMPT_ROW_COLUMNS), **filters), order_by)
+    rows = db.execute(statement.offset(skip).limit(limit)).all()
+    return _attach_prompt_relations(db, rows), total
+
+def iter_prompt_rows(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    order_by: str = "created_at",
+    batch_size: int = 10,
+    **filters
+) -> Iterator[PromptRow]:
+    """
+    逐批迭代提示词列表投影（流式渲染用）
+    - 通过 yield_per 从游标逐批读取，不一次性加载整页
+    - 每批提示词的分类和标签随批加载
+    """
+    statement = _order_prompts(_filter_prompts(select(*PROMPT_ROW_COLUMNS), **filters), order_by)
+    result = db.execute(statement.offset(skip).limit(limit).execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield from _attach_prompt_relations(db, partition)
+
+def get_prompt_dicts(
+    db: Session,
+    fields: Sequence[str],
+    expand: Sequence[str] = (),
+    skip: int = 0,
+    limit: int = 100,
+    order_by: str = "created_at",
+    **filters
+) -> Tuple[List[dict], int]:
+    """
+    按需选择字段和关联的提示词列表（稀疏字段集）
+    - 只查询请求的列，未请求 content 时不读取完整内容
+    - 分类、标签按需展开，每种关联对整页只查询一次；tag_ids 只查询关联表
+    """
+    columns = _field_columns(PROMPT_FIELDS, fields)
+    hide_category_id = "category" in expand and "category_id" not in fields
+    if hide_category_id:
+        columns.append(Prompt.category_id.label("category_id"))
+    
+    total = count_prompts(db, **filters)
+    statement = _order_prompts(_filter_prompts(select(*columns), **filters), order_by)
+    items = [dict(row._mapping) for row in db.execute(statement.offset(skip).limit(limit))]
+    if not items:
+        return items, total
+    
+    if "category" in expand:
+        category_ids = {item["category_id"] for item in items if item["category_id"]}
+        categories = {}
+        if category_ids:
+            categories = {
+                row.id: dict(row._mapping)
+                for row in db.execute(select(*CATEGORY_ROW_COLUMNS).where(Category.id.in_(category_ids)))
+            }
+        for item in items:
+            item["category"] = categories.get(item.pop("category_id") if hide_category_id else item["category_id"])
+    
+    want_tags = "tags" in expand
+    want_tag_ids = PROMPT_TAG_IDS_FIELD in fields
+    if want_tags or want_tag_ids:
+        prompt_ids = [item["id"] for item in items]
+        if want_tags:
+            statement = select(PromptTag.prompt_id, *TAG_ROW_COLUMNS).join(Tag, Tag.id == PromptTag.tag_id)
+        else:
+            statement = select(PromptTag.prompt_id, PromptTag.tag_id.label("id"))
+        tags_by_prompt = defaultdict(list)
+        for row in db.execute(statement.where(PromptTag.prompt_id.in_(prompt_ids)).order_by(PromptTag.prompt_id, PromptTag.tag_id)):
+            tag = dict(row._mapping)
+            tags_by_prompt[tag.pop("prompt_id")].append(tag)
+        for item in items:
+            tags = tags_by_prompt[item["id"]]
+            if want_tag_ids:
+                item[PROMPT_TAG_IDS_FIELD] = [tag["id"] for tag in tags]
+            if want_tags:
+                item["tags"] = tags
+    
+    return items, total
+
+def get_taxonomy_names(db: Session) -> Tuple[Dict[int, str], Dict[int, str]]:
+    """获取全部分类和标签的 {ID: 名称} 映射（导出/导入时一次加载，逐行查表）"""
+    categories = dict(db.execute(select(Category.id, Category.name)).all())
+    tags = dict(db.execute(select(Tag.id, Tag.name)).all())
+    return categories, tags
+
+def iter_prompts_for_export(
+    db: Session,
+    batch_size: int = 1000,
+    **filters
+) -> Iterator[Tuple[Row, List[int]]]:
+    """
+    按ID顺序逐批迭代全部提示词（导出用，含完整内容）
+    - 通过 yield_per 从游标逐批读取，内存占用与提示词总数无关
+    - 每批只查询一次标签关联（只取标签ID，名称由调用方查映射表）
+    """
+    statement = _filter_prompts(
+        select(*PROMPT_ROW_COLUMNS, Prompt.content_markdown.label("content")), **filters
+    ).order_by(Prompt.id)
+    result = db.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        tag_ids = defaultdict(list)
+        tag_rows = db.execute(
+            select(PromptTag.prompt_id, PromptTag.tag_id)
+            .where(PromptTag.prompt_id.in_([row.id for row in partition]))
+            .order_by(PromptTag.prompt_id, PromptTag.tag_id)
+        )
+        for prompt_id, tag_id in tag_rows:
+            tag_ids[prompt_id].append(tag_id)
+        for row in partition:
+            yield row, tag_ids[row.id]
+
+# 批量写入使用的驱动层SQL（列顺序与 _prompt_values 整理的参数元组一致）
+_INSERT_PROMPT_SQL = (
+    "INSERT INTO prompts (id, title, content_markdown, excerpt, description, category_id, "
+    "is_featured, is_active, source_path, source_hash, like_count, copy_count, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, ?, ?)"
+)
+_UPDATE_PROMPT_SQL = (
+    "UPDATE prompts SET title = ?, content_markdown = ?, excerpt = ?, description = ?, category_id = ?, "
+    "is_featured = ?, is_active = ?, source_path = ?, source_hash = ?, updated_at = ? WHERE id = ?"
+)
+_INSERT_PROMPT_TAG_SQL = "INSERT INTO prompt_tags (prompt_id, tag_id) VALUES (?, ?)"
+
+def _bind_timestamp(connection, column, value: datetime):
+    """按列类型把时间转换为数据库中的存储值（驱动层SQL不经过类型处理，整批共用一个值）"""
+    processor = column.type.bind_processor(connection.dialect)
+    return processor(value) if processor else value
+
+class _TaxonomyIndex:
+    """导入用的分类/标签名称映射（开始时一次加载，逐行查表解析）"""
+    
+    def __init__(self, db: Session):
+        self.category_names, self.tag_names = get_taxonomy_names(db)
+        self.category_ids = {name: category_id for category_id, name in self.category_names.items()}
+        self.tag_ids = {name: tag_id for tag_id, name in self.tag_names.items()}
+    
+    def create_missing(self, db: Session, items: Iterable[PromptImport]) -> None:
+        """批量创建引用但尚不存在的分类和标签（各一次 executemany），并更新映射"""
+        items = list(items)
+        new_categories = sorted({
+            item.category for item in items if item.category and item.category not in self.category_ids
+        })
+        new_tags = sorted({name for item in items for name in item.tags if name not in self.tag_ids})
+        if not new_categories and not new_tags:
+            return
+        
+        scopes = []
+        if new_categories:
+            db.execute(insert(Category.__table__), [{"name": name} for name in new_categories])
+            scopes.append(SCOPE_CATEGORIES)
+        if new_tags:
+            db.execute(insert(Tag.__table__), [{"name": name} for name in new_tags])
+            scopes.append(SCOPE_TAGS)
+        touch(db, *scopes)
+        db.commit()
+        
+        for name, category_id in db.execute(
+            select(Category.name, Category.id).where(Category.name.in_(new_categories))
+        ):
+            self.category_ids[name] = category_id
+            self.category_names[category_id] = name
+        for name, tag_id in db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(new_tags))):
+            self.tag_ids[name] = tag_id
+            self.tag_names[tag_id] = name
+    
+    def resolve(self, item: PromptImport) -> Tuple[int, List[int]]:
+        """解析分类ID和去重后的标签ID（名称优先，其次ID），无法解析时抛出ValueError"""
+        if item.category is not None:
+            category_id = self.category_ids.get(item.category)
+            if category_id is None:
+                raise ValueError(f"分类 '{item.category}' 不存在")
+        elif item.category_id is not None:
+            category_id = item.category_id
+            if category_id not in self.category_names:
+                raise ValueError(f"分类 ID {category_id} 不存在")
+        else:
+            raise ValueError("缺少分类（category 或 category_id）")
+        
+        missing = [name for name in item.tags if name not in self.tag_ids]
+        missing += [str(tag_id) for tag_id in item.tag_ids if tag_id not in self.tag_names]
+        if missing:
+            raise ValueError(f"标签 {', '.join(missing)} 不存在")
+        
+        # 标签去重并保持顺序（关联表以 (prompt_id, tag_id) 为主键）
+        tag_ids = list(dict.fromkeys([*(self.tag_ids[name] for name in item.tags), *item.tag_ids]))
+        return category_id, tag_ids
+
+def _prompt_values(
+    item: PromptImport,
+    category_id: int,
+    source_path: Optional[str] = None,
+    source_hash: Optional[str] = None
+) -> tuple:
+    """整理驱动层写入的提示词参数元组"""
+    return (
+        item.title, item.content, make_excerpt(item.content), item.description,
+        category_id, item.is_featured, item.is_active, source_path, source_hash,
+    )
+
+def _insert_prompt_batch(db: Session, batch: Sequence[Tuple[tuple, List[int]]]) -> None:
+    """
+    在当前事务内写入一批提示词及标签关联（各一次 executemany，不提交）
+    batch 为 [(提示词参数元组, 标签ID列表)]
+    """
+    connection = db.connection()
+    # 先写入版本号取得写锁，之后按当前最大ID预先分配本批ID（RETURNING 在SQLite上会退化为逐行插入）
+    touch(db, SCOPE_PROMPTS)
+    first_id = db.execute(select(func.coalesce(func.max(Prompt.id), 0))).scalar() + 1
+    now = _bind_timestamp(connection, Prompt.__table__.c.created_at, utcnow_millis())
+    prompt_ids = range(first_id, first_id + len(batch))
+    connection.exec_driver_sql(
+        _INSERT_PROMPT_SQL,
+        [(prompt_id, *values, now, now) for prompt_id, (values, _) in zip(prompt_ids, batch)]
     )
+    links = [
+        (prompt_id, tag_id)
+        for prompt_id, (_, tag_ids) in zip(prompt_ids, batch)
+        for tag_id in tag_ids
+    ]
+    if links:
+        connection.exec_driver_sql(_INSERT_PROMPT_TAG_SQL, links)
+
+def import_prompts(
+    db: Session,
+    items: Sequence[Tuple[int, PromptImport]],
+    create_missing: bool = False,
+    batch_size: int = 5000
+) -> Tuple[int, List[dict]]:
+    """
+    批量导入提示词
+    - 分类、标签在开始时一次加载为名称映射，逐行查表解析（名称优先，其次ID）
+    - create_missing 时先批量创建缺失的分类和标签
+    - 提示词和标签关联按批 executemany 写入，每批一个事务；某批写入失败只影响该批
+    - 返回 (成功数量, 逐行错误列表 [{"row": 行号, "error": 原因}])
+    """
+    taxonomy = _TaxonomyIndex(db)
+    if create_missing:
+        taxonomy.create_missing(db, (item for _, item in items))
     
-    return prompts, total, tag
+    errors = []
+    resolved = []
+    for row, item in items:
+        try:
+            category_id, tag_ids = taxonomy.resolve(item)
+        except ValueError as e:
+            errors.append({"row": row, "error": str(e)})
+            continue
+        resolved.append((row, _prompt_values(item, category_id), tag_ids))
+    
+    created = 0
+    for start in range(0, len(resolved), batch_size):
+        batch = resolved[start:start + batch_size]
+        try:
+            _insert_prompt_batch(db, [(values, tag_ids) for _, values, tag_ids in batch])
+            db.commit()
+            created += len(batch)
+        except SQLAlchemyError as e:
+            db.rollback()
+            errors.extend({"row": row, "error": f"写入失败: {e.__class__.__name__}"} for row, _, _ in batch)
+    
+    errors.sort(key=lambda error: error["row"])
+    return created, errors
 
-def update_prompt(db: Session, prompt_id: int, prompt_data: PromptUpdate) -> Optional[Prompt]:
-    """更新提示词"""
-    prompt = db.query(Prompt).filter(Prompt.id == prompt_id).first()
+def get_prompt_sources(db: Session) -> Dict[str, Tuple[int, Optional[str]]]:
+    """获取由源文件同步的提示词 {源文件路径: (提示词ID, 源文件哈希)}"""
+    return {
+        source_path: (prompt_id, source_hash)
+        for prompt_id, source_path, source_hash in db.execute(
+            select(Prompt.id, Prompt.source_path, Prompt.source_hash).where(Prompt.source_path.is_not(None))
+        )
+    }
+
+def sync_prompt_sources(
+    db: Session,
+    created: Sequence[Tuple[str, str, PromptImport]],
+    updated: Sequence[Tuple[int, str, str, PromptImport]],
+    deleted: Sequence[int]
+) -> List[dict]:
+    """
+    应用源文件同步的变更（一个事务，新增/修改/删除各自整批 executemany）
+    - created: [(源文件路径, 哈希, 提示词)]
+    - updated: [(提示词ID, 源文件路径, 哈希, 提示词)]，标签关联整体替换
+    - deleted: [提示词ID]
+    缺失的分类和标签自动创建；返回无法应用的文件错误 [{"path": 路径, "error": 原因}]
+    """
+    taxonomy = _TaxonomyIndex(db)
+    taxonomy.create_missing(db, [item for *_, item in created] + [item for *_, item in updated])
+    
+    errors = []
+    inserts = []
+    for path, source_hash, item in created:
+        try:
+            category_id, tag_ids = taxonomy.resolve(item)
+        except ValueError as e:
+            errors.append({"path": path, "error": str(e)})
+            continue
+        inserts.append((_prompt_values(item, category_id, path, source_hash), tag_ids))
+    
+    updates = []
+    for prompt_id, path, source_hash, item in updated:
+        try:
+            category_id, tag_ids = taxonomy.resolve(item)
+        except ValueError as e:
+            errors.append({"path": path, "error": str(e)})
+            continue
+        updates.append((prompt_id, _prompt_values(item, category_id, path, source_hash), tag_ids))
+    
+    if not inserts and not updates and not deleted:
+        return errors
+    
+    try:
+        touch(db, SCOPE_PROMPTS)
+        connection = db.connection()
+        if deleted:
+            # 标签关联和点赞记录由外键级联删除
+            connection.exec_driver_sql("DELETE FROM prompts WHERE id = ?", [(prompt_id,) for prompt_id in deleted])
+        if updates:
+            now = _bind_timestamp(connection, Prompt.__table__.c.updated_at, utcnow_millis())
+            connection.exec_driver_sql(
+                _UPDATE_PROMPT_SQL, [(*values, now, prompt_id) for prompt_id, values, _ in updates]
+            )
+            connection.exec_driver_sql(
+                "DELETE FROM prompt_tags WHERE prompt_id = ?", [(prompt_id,) for prompt_id, _, _ in updates]
+            )
+            links = [(prompt_id, tag_id) for prompt_id, _, tag_ids in updates for tag_id in tag_ids]
+            if links:
+                connection.exec_driver_sql(_INSERT_PROMPT_TAG_SQL, links)
+        if inserts:
+            _insert_prompt_batch(db, inserts)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return errors
+
+def update_prompt(db: Session, prompt_id: int, prompt_data: PromptUpdate) -> Optional[PromptRow]:
+    """
+    更新提示词（只更新提供的字段）
+    标签按集合差异更新：只插入新增的关联、只删除移除的关联；全部修改在同一个事务内提交
+    返回带分类和标签的投影
+    """
+    prompt = db.get(Prompt, prompt_id)
     if not prompt:
         return None
     
     try:
-        # 验证分类是否存在
-        if prompt_data.category_id is not None:
-            category = get_category_by_id(db, prompt_data.category_id)
-            if not category:
-                raise ValueError(f"分类 ID {prompt_data.category_id} 不存在")
+        update_data = prompt_data.model_dump(exclude_unset=True, exclude={'tag_ids'})
+        category_id = update_data.get('category_id', prompt.category_id)
+        category = _load_category_row(db, category_id) if category_id else None
         
-        # 验证标签是否存在
-        if prompt_data.tag_ids is not None:
-            for tag_id in prompt_data.tag_ids:
-                tag = get_tag_by_id(db, tag_id)
-                if not tag:
-                    raise ValueError(f"标签 ID {tag_id} 不存在")
+        current_ids = db.scalars(
+            select(PromptTag.tag_id).where(PromptTag.prompt_id == prompt_id).order_by(PromptTag.tag_id)
+        ).all()
+        if prompt_data.tag_ids is None:
+            tag_ids = list(current_ids)
+            tags = _load_tag_rows(db, tag_ids)
+        else:
+            requested = list(dict.fromkeys(prompt_data.tag_ids))
+            tags = _load_tag_rows(db, requested)
+            requested_set = set(requested)
+            current_set = set(current_ids)
+            added = [tag_id for tag_id in requested if tag_id not in current_set]
+            removed = current_set - requested_set
+            if removed:
+                db.execute(
+                    delete(PromptTag).where(PromptTag.prompt_id == prompt_id, PromptTag.tag_id.in_(removed))
+                )
+            _insert_prompt_tags(db, prompt_id, added)
+            if added or removed:
+                # 标签变化也视为内容版本变化（卡片片段缓存按更新时间区分版本）
+                prompt.updated_at = utcnow_millis()
+            # 与读取结果一致按标签ID排序（关联表按 (prompt_id, tag_id) 聚集）
+            tag_ids = sorted(requested_set)
         
-        # 更新提示词基本信息
-        update_data = prompt_data.model_dump(exclude_unset=True, exclude={'tag_ids'})
         for field, value in update_data.items():
             # 处理content字段映射到content_markdown
-            if field == 'content':
-                setattr(prompt, 'content_markdown', value)
-            else:
-                setattr(prompt, field, value)
-        
-        # 更新标签关联
-        if prompt_data.tag_ids is not None:
-            # 删除旧的标签关联
-            db.query(PromptTag).filter(PromptTag.prompt_id == prompt_id).delete()
-            
-            # 创建新的标签关联
-            for tag_id in prompt_data.tag_ids:
-                prompt_tag = PromptTag(prompt_id=prompt_id, tag_id=tag_id)
-                db.add(prompt_tag)
+            setattr(prompt, 'content_markdown' if field == 'content' else field, value)
         
+        touch(db, SCOPE_PROMPTS)
+        db.flush()
+        row = _written_prompt_row(db, prompt, category, [tags[tag_id] for tag_id in tag_ids])
         db.commit()
-        db.refresh(prompt)
-        return prompt
+        return row
     except Exception as e:
         db.rollback()
         raise e
 
-def delete_prompt(db: Session, prompt_id: int) -> bool:
-    """删除提示词"""
-    prompt = db.query(Prompt).filter(Prompt.id == prompt_id).first()
-    if not prompt:
-        return False
+def _id_values(prompt_ids: Sequence[int]):
+    """把ID列表作为单个JSON参数展开为表值函数（json_each），不受SQL参数个数限制"""
+    return func.json_each(json.dumps(list(prompt_ids))).table_valued("value")
+
+def _selection_query(selection: PromptSelection) -> Select:
+    """批量操作范围对应的提示词ID查询，范围为空时抛出ValueError（防止误操作全部提示词）"""
+    filters = selection.model_dump(exclude_none=True, exclude={"ids"})
+    if selection.ids is None and not filters:
+        raise ValueError("批量操作至少需要一个范围条件")
+    query = _filter_prompts(select(Prompt.id), **filters)
+    if selection.ids is not None:
+        query = query.where(Prompt.id.in_(select(_id_values(selection.ids).c.value)))
+    return query
+
+def select_prompt_ids(db: Session, selection: PromptSelection) -> List[int]:
+    """按批量操作范围查询提示词ID（一次查询），范围为空时抛出ValueError"""
+    return list(db.scalars(_selection_query(selection).order_by(Prompt.id)))
+
+def bulk_update_prompts(db: Session, selection: PromptSelection, values: dict) -> int:
+    """
+    批量更新一组提示词的状态字段（一条 UPDATE 语句，同时刷新更新时间）
+    返回受影响的提示词数量；没有匹配时不写入、不使缓存失效
+    """
+    if not values:
+        raise ValueError("没有要更新的字段")
+    try:
+        affected = db.execute(
+            update(Prompt.__table__)
+            .where(Prompt.id.in_(_selection_query(selection)))
+            .values(**values, updated_at=utcnow_millis())
+        ).rowcount
+        if not affected:
+            db.rollback()
+            return 0
+        touch(db, SCOPE_PROMPTS)
+        db.commit()
+        return affected
+    except Exception:
+        db.rollback()
+        raise
+
+def bulk_delete_prompts(db: Session, selection: PromptSelection) -> int:
+    """
+    批量删除一组提示词（一条 DELETE 语句，标签关联和点赞记录由外键级联删除）
+    返回删除的提示词数量；没有匹配时不写入、不使缓存失效
+    """
+    try:
+        affected = db.execute(
+            delete(Prompt.__table__).where(Prompt.id.in_(_selection_query(selection)))
+        ).rowcount
+        if not affected:
+            db.rollback()
+            return 0
+        touch(db, SCOPE_PROMPTS)
+        db.commit()
+        return affected
+    except Exception:
+        db.rollback()
+        raise
+
+def retag_prompts(
+    db: Session,
+    selection: PromptSelection,
+    category_id: Optional[int] = None,
+    add_tag_ids: Sequence[int] = (),
+    remove_tag_ids: Sequence[int] = ()
+) -> int:
+    """
+    批量调整一组提示词的分类和标签（一个事务内的几条集合语句）
+    - 范围先解析为ID列表，后续语句互不影响（例如按标签筛选并移除该标签）
+    - 添加标签用 INSERT OR IGNORE 跳过已有的关联，移除标签一次 DELETE
+    - 受影响提示词的更新时间统一刷新，缓存只失效一次
+    返回匹配的提示词数量
+    """
+    add_tag_ids = list(dict.fromkeys(add_tag_ids))
+    remove_tag_ids = list(dict.fromkeys(remove_tag_ids))
+    if category_id is None and not add_tag_ids and not remove_tag_ids:
+        raise ValueError("至少需要指定分类、添加或移除的标签之一")
+    if set(add_tag_ids) & set(remove_tag_ids):
+        raise ValueError("同一标签不能同时添加和移除")
+    if category_id is not None:
+        _load_category_row(db, category_id)
+    _load_tag_rows(db, add_tag_ids)
     
     try:
-        # 删除标签关联
-        db.query(PromptTag).filter(PromptTag.prompt_id == prompt_id).delete()
-        
-        # 删除点赞记录
-        db.query(PromptLike).filter(PromptLike.prompt_id == prompt_id).delete()
+        # 先写入版本号取得写锁，范围查询和之后的修改看到同一份数据
+        touch(db, SCOPE_PROMPTS)
+        prompt_ids = select_prompt_ids(db, selection)
+        if not prompt_ids:
+            db.rollback()
+            return 0
         
-        # 删除提示词本身
-        db.delete(prompt)
+        ids = _id_values(prompt_ids)
+        matched = select(ids.c.value)
+        now = utcnow_millis()
+        if add_tag_ids:
+            new_links = select(ids.c.value, Tag.id).join_from(
+                ids, Tag, Tag.id.in_(add_tag_ids)
+            )
+            db.execute(
+                insert(PromptTag.__table__).prefix_with("OR IGNORE")
+                .from_select(["prompt_id", "tag_id"], new_links)
+            )
+        if remove_tag_ids:
+            db.execute(
+                delete(PromptTag.__table__)
+                .where(PromptTag.prompt_id.in_(matched), PromptTag.tag_id.in_(remove_tag_ids))
+            )
+        values = {"updated_at": now}
+        if category_id is not None:
+            values["category_id"] = category_id
+        db.execute(update(Prompt.__table__).where(Prompt.id.in_(matched)).values(**values))
+        db.commit()
+        return len(prompt_ids)
+    except Exception:
+        db.rollback()
+        raise
+
+def delete_prompt(db: Session, prompt_id: int) -> bool:
+    """删除提示词（标签关联和点赞记录由外键 ON DELETE CASCADE 级联删除）"""
+    try:
+        deleted = db.execute(delete(Prompt.__table__).where(Prompt.id == prompt_id)).rowcount
+        if not deleted:
+            db.rollback()
+            return False
+        touch(db, SCOPE_PROMPTS)
         db.commit()
         return True
     except Exception as e:
         db.rollback()
         raise e
 
+# 点赞
+def like_prompt(db: Session, prompt_id: int, ip_key: int) -> Optional[Tuple[bool, int]]:
+    """
+    点赞（同一IP对同一提示词只计一次）
+    去重记录用 INSERT OR IGNORE 写入，只有新记录才递增 like_count；
+    不修改更新时间（卡片片段缓存和原文版本号按更新时间区分，点赞数在组装页面时填入）
+    提示词不存在或未激活时返回None，否则返回 (本次是否计入, 当前点赞数)
+    """
+    like_count = db.execute(
+        select(Prompt.like_count).where(Prompt.id == prompt_id, Prompt.is_active == True)
+    ).first()
+    if like_count is None:
+        return None
+    
+    try:
+        inserted = db.execute(
+            insert(PromptLike.__table__).prefix_with("OR IGNORE")
+            .values(prompt_id=prompt_id, ip_key=ip_key, created_at=utcnow_millis())
+        ).rowcount
+        if not inserted:
+            db.rollback()
+            return False, like_count[0] or 0
+        like_count = db.execute(
+            update(Prompt.__table__).where(Prompt.id == prompt_id)
+            # 显式保留更新时间（否则列的 onupdate 会刷新它）
+            .values(like_count=func.coalesce(Prompt.like_count, 0) + 1, updated_at=Prompt.updated_at)
+            .returning(Prompt.like_count)
+        ).scalar()
+        touch(db, SCOPE_PROMPTS)
+        db.commit()
+        return True, like_count
+    except IntegrityError:
+        # 提示词在查询之后被删除
+        db.rollback()
+        return None
+    except Exception:
+        db.rollback()
+        raise
+
+def compact_prompt_likes(db: Session, before: datetime) -> int:
+    """
+    清理早于 before 的点赞去重记录（一条 DELETE），返回删除的记录数
+    点赞数记在 prompts.like_count，不受影响；记录清理后同一IP可以再次点赞
+    """
+    try:
+        deleted = db.execute(delete(PromptLike.__table__).where(PromptLike.created_at < before)).rowcount
+        db.commit()
+        return deleted
+    except Exception:
+        db.rollback()
+        raise
+
 # 数据库健康检查
 def check_database_health(db: Session) -> dict:
     """检查数据库健康状态"""
@@ -3,6 +3,7 @@
 - SQLite数据库连接
 - WAL模式启用
 - 会话管理
+- 结构迁移见 app.migrations
 """
 import sqlite3
 from pathlib import Path
@@ -62,22 +63,13 @@ def get_db():
     finally:
         db.close()
 
-def init_database():
+def init_database(bind: Engine = engine):
     """
     初始化数据库
-    创建所有表
+    启动时只读取结构版本号；落后于最新版本（或新数据库）时执行迁移
+    迁移也可以单独执行: python -m app.migrations upgrade
     """
-    # 导入所有模型确保表被创建
-    import app.models
+    from app.migrations import LATEST_VERSION, current_version, migrate
     
-    # 创建所有表
-    Base.metadata.create_all(bind=engine)
-    
-    # 验证WAL模式是否启用
-    with engine.connect() as conn:
-        from sqlalchemy import text
-        result = conn.execute(text("PRAGMA journal_mode")).fetchone()
-        if result and result[0].upper() == 'WAL':
-            print("✅ SQLite WAL模式已启用")
-        else:
-            print("⚠️  WAL模式启用失败") 
\ No newline at end of file
+    if current_version(bind) < LATEST_VERSION:
+        migrate(bind)
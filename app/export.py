@@ -0,0 +1,136 @@
+"""
+数据导出API端点
+流式导出全部提示词（NDJSON / CSV），需要管理员认证
+- 独立会话 + 服务端游标逐批读取，内存占用与提示词总数无关
+- 分类、标签名称在导出开始时一次加载为映射表，逐行查表
+- 只读事务（WAL模式下不阻塞写入）
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.auth import verify_admin_credentials
+from app.crud import get_taxonomy_names, iter_prompts_for_export
+from app.database import SessionLocal
+from app.serialization import dump_json
+
+router = APIRouter(prefix="/admin", tags=["数据导出"])
+
+# 每批从游标读取的提示词数
+EXPORT_BATCH_SIZE = 1000
+
+# 响应块大小（逐行拼接到该大小后再发送，减少发送次数）
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# 导出字段（NDJSON 的键和 CSV 的列，顺序一致）
+EXPORT_FIELDS = (
+    "id", "title", "description", "content", "category_id", "category", "tag_ids", "tags",
+    "is_featured", "is_active", "like_count", "copy_count", "created_at", "updated_at",
+)
+
+# CSV 中多个标签名/标签ID的分隔符
+CSV_LIST_SEPARATOR = "|"
+
+
+def export_records(is_active: Optional[bool] = None) -> Iterator[dict]:
+    """逐条生成导出记录（迭代时才打开会话，流式响应发送完毕后关闭）"""
+    db = SessionLocal()
+    try:
+        category_names, tag_names = get_taxonomy_names(db)
+        for row, tag_ids in iter_prompts_for_export(db, batch_size=EXPORT_BATCH_SIZE, is_active=is_active):
+            yield {
+                "id": row.id,
+                "title": row.title,
+                "description": row.description,
+                "content": row.content,
+                "category_id": row.category_id,
+                "category": category_names.get(row.category_id),
+                "tag_ids": tag_ids,
+                "tags": [tag_names[tag_id] for tag_id in tag_ids],
+                "is_featured": row.is_featured,
+                "is_active": row.is_active,
+                "like_count": row.like_count,
+                "copy_count": row.copy_count,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+            }
+    finally:
+        db.close()
+
+
+def chunked(pieces: Iterable[bytes], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """把逐行输出拼接成较大的响应块"""
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def ndjson_lines(records: Iterable[dict]) -> Iterator[bytes]:
+    """每条记录一行JSON"""
+    for record in records:
+        yield dump_json(record) + b"\n"
+
+
+def csv_lines(records: Iterable[dict]) -> Iterator[bytes]:
+    """CSV表头和逐行数据（带BOM，Excel可以直接识别UTF-8中文）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        line = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+    for record in records:
+        record["tag_ids"] = CSV_LIST_SEPARATOR.join(map(str, record["tag_ids"]))
+        record["tags"] = CSV_LIST_SEPARATOR.join(record["tags"])
+        for field in ("created_at", "updated_at"):
+            if record[field] is not None:
+                record[field] = record[field].isoformat()
+        writer.writerow([record[field] for field in EXPORT_FIELDS])
+        yield flush()
+
+
+def export_response(lines: Iterator[bytes], media_type: str, extension: str) -> StreamingResponse:
+    """流式下载响应（同步生成器由线程池迭代，不阻塞事件循环）"""
+    filename = f"prompts-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    return StreamingResponse(
+        chunked(lines),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/export.ndjson",
+            summary="导出提示词（NDJSON）",
+            description="流式导出全部提示词，每行一个JSON对象，包含分类和标签名称")
+async def export_ndjson_endpoint(
+    is_active: Optional[bool] = Query(None, description="是否激活"),
+    admin_verified: bool = Depends(verify_admin_credentials)
+):
+    """导出提示词（NDJSON）"""
+    return export_response(ndjson_lines(export_records(is_active)), "application/x-ndjson", "ndjson")
+
+
+@router.get("/export.csv",
+            summary="导出提示词（CSV）",
+            description=f"流式导出全部提示词，多个标签以 {CSV_LIST_SEPARATOR} 分隔")
+async def export_csv_endpoint(
+    is_active: Optional[bool] = Query(None, description="是否激活"),
+    admin_verified: bool = Depends(verify_admin_credentials)
+):
+    """导出提示词（CSV）"""
+    return export_response(csv_lines(export_records(is_active)), "text/csv; charset=utf-8", "csv")
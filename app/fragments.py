@@ -0,0 +1,50 @@
+"""
+页面片段缓存
+- 提示词卡片按 (提示词ID, 更新时间, 展示方式) 缓存渲染结果，主页、分类页、标签页和各排序方式共用
+- 点赞数、复制数不进入缓存，组装页面时填入占位符
+- 分类、标签改名或改色时按作用域整体失效
+"""
+from typing import Optional
+
+from fastapi.templating import Jinja2Templates
+from markupsafe import Markup
+
+from app.api import raw_prompt_url
+from app.cache import register_cache, SCOPE_CATEGORIES, SCOPE_TAGS
+
+CARD_TEMPLATE = "_prompt_card.html"
+
+# 计数占位符（渲染时原样输出，组装时替换为实际值）
+LIKE_COUNT_SLOT = Markup("<!--slot:like_count-->")
+COPY_COUNT_SLOT = Markup("<!--slot:copy_count-->")
+
+# 卡片缓存：{(模板, 提示词ID, 更新时间, 是否显示分类, 当前标签): 带占位符的HTML}
+# 提示词内容或标签变化时更新时间随之变化；卡片中的分类、标签名称和颜色依赖对应作用域
+card_cache = register_cache("prompt_cards", scopes=(SCOPE_CATEGORIES, SCOPE_TAGS), maxsize=4096)
+
+
+def install_fragment_helpers(templates: Jinja2Templates) -> None:
+    """注册模板中使用的 prompt_card(prompt, ...) 函数"""
+
+    def prompt_card(prompt, show_category: bool = True, current_tag: Optional[str] = None) -> Markup:
+        """渲染提示词卡片（命中缓存时只填入计数）"""
+        # 模板对象作为键的一部分：开发环境模板重新加载后旧片段自然失效
+        template = templates.get_template(CARD_TEMPLATE)
+        key = (template, prompt.id, prompt.updated_at, show_category, current_tag)
+        html = card_cache.get(key)
+        if html is None:
+            html = template.render(
+                prompt=prompt,
+                raw_url=raw_prompt_url(prompt),
+                show_category=show_category,
+                current_tag=current_tag,
+                like_count=LIKE_COUNT_SLOT,
+                copy_count=COPY_COUNT_SLOT,
+            )
+            card_cache.set(key, html)
+        return Markup(
+            html.replace(LIKE_COUNT_SLOT, str(prompt.like_count or 0))
+            .replace(COPY_COUNT_SLOT, str(prompt.copy_count or 0))
+        )
+
+    templates.env.globals["prompt_card"] = prompt_card
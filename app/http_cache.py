@@ -0,0 +1,72 @@
+"""
+HTTP条件缓存工具
+- 根据数据版本戳生成 ETag / Last-Modified
+- 处理 If-None-Match / If-Modified-Since 条件请求
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts, weak: bool = True) -> str:
+    """根据任意片段生成ETag（默认弱校验，压缩后的表示依然有效）"""
+    digest = hashlib.blake2b(
+        "\x1f".join(str(part) for part in parts).encode("utf-8"), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def build_validators(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = "no-cache"
+) -> Dict[str, str]:
+    """构建缓存校验响应头"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def _opaque_tag(etag: str) -> str:
+    """去掉弱校验前缀，用于弱比较"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 弱比较"""
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == target for candidate in if_none_match.split(","))
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """
+    判断条件请求是否可以返回304
+    - 有 If-None-Match 时只比较ETag（RFC 9110）
+    - 否则比较 If-Modified-Since 与 Last-Modified（秒级精度）
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, headers["ETag"])
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """构建304响应（保留校验头，不带响应体）"""
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,119 @@
+"""
+数据导入API端点
+批量导入提示词（NDJSON / JSON数组），需要管理员认证
+- 逐行校验，失败的行单独报告，不影响其他行
+- 分类、标签只解析一次，提示词和标签关联按批 executemany 写入
+- Markdown目录增量同步（PROMPT_SOURCE_DIR），只写入哈希变化的文件
+"""
+from typing import List, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app import markdown_sync
+from app.auth import verify_admin_credentials
+from app.crud import import_prompts
+from app.database import get_db
+from app.schemas import PromptImport, ImportResult, SyncResult
+from app.serialization import type_adapter
+
+router = APIRouter(prefix="/admin", tags=["数据导入"])
+
+# 每个写入事务的提示词数
+IMPORT_BATCH_SIZE = 5000
+
+
+def describe_validation_error(error: ValidationError) -> str:
+    """把校验错误压缩为一行说明"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or '行'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def parse_ndjson(body: bytes) -> Tuple[List[Tuple[int, PromptImport]], List[dict]]:
+    """逐行解析NDJSON（空行跳过），返回 (有效行, 错误列表)"""
+    adapter = type_adapter(PromptImport)
+    items, errors = [], []
+    for row, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            items.append((row, adapter.validate_json(line)))
+        except ValidationError as e:
+            errors.append({"row": row, "error": describe_validation_error(e)})
+    return items, errors
+
+
+def parse_json_array(body: bytes) -> Tuple[List[Tuple[int, PromptImport]], List[dict]]:
+    """解析JSON数组，逐项校验，返回 (有效项, 错误列表)"""
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="请求体不是有效的JSON"
+        )
+    if not isinstance(data, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="JSON请求体必须是数组"
+        )
+
+    adapter = type_adapter(PromptImport)
+    items, errors = [], []
+    for row, value in enumerate(data, start=1):
+        try:
+            items.append((row, adapter.validate_python(value)))
+        except ValidationError as e:
+            errors.append({"row": row, "error": describe_validation_error(e)})
+    return items, errors
+
+
+@router.post("/import",
+             response_model=ImportResult,
+             summary="批量导入提示词",
+             description="请求体为NDJSON（每行一个提示词，默认）或 Content-Type: application/json 的数组；"
+                         "分类、标签可用名称或ID，导出文件可以直接导入")
+async def import_prompts_endpoint(
+    request: Request,
+    create_missing: bool = Query(False, description="自动创建不存在的分类和标签（按名称）"),
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """批量导入提示词"""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        items, errors = parse_json_array(body)
+    else:
+        items, errors = parse_ndjson(body)
+
+    created, import_errors = import_prompts(
+        db, items, create_missing=create_missing, batch_size=IMPORT_BATCH_SIZE
+    )
+    errors = sorted(errors + import_errors, key=lambda error: error["row"])
+    return ImportResult(created=created, failed=len(errors), errors=errors)
+
+
+@router.post("/sync",
+             response_model=SyncResult,
+             summary="同步Markdown目录",
+             description="把 PROMPT_SOURCE_DIR 目录下带 front-matter 的Markdown文件增量同步为提示词："
+                         "只解析和写入新增、修改的文件，删除源文件已不存在的提示词")
+def sync_prompts_endpoint(
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """同步Markdown目录（读取文件是阻塞操作，在线程池中执行）"""
+    if not markdown_sync.PROMPT_SOURCE_DIR:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="未配置同步目录（PROMPT_SOURCE_DIR）"
+        )
+    try:
+        return markdown_sync.sync_directory(db, markdown_sync.PROMPT_SOURCE_DIR)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
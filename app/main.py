@@ -1,6 +1,4 @@
 from fastapi import FastAPI, Depends, Request
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 from app.database import get_db, init_database
 from app.crud import check_database_health
@@ -8,7 +6,14 @@ from app.auth import verify_admin_credentials, rate_limit, get_rate_limit_status
 from app.categories import router as categories_router
 from app.tags import router as tags_router
 from app.prompts import router as prompts_router
+from app.export import router as export_router
+from app.importer import router as import_router
 from app.public import router as public_router
+from app.api import router as api_router
+from app.compression import CompressionMiddleware
+from app.assets import manifest, FingerprintedStaticFiles
+from app.tailwind import generate_stylesheet
+from app.templating import templates, precompile_templates
 
 # 初始化数据库
 init_database()
@@ -19,16 +24,27 @@ app = FastAPI(
     version="0.3.0"
 )
 
-# 配置模板引擎
-templates = Jinja2Templates(directory="templates")
+# 响应压缩（按Accept-Encoding协商br/zstd/gzip）
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+# 预编译全部模板（字节码缓存命中时跳过编译，首个请求不再承担编译开销）
+precompile_templates(templates.env)
 
 # 配置静态文件服务
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# 启动时先按模板生成 Tailwind 样式表，再生成资源指纹清单（带哈希的URL可永久缓存）
+generate_stylesheet()
+manifest.build()
+app.mount("/static", FingerprintedStaticFiles(directory="static", manifest=manifest), name="static")
 
 # 注册管理路由
 app.include_router(categories_router)
 app.include_router(tags_router)
 app.include_router(prompts_router)
+app.include_router(export_router)
+app.include_router(import_router)
+
+# 注册公开API路由
+app.include_router(api_router)
 
 # 注册公开页面路由（放在最后，让它能处理根路径）
 app.include_router(public_router)
@@ -57,7 +73,12 @@ async def admin_dashboard(admin_verified: bool = Depends(verify_admin_credential
         "available_endpoints": [
             "/admin/categories",
             "/admin/tags", 
-            "/admin/prompts"
+            "/admin/prompts",
+            "/admin/export.ndjson",
+            "/admin/export.csv",
+            "/admin/import",
+            "/admin/sync",
+            "/admin/prompts/likes/compact"
         ]
     }
 
@@ -0,0 +1,216 @@
+"""
+Markdown目录同步
+把一个目录下带 front-matter 的 Markdown 文件增量同步为提示词
+- 每个文件一个提示词，以相对路径关联，文件内容的SHA-256记录在提示词上
+- 哈希未变化的文件不解析、不写入；新增/修改/删除在一个事务内整批应用
+- 文件读取、哈希和解析在线程池中并行
+
+文件格式:
+    ---
+    title: 代码审查助手
+    category: 编程
+    tags: [代码, 审查]
+    description: 可选
+    is_featured: false
+    ---
+    提示词正文（Markdown）
+
+用法: python -m app.markdown_sync 目录
+"""
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.crud import get_prompt_sources, sync_prompt_sources
+from app.schemas import PromptImport, SyncResult
+
+# 同步目录（/admin/sync 使用），未设置时接口不可用
+PROMPT_SOURCE_DIR = os.getenv("PROMPT_SOURCE_DIR")
+
+# 参与同步的文件扩展名
+SYNC_EXTENSIONS = (".md", ".markdown")
+
+# 读取和解析文件的线程数
+SYNC_WORKERS = min(8, os.cpu_count() or 1)
+
+FRONT_MATTER_DELIMITER = "---"
+
+
+class SourceFile(NamedTuple):
+    """扫描到的源文件"""
+    path: str  # 相对于同步目录的路径（统一为 / 分隔）
+    hash: str
+    data: bytes
+
+
+def parse_scalar(raw: str) -> Union[str, bool, List[str]]:
+    """解析 front-matter 的值：[a, b] 列表、true/false、带引号或不带引号的字符串"""
+    value = raw.strip()
+    if value.startswith("[") and value.endswith("]"):
+        return [item for item in (parse_scalar(part) for part in value[1:-1].split(",")) if item != ""]
+    if value.lower() in ("true", "yes"):
+        return True
+    if value.lower() in ("false", "no"):
+        return False
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def parse_front_matter(text: str) -> Tuple[Dict[str, object], str]:
+    """
+    拆分 front-matter 和正文
+    支持 key: value 和以 "- item" 逐行书写的列表；没有 front-matter 时整个文件都是正文
+    """
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != FRONT_MATTER_DELIMITER:
+        return {}, text
+    try:
+        end = next(i for i in range(1, len(lines)) if lines[i].strip() == FRONT_MATTER_DELIMITER)
+    except StopIteration:
+        raise ValueError("front-matter 缺少结束的 ---")
+
+    meta: Dict[str, object] = {}
+    key = None
+    for number, line in enumerate(lines[1:end], start=2):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None:
+            items = meta[key] if isinstance(meta[key], list) else []
+            items.append(parse_scalar(stripped[2:]))
+            meta[key] = items
+            continue
+        name, separator, value = line.partition(":")
+        if not separator or not name.strip():
+            raise ValueError(f"front-matter 第 {number} 行格式错误")
+        key = name.strip()
+        meta[key] = parse_scalar(value) if value.strip() else []
+
+    return meta, "\n".join(lines[end + 1:]).strip()
+
+
+def read_source(root: Path, file: Path) -> SourceFile:
+    """读取文件并计算哈希"""
+    data = file.read_bytes()
+    return SourceFile(file.relative_to(root).as_posix(), hashlib.sha256(data).hexdigest(), data)
+
+
+def parse_source(source: SourceFile) -> PromptImport:
+    """把源文件解析为提示词，标题默认取文件名；格式错误时抛出 ValueError"""
+    try:
+        text = source.data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("文件不是有效的UTF-8")
+    meta, body = parse_front_matter(text)
+    meta.setdefault("title", Path(source.path).stem)
+    for key in ("tags", "tag_ids"):
+        if isinstance(meta.get(key), str):
+            meta[key] = [meta[key]]
+    try:
+        return PromptImport.model_validate({**meta, "content": body})
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in e.errors()
+        ))
+
+
+def scan_directory(root: Path) -> List[Path]:
+    """按路径顺序列出目录下的全部Markdown文件（含子目录）"""
+    return sorted(
+        file for file in root.rglob("*")
+        if file.suffix.lower() in SYNC_EXTENSIONS and file.is_file()
+    )
+
+
+def sync_directory(db: Session, root: Union[str, Path]) -> SyncResult:
+    """
+    增量同步目录
+    1. 并行读取全部文件并计算哈希，与已记录的 {路径: 哈希} 对比
+    2. 只并行解析新增和哈希变化的文件
+    3. 新增、修改、删除（文件已不存在）一次性应用；缺失的分类和标签自动创建
+    无法读取或解析的文件报告错误，对应的提示词保持不变
+    """
+    root = Path(root)
+    if not root.is_dir():
+        raise ValueError(f"同步目录不存在: {root}")
+
+    files = scan_directory(root)
+    stored = get_prompt_sources(db)
+    errors = []
+    unchanged = 0
+
+    def read(file: Path):
+        try:
+            return read_source(root, file)
+        except OSError as e:
+            return file.relative_to(root).as_posix(), f"读取失败: {e.strerror or e}"
+
+    def parse(source: SourceFile):
+        try:
+            return source, parse_source(source)
+        except ValueError as e:
+            return source, str(e)
+
+    with ThreadPoolExecutor(max_workers=SYNC_WORKERS) as executor:
+        changed = []
+        for source in executor.map(read, files):
+            if not isinstance(source, SourceFile):
+                errors.append({"path": source[0], "error": source[1]})
+                continue
+            previous = stored.get(source.path)
+            if previous is not None and previous[1] == source.hash:
+                unchanged += 1
+            else:
+                changed.append(source)
+        parsed = list(executor.map(parse, changed))
+
+    created, updated = [], []
+    for source, item in parsed:
+        if isinstance(item, str):
+            errors.append({"path": source.path, "error": item})
+        elif source.path in stored:
+            updated.append((stored[source.path][0], source.path, source.hash, item))
+        else:
+            created.append((source.path, source.hash, item))
+
+    present = {file.relative_to(root).as_posix() for file in files}
+    deleted = [prompt_id for path, (prompt_id, _) in stored.items() if path not in present]
+
+    apply_errors = sync_prompt_sources(db, created, updated, deleted)
+    failed = {error["path"] for error in apply_errors}
+    return SyncResult(
+        created=sum(1 for path, _, _ in created if path not in failed),
+        updated=sum(1 for _, path, _, _ in updated if path not in failed),
+        deleted=len(deleted),
+        unchanged=unchanged,
+        errors=sorted(errors + apply_errors, key=lambda error: error["path"]),
+    )
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("用法: python -m app.markdown_sync 目录")
+        sys.exit(2)
+
+    from app.database import SessionLocal, init_database
+    init_database()
+    db = SessionLocal()
+    try:
+        result = sync_directory(db, sys.argv[1])
+    finally:
+        db.close()
+    print(f"新增 {result.created}，更新 {result.updated}，删除 {result.deleted}，未变化 {result.unchanged}")
+    for error in result.errors:
+        print(f"  ✗ {error.path}: {error.error}")
+    sys.exit(1 if result.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
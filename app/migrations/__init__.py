@@ -0,0 +1,183 @@
+"""
+数据库结构迁移
+- schema_migrations 表记录已执行的迁移版本，启动检查只读取最大版本号
+- 迁移脚本为本包内按版本号命名的模块（v001_xxx.py …），按版本顺序执行
+  每个模块提供 upgrade(conn)，可选提供 INDEXES（在线建立的索引，CREATE INDEX IF NOT EXISTS 语句）
+- 迁移脚本使用固定的SQL，不引用当前模型（v001 补建的是开始记录版本之前的表结构），之后修改模型不会改变已有迁移的行为
+- 新数据库不执行迁移脚本，直接按当前模型建表并记录全部版本；旧数据库（有表、无版本记录）从第一个迁移开始执行
+- 每个迁移一个事务（关闭外键检查，提交前校验外键）；索引在迁移事务之后逐个建立，
+  每个索引一个短事务，WAL模式下读请求不受影响，写请求最多等待一个索引
+- upgrade 必须可以重复执行（迁移中断后会从该版本重新开始）
+
+用法: python -m app.migrations [status|upgrade]
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.database import Base, engine
+
+VERSION_TABLE = "schema_migrations"
+
+
+class Migration(NamedTuple):
+    """迁移脚本"""
+    version: int
+    name: str
+    module: object
+
+
+def load_migrations() -> List[Migration]:
+    """按版本号顺序加载本包内的迁移模块（模块名形如 v001_name）"""
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        if info.name.startswith("v") and info.name[1:4].isdigit():
+            module = importlib.import_module(f"{__name__}.{info.name}")
+            migrations.append(Migration(int(info.name[1:4]), info.name, module))
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+
+def current_version(bind: Engine = engine) -> int:
+    """读取数据库的结构版本（一次查询；没有版本表时为0）"""
+    with bind.connect() as conn:
+        try:
+            return conn.execute(text(f"SELECT MAX(version) FROM {VERSION_TABLE}")).scalar() or 0
+        except OperationalError:
+            return 0
+
+
+def table_names(conn: Connection) -> set:
+    return set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+
+
+def column_names(conn: Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+
+
+def create_tables(conn: Connection) -> None:
+    """
+    按当前模型建全部表（只用于新数据库）
+    部分索引在普通索引之后建立：代价相同时 SQLite 选用后建立的索引，
+    例如分类页查询应使用 ix_prompts_active_category_created 而不是级联删除用的 ix_prompts_category_id
+    """
+    for table in Base.metadata.sorted_tables:
+        conn.execute(CreateTable(table))
+        for index in sorted(
+            table.indexes, key=lambda index: (index.dialect_options["sqlite"]["where"] is not None, index.name)
+        ):
+            conn.execute(CreateIndex(index))
+
+
+def rebuild_table(conn: Connection, table: str, create_sql: str) -> None:
+    """
+    重建表并保留数据和索引（SQLite 不能修改已有的列约束和外键）
+    create_sql 为新表的建表语句，表名写作 {table}；按新旧表共有的列复制数据
+    需要在关闭外键检查的迁移事务内执行
+    """
+    new_table = f"_new_{table}"
+    index_sql = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"),
+        {"table": table}
+    ).scalars().all()
+    old_columns = column_names(conn, table)
+    conn.execute(text(create_sql.format(table=new_table)))
+    columns = ", ".join(
+        name for name in (row[1] for row in conn.execute(text(f"PRAGMA table_info({new_table})")))
+        if name in old_columns
+    )
+    conn.execute(text(f"INSERT INTO {new_table} ({columns}) SELECT {columns} FROM {table}"))
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.execute(text(f"ALTER TABLE {new_table} RENAME TO {table}"))
+    for sql in index_sql:
+        conn.execute(text(sql))
+
+
+# 迁移模块引用上面的辅助函数，在其定义之后加载
+MIGRATIONS = load_migrations()
+LATEST_VERSION = MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def _begin(conn: Connection) -> None:
+    """显式开启写事务（pysqlite 不为DDL自动开启事务）"""
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _read_version(conn: Connection) -> int:
+    return conn.execute(text(f"SELECT MAX(version) FROM {VERSION_TABLE}")).scalar() or 0
+
+
+def _stamp(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text(f"INSERT INTO {VERSION_TABLE} (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+        {"version": migration.version, "name": migration.name, "applied_at": datetime.utcnow().isoformat(" ")}
+    )
+
+
+def _build_indexes(conn: Connection, indexes: Sequence[str]) -> None:
+    """逐个在线建立索引（每个索引一个事务，已存在的跳过）"""
+    for sql in indexes:
+        _begin(conn)
+        conn.execute(text(sql))
+        conn.commit()
+
+
+def migrate(bind: Engine = engine, target: Optional[int] = None) -> List[int]:
+    """
+    把数据库升级到最新（或指定）版本，返回本次执行的迁移版本号
+    多个进程同时启动时，每一步都在写锁内重新读取版本号，已执行的迁移不会重复执行
+    """
+    import app.models  # noqa: F401  确保全部模型已注册到元数据
+
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    with bind.connect() as conn:
+        # 外键检查只能在事务外切换；迁移期间关闭，每个迁移提交前校验
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.commit()
+        try:
+            _begin(conn)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+                "version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at DATETIME NOT NULL)"
+            ))
+            if _read_version(conn) == 0 and table_names(conn) <= {VERSION_TABLE}:
+                # 新数据库：按当前模型建表，记录全部版本
+                create_tables(conn)
+                for migration in MIGRATIONS:
+                    _stamp(conn, migration)
+                conn.commit()
+                return [migration.version for migration in MIGRATIONS]
+            conn.commit()
+
+            for migration in MIGRATIONS:
+                if migration.version > target:
+                    break
+                _begin(conn)
+                if _read_version(conn) >= migration.version:
+                    conn.rollback()
+                    continue
+                migration.module.upgrade(conn)
+                violations = conn.execute(text("PRAGMA foreign_key_check")).fetchall()
+                if violations:
+                    raise RuntimeError(f"迁移 {migration.name} 后外键校验失败: {violations[:5]}")
+                conn.commit()
+
+                _build_indexes(conn, getattr(migration.module, "INDEXES", ()))
+                _begin(conn)
+                _stamp(conn, migration)
+                conn.commit()
+                applied.append(migration.version)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+            conn.commit()
+    return applied
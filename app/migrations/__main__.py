@@ -0,0 +1,34 @@
+"""
+迁移命令行
+    python -m app.migrations status   查看当前版本和待执行的迁移
+    python -m app.migrations upgrade  执行待执行的迁移
+"""
+import sys
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.migrations import MIGRATIONS, current_version, migrate
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command not in ("status", "upgrade"):
+        print(__doc__)
+        sys.exit(2)
+
+    if command == "upgrade":
+        applied = migrate()
+        print(f"已执行 {len(applied)} 个迁移" if applied else "已是最新版本")
+
+    version = current_version()
+    print(f"当前版本: {version}")
+    for migration in MIGRATIONS:
+        print(f"  {'✓' if migration.version <= version else '·'} {migration.name}")
+    with engine.connect() as conn:
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+    print(f"日志模式: {journal_mode}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+基础表
+旧数据库由 create_all 建表，没有版本记录；缺失的表按开始记录版本之前的表结构补建（已存在的表不修改），
+之后的迁移再把它们逐步升级到当前结构
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.migrations import table_names
+
+# {表名: (建表语句, 索引语句)}，按外键依赖顺序排列
+TABLES = {
+    "cache_versions": ("""
+        CREATE TABLE cache_versions (
+            scope VARCHAR(30) NOT NULL,
+            version INTEGER NOT NULL,
+            updated_at DATETIME,
+            PRIMARY KEY (scope)
+        )""", ()),
+    "categories": ("""
+        CREATE TABLE categories (
+            id INTEGER NOT NULL,
+            name VARCHAR(50) NOT NULL,
+            description VARCHAR(200),
+            is_active BOOLEAN NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id)
+        )""", (
+        "CREATE INDEX ix_categories_id ON categories (id)",
+        "CREATE INDEX ix_categories_is_active ON categories (is_active)",
+        "CREATE UNIQUE INDEX ix_categories_name ON categories (name)",
+    )),
+    "tags": ("""
+        CREATE TABLE tags (
+            id INTEGER NOT NULL,
+            name VARCHAR(30) NOT NULL,
+            color VARCHAR(7),
+            is_active BOOLEAN NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id)
+        )""", (
+        "CREATE INDEX ix_tags_id ON tags (id)",
+        "CREATE INDEX ix_tags_is_active ON tags (is_active)",
+        "CREATE UNIQUE INDEX ix_tags_name ON tags (name)",
+    )),
+    "prompts": ("""
+        CREATE TABLE prompts (
+            id INTEGER NOT NULL,
+            title VARCHAR(200) NOT NULL,
+            content_markdown TEXT NOT NULL,
+            description VARCHAR(300),
+            category_id INTEGER,
+            is_featured BOOLEAN NOT NULL,
+            is_active BOOLEAN NOT NULL,
+            like_count INTEGER,
+            copy_count INTEGER,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(category_id) REFERENCES categories (id)
+        )""", (
+        "CREATE INDEX ix_prompts_category_id ON prompts (category_id)",
+        "CREATE INDEX ix_prompts_copy_count ON prompts (copy_count)",
+        "CREATE INDEX ix_prompts_created ON prompts (created_at)",
+        "CREATE INDEX ix_prompts_created_at ON prompts (created_at)",
+        "CREATE INDEX ix_prompts_id ON prompts (id)",
+        "CREATE INDEX ix_prompts_is_active ON prompts (is_active)",
+        "CREATE INDEX ix_prompts_is_featured ON prompts (is_featured)",
+        "CREATE INDEX ix_prompts_like_count ON prompts (like_count)",
+        "CREATE INDEX ix_prompts_stats ON prompts (like_count, copy_count)",
+        "CREATE INDEX ix_prompts_title ON prompts (title)",
+    )),
+    "prompt_likes": ("""
+        CREATE TABLE prompt_likes (
+            id INTEGER NOT NULL,
+            prompt_id INTEGER NOT NULL,
+            ip_hash VARCHAR(64) NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_prompt_like UNIQUE (prompt_id, ip_hash),
+            FOREIGN KEY(prompt_id) REFERENCES prompts (id)
+        )""", (
+        "CREATE INDEX ix_prompt_likes_ip ON prompt_likes (ip_hash)",
+        "CREATE INDEX ix_prompt_likes_prompt ON prompt_likes (prompt_id)",
+    )),
+    "prompt_tags": ("""
+        CREATE TABLE prompt_tags (
+            id INTEGER NOT NULL,
+            prompt_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_prompt_tag UNIQUE (prompt_id, tag_id),
+            FOREIGN KEY(prompt_id) REFERENCES prompts (id),
+            FOREIGN KEY(tag_id) REFERENCES tags (id)
+        )""", (
+        "CREATE INDEX ix_prompt_tags_prompt ON prompt_tags (prompt_id)",
+        "CREATE INDEX ix_prompt_tags_tag ON prompt_tags (tag_id)",
+    )),
+}
+
+
+def upgrade(conn: Connection) -> None:
+    existing = table_names(conn)
+    for table, (create_sql, index_sql) in TABLES.items():
+        if table in existing:
+            continue
+        conn.execute(text(create_sql))
+        for sql in index_sql:
+            conn.execute(text(sql))
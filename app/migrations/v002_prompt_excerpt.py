@@ -0,0 +1,22 @@
+"""
+prompts.excerpt: 内容预览摘要，按现有内容回填
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.migrations import column_names
+
+# 摘要长度（与当时的 EXCERPT_LENGTH 一致）
+EXCERPT_LENGTH = 150
+
+
+def upgrade(conn: Connection) -> None:
+    if "excerpt" in column_names(conn, "prompts"):
+        return
+    conn.execute(text("ALTER TABLE prompts ADD COLUMN excerpt VARCHAR(200)"))
+    conn.execute(text(
+        "UPDATE prompts SET excerpt = CASE "
+        "WHEN length(content_markdown) > :length "
+        "THEN substr(content_markdown, 1, :length) || '...' "
+        "ELSE content_markdown END"
+    ), {"length": EXCERPT_LENGTH})
@@ -0,0 +1,16 @@
+"""
+prompts.source_path / source_hash: Markdown目录同步的源文件路径和哈希
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.migrations import column_names
+
+
+def upgrade(conn: Connection) -> None:
+    if "source_path" in column_names(conn, "prompts"):
+        return
+    # SQLite 的 ADD COLUMN 不支持 UNIQUE，唯一约束用索引补上
+    conn.execute(text("ALTER TABLE prompts ADD COLUMN source_path VARCHAR(500)"))
+    conn.execute(text("ALTER TABLE prompts ADD COLUMN source_hash VARCHAR(64)"))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_prompts_source_path ON prompts (source_path)"))
@@ -0,0 +1,63 @@
+"""
+外键 ON DELETE CASCADE
+SQLite 不能修改已有的外键，外键不级联的表按下面的定义重建（数据和索引保留）
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.migrations import rebuild_table
+
+TABLES = {
+    "prompts": """
+        CREATE TABLE {table} (
+            id INTEGER NOT NULL,
+            title VARCHAR(200) NOT NULL,
+            content_markdown TEXT NOT NULL,
+            excerpt VARCHAR(200),
+            description VARCHAR(300),
+            category_id INTEGER,
+            is_featured BOOLEAN NOT NULL,
+            is_active BOOLEAN NOT NULL,
+            source_path VARCHAR(500),
+            source_hash VARCHAR(64),
+            like_count INTEGER,
+            copy_count INTEGER,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(category_id) REFERENCES categories (id) ON DELETE CASCADE,
+            UNIQUE (source_path)
+        )""",
+    "prompt_tags": """
+        CREATE TABLE {table} (
+            id INTEGER NOT NULL,
+            prompt_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_prompt_tag UNIQUE (prompt_id, tag_id),
+            FOREIGN KEY(prompt_id) REFERENCES prompts (id) ON DELETE CASCADE,
+            FOREIGN KEY(tag_id) REFERENCES tags (id) ON DELETE CASCADE
+        )""",
+    "prompt_likes": """
+        CREATE TABLE {table} (
+            id INTEGER NOT NULL,
+            prompt_id INTEGER NOT NULL,
+            ip_hash VARCHAR(64) NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_prompt_like UNIQUE (prompt_id, ip_hash),
+            FOREIGN KEY(prompt_id) REFERENCES prompts (id) ON DELETE CASCADE
+        )""",
+}
+
+
+def upgrade(conn: Connection) -> None:
+    for table, create_sql in TABLES.items():
+        actions = [row[6] for row in conn.execute(text(f"PRAGMA foreign_key_list({table})"))]
+        if all(action == "CASCADE" for action in actions):
+            continue
+        rebuild_table(conn, table, create_sql)
+        if table == "prompts":
+            # 新表自带 UNIQUE (source_path)，v003 补建的唯一索引重复
+            conn.execute(text("DROP INDEX IF EXISTS ix_prompts_source_path"))
@@ -0,0 +1,34 @@
+"""
+按公开查询形状建立索引
+删除主键上的重复索引、重复的 created_at 索引和单列布尔索引，
+改为只覆盖激活提示词的部分索引和标签页的覆盖索引（在线逐个建立）
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+OBSOLETE_INDEXES = (
+    "ix_categories_id", "ix_tags_id",
+    "ix_prompts_id", "ix_prompts_title", "ix_prompts_is_featured", "ix_prompts_is_active",
+    "ix_prompts_like_count", "ix_prompts_copy_count", "ix_prompts_created_at",
+    "ix_prompts_created", "ix_prompts_stats",
+    "ix_prompt_tags_prompt", "ix_prompt_tags_tag", "ix_prompt_likes_prompt",
+)
+
+# 级联删除用的 ix_prompts_category_id 先于部分索引建立（代价相同时 SQLite 选用后建立的索引）
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_prompts_category_id ON prompts (category_id)",
+    "CREATE INDEX IF NOT EXISTS ix_prompts_active_created ON prompts (created_at) WHERE is_active = 1",
+    "CREATE INDEX IF NOT EXISTS ix_prompts_active_likes ON prompts (like_count, created_at) WHERE is_active = 1",
+    "CREATE INDEX IF NOT EXISTS ix_prompts_active_copies ON prompts (copy_count, created_at) WHERE is_active = 1",
+    "CREATE INDEX IF NOT EXISTS ix_prompts_active_hot "
+    "ON prompts ((like_count + copy_count), created_at) WHERE is_active = 1",
+    "CREATE INDEX IF NOT EXISTS ix_prompts_active_category_created "
+    "ON prompts (category_id, created_at) WHERE is_active = 1",
+    "CREATE INDEX IF NOT EXISTS ix_prompt_tags_tag_prompt ON prompt_tags (tag_id, prompt_id)",
+    "CREATE INDEX IF NOT EXISTS ix_prompt_likes_ip ON prompt_likes (ip_hash)",
+)
+
+
+def upgrade(conn: Connection) -> None:
+    for name in OBSOLETE_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
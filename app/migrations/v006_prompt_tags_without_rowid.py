@@ -0,0 +1,26 @@
+"""
+prompt_tags 改为 WITHOUT ROWID 表
+去掉代理主键 id 和 created_at，按 (prompt_id, tag_id) 聚集存储；
+主键取代原唯一约束，只保留反向覆盖索引 ix_prompt_tags_tag_prompt
+"""
+from sqlalchemy.engine import Connection
+
+from app.migrations import column_names, rebuild_table
+
+CREATE_SQL = """
+    CREATE TABLE {table} (
+        prompt_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (prompt_id, tag_id),
+        FOREIGN KEY(prompt_id) REFERENCES prompts (id) ON DELETE CASCADE,
+        FOREIGN KEY(tag_id) REFERENCES tags (id) ON DELETE CASCADE
+    ) WITHOUT ROWID"""
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_prompt_tags_tag_prompt ON prompt_tags (tag_id, prompt_id)",
+)
+
+
+def upgrade(conn: Connection) -> None:
+    if "id" in column_names(conn, "prompt_tags"):
+        rebuild_table(conn, "prompt_tags", CREATE_SQL)
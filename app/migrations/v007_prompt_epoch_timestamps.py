@@ -0,0 +1,25 @@
+"""
+prompts.created_at / updated_at 改为整数毫秒（UTC纪元）
+原值为 DateTime 的ISO文本（"YYYY-MM-DD HH:MM:SS[.ffffff]"），原地换算，小数部分截断到毫秒；
+列声明的 DATETIME 为 NUMERIC 亲和性，整数按整数存储和比较，无需重建表（索引随 UPDATE 更新）
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.migrations import column_names
+
+EPOCH_MILLIS_SQL = (
+    "CAST(strftime('%s', substr({column}, 1, 19)) AS INTEGER) * 1000"
+    " + CAST(substr({column} || '.000', 21, 3) AS INTEGER)"
+)
+
+
+def upgrade(conn: Connection) -> None:
+    columns = column_names(conn, "prompts")
+    for column in ("created_at", "updated_at"):
+        if column not in columns:
+            continue
+        conn.execute(text(
+            f"UPDATE prompts SET {column} = {EPOCH_MILLIS_SQL.format(column=column)} "
+            f"WHERE typeof({column}) = 'text'"
+        ))
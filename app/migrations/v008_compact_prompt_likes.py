@@ -0,0 +1,48 @@
+"""
+prompt_likes 改为紧凑的 WITHOUT ROWID 表
+- ip_hash（16位十六进制文本）换算为64位有符号整数 ip_key（与 auth.like_key 一致，已有的去重记录继续有效）
+- created_at 改为整数毫秒；去掉代理主键 id、唯一约束和 ip_hash 索引，按 (prompt_id, ip_key) 聚集存储
+"""
+import hashlib
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.migrations import column_names
+from app.migrations.v007_prompt_epoch_timestamps import EPOCH_MILLIS_SQL
+
+CREATE_SQL = """
+    CREATE TABLE _new_prompt_likes (
+        prompt_id INTEGER NOT NULL,
+        ip_key BIGINT NOT NULL,
+        created_at BIGINT NOT NULL,
+        PRIMARY KEY (prompt_id, ip_key),
+        FOREIGN KEY(prompt_id) REFERENCES prompts (id) ON DELETE CASCADE
+    ) WITHOUT ROWID"""
+
+
+def hex_key(value: str) -> int:
+    """十六进制哈希的前16位换算为64位有符号整数（不是十六进制的旧值按其SHA-256换算，仍保持互不相同）"""
+    try:
+        digest = bytes.fromhex(value[:16])
+    except ValueError:
+        digest = hashlib.sha256(value.encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def upgrade(conn: Connection) -> None:
+    if "ip_hash" not in column_names(conn, "prompt_likes"):
+        return
+    conn.connection.driver_connection.create_function("hex_key", 1, hex_key, deterministic=True)
+    conn.execute(text(CREATE_SQL))
+    # 没有时间的旧记录按迁移时间计，之后按保留期正常清理
+    conn.execute(text(
+        "INSERT OR IGNORE INTO _new_prompt_likes (prompt_id, ip_key, created_at) "
+        f"SELECT prompt_id, hex_key(ip_hash), "
+        f"COALESCE({EPOCH_MILLIS_SQL.format(column='created_at')}, "
+        f"{EPOCH_MILLIS_SQL.format(column='datetime()')}) "
+        "FROM prompt_likes"
+    ))
+    # 旧表的索引（包括 v005 建立的 ix_prompt_likes_ip）随旧表一起删除
+    conn.execute(text("DROP TABLE prompt_likes"))
+    conn.execute(text("ALTER TABLE _new_prompt_likes RENAME TO prompt_likes"))
@@ -2,33 +2,68 @@
 数据库模型定义
 定义所有表结构和关系
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean,
-    ForeignKey, Index, UniqueConstraint
+    Column, BigInteger, Integer, String, Text, DateTime, Boolean,
+    ForeignKey, Index, TypeDecorator, text
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
 
+# 列表页内容预览长度
+EXCERPT_LENGTH = 150
+
+def make_excerpt(content: str) -> str:
+    """生成内容预览摘要（超出长度时截断并加省略号）"""
+    if len(content) > EXCERPT_LENGTH:
+        return content[:EXCERPT_LENGTH] + "..."
+    return content
+
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+class EpochMillis(TypeDecorator):
+    """
+    以整数毫秒（UTC纪元）存储的时间戳
+    比 DateTime 的ISO文本短，排序和索引按整数比较；ORM和查询结果中仍是 datetime（UTC，不带时区）
+    """
+    impl = BigInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return (value - EPOCH) // MILLISECOND
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return EPOCH + value * MILLISECOND
+
+def utcnow_millis() -> datetime:
+    """当前UTC时间（截断到毫秒，与 EpochMillis 列读回的值一致）"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
 class Category(Base):
     """分类表"""
     __tablename__ = "categories"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(50), unique=True, nullable=False, index=True)
     description = Column(String(200))
     is_active = Column(Boolean, default=True, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # 关系
-    prompts = relationship("Prompt", back_populates="category", cascade="all, delete-orphan")
+    # 关系（删除由外键 ON DELETE CASCADE 在数据库中级联，ORM不加载子记录）
+    prompts = relationship("Prompt", back_populates="category", cascade="all, delete-orphan", passive_deletes=True)
 
 class Tag(Base):
     """标签表"""
     __tablename__ = "tags"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(30), unique=True, nullable=False, index=True)
     color = Column(String(7), default="#3b82f6")  # 十六进制颜色值
     is_active = Column(Boolean, default=True, nullable=False, index=True)
@@ -36,34 +71,39 @@ class Tag(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # 关系
-    prompt_tags = relationship("PromptTag", back_populates="tag", cascade="all, delete-orphan")
+    prompt_tags = relationship("PromptTag", back_populates="tag", cascade="all, delete-orphan", passive_deletes=True)
 
 class Prompt(Base):
     """提示词主表"""
     __tablename__ = "prompts"
     
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(200), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    title = Column(String(200), nullable=False)
     content_markdown = Column(Text, nullable=False)
+    excerpt = Column(String(200))  # 内容预览摘要（列表页使用，无需加载完整内容）
     description = Column(String(300))  # 提示词描述
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True, index=True)
     
     # 状态字段
-    is_featured = Column(Boolean, default=False, nullable=False, index=True)  # 是否精选
-    is_active = Column(Boolean, default=True, nullable=False, index=True)  # 是否激活
+    is_featured = Column(Boolean, default=False, nullable=False)  # 是否精选
+    is_active = Column(Boolean, default=True, nullable=False)  # 是否激活
+    
+    # 源文件同步字段（由Markdown目录同步创建的提示词才有）
+    source_path = Column(String(500), unique=True, nullable=True)  # 相对于同步目录的文件路径
+    source_hash = Column(String(64), nullable=True)  # 文件内容的SHA-256
     
     # 统计字段
-    like_count = Column(Integer, default=0, index=True)
-    copy_count = Column(Integer, default=0, index=True)
+    like_count = Column(Integer, default=0)
+    copy_count = Column(Integer, default=0)
     
-    # 时间戳
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 时间戳（排序热点列，按整数毫秒存储）
+    created_at = Column(EpochMillis, default=utcnow_millis)
+    updated_at = Column(EpochMillis, default=utcnow_millis, onupdate=utcnow_millis)
     
     # 关系
     category = relationship("Category", back_populates="prompts")
-    prompt_tags = relationship("PromptTag", back_populates="prompt", cascade="all, delete-orphan")
-    likes = relationship("PromptLike", back_populates="prompt", cascade="all, delete-orphan")
+    prompt_tags = relationship("PromptTag", back_populates="prompt", cascade="all, delete-orphan", passive_deletes=True)
+    likes = relationship("PromptLike", back_populates="prompt", cascade="all, delete-orphan", passive_deletes=True)
     
     # 为Pydantic模型提供content属性
     @property
@@ -74,47 +114,68 @@ class Prompt(Base):
     def content(self, value):
         self.content_markdown = value
     
-    # 索引
+    @validates("content_markdown")
+    def _sync_excerpt(self, key, value):
+        """内容变化时同步更新预览摘要"""
+        self.excerpt = make_excerpt(value) if value is not None else None
+        return value
+    
+    # 索引：按公开列表的查询形状建立（公开查询都带 is_active = 1，用部分索引只收录激活的提示词）
+    # 每个索引与 _order_prompts 的排序一一对应，带上 created_at 使次级排序也由索引完成
     __table_args__ = (
-        Index('ix_prompts_stats', 'like_count', 'copy_count'),
-        Index('ix_prompts_created', 'created_at'),
+        Index('ix_prompts_active_created', 'created_at', sqlite_where=text('is_active = 1')),
+        Index('ix_prompts_active_likes', 'like_count', 'created_at', sqlite_where=text('is_active = 1')),
+        Index('ix_prompts_active_copies', 'copy_count', 'created_at', sqlite_where=text('is_active = 1')),
+        Index('ix_prompts_active_hot', text('(like_count + copy_count)'), 'created_at',
+              sqlite_where=text('is_active = 1')),
+        Index('ix_prompts_active_category_created', 'category_id', 'created_at',
+              sqlite_where=text('is_active = 1')),
     )
 
 class PromptTag(Base):
-    """提示词-标签多对多关联表"""
+    """
+    提示词-标签多对多关联表
+    WITHOUT ROWID 表按主键 (prompt_id, tag_id) 聚集存储：按提示词加载标签直接读主键B树，
+    主键同时防止重复关联；按标签筛选使用反向的覆盖索引
+    """
     __tablename__ = "prompt_tags"
     
-    id = Column(Integer, primary_key=True)
-    prompt_id = Column(Integer, ForeignKey("prompts.id"), nullable=False)
-    tag_id = Column(Integer, ForeignKey("tags.id"), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    prompt_id = Column(Integer, ForeignKey("prompts.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
     
     # 关系
     prompt = relationship("Prompt", back_populates="prompt_tags")
     tag = relationship("Tag", back_populates="prompt_tags")
     
-    # 唯一约束：防止重复关联
     __table_args__ = (
-        UniqueConstraint('prompt_id', 'tag_id', name='uq_prompt_tag'),
-        Index('ix_prompt_tags_prompt', 'prompt_id'),
-        Index('ix_prompt_tags_tag', 'tag_id'),
+        # 按标签筛选的覆盖索引
+        Index('ix_prompt_tags_tag_prompt', 'tag_id', 'prompt_id'),
+        {"sqlite_with_rowid": False},
     )
 
 class PromptLike(Base):
-    """点赞记录表（防重复点赞）"""
+    """
+    点赞去重记录（同一IP对同一提示词只计一次）
+    WITHOUT ROWID 表按 (prompt_id, ip_key) 聚集存储，ip_key 为IP地址哈希的64位整数，没有其他索引；
+    点赞数记在 prompts.like_count，过期记录按保留期清理不影响计数
+    """
     __tablename__ = "prompt_likes"
     
-    id = Column(Integer, primary_key=True)
-    prompt_id = Column(Integer, ForeignKey("prompts.id"), nullable=False)
-    ip_hash = Column(String(64), nullable=False)  # IP地址的哈希值
-    created_at = Column(DateTime, default=datetime.utcnow)
+    prompt_id = Column(Integer, ForeignKey("prompts.id", ondelete="CASCADE"), primary_key=True)
+    ip_key = Column(BigInteger, primary_key=True, autoincrement=False)  # auth.like_key(IP)
+    created_at = Column(EpochMillis, default=utcnow_millis, nullable=False)
     
     # 关系
     prompt = relationship("Prompt", back_populates="likes")
     
-    # 唯一约束：同一IP只能为同一提示词点赞一次
     __table_args__ = (
-        UniqueConstraint('prompt_id', 'ip_hash', name='uq_prompt_like'),
-        Index('ix_prompt_likes_prompt', 'prompt_id'),
-        Index('ix_prompt_likes_ip', 'ip_hash'),
-    ) 
\ No newline at end of file
+        {"sqlite_with_rowid": False},
+    )
+
+class CacheVersion(Base):
+    """缓存版本表（跨进程缓存失效）"""
+    __tablename__ = "cache_versions"
+    
+    scope = Column(String(30), primary_key=True)  # 缓存作用域，如 prompts / categories / tags
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,116 @@
+"""
+只读列表投影
+- 列表页只查询需要的列（不含完整内容 content_markdown），直接构造不可变的命名元组
+- 不经过ORM实例化、身份映射和属性监测
+- 字段名与ORM模型一致，模板和 PromptRead / CategoryRead / TagRead 可以直接使用
+- 管理列表的稀疏字段集：输出字段名到列的映射，只查询请求的列
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.models import Category, Tag, Prompt
+
+
+class CategoryRow(NamedTuple):
+    """分类投影"""
+    id: int
+    name: str
+    description: Optional[str]
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+    prompt_count: int = 0
+
+
+class TagRow(NamedTuple):
+    """标签投影"""
+    id: int
+    name: str
+    color: Optional[str]
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+    usage_count: int = 0
+
+
+class PromptRow(NamedTuple):
+    """提示词列表投影（只有预览摘要，不含完整内容）"""
+    id: int
+    title: str
+    description: Optional[str]
+    excerpt: Optional[str]
+    category_id: Optional[int]
+    is_featured: bool
+    is_active: bool
+    like_count: int
+    copy_count: int
+    created_at: datetime
+    updated_at: datetime
+    category: Optional[CategoryRow] = None
+    tags: Tuple[TagRow, ...] = ()
+    tag_ids: Tuple[int, ...] = ()
+    content: Optional[str] = None
+
+
+# 各投影查询的列（顺序与命名元组字段一致）
+CATEGORY_ROW_COLUMNS = (
+    Category.id, Category.name, Category.description, Category.is_active,
+    Category.created_at, Category.updated_at,
+)
+
+TAG_ROW_COLUMNS = (
+    Tag.id, Tag.name, Tag.color, Tag.is_active, Tag.created_at, Tag.updated_at,
+)
+
+PROMPT_ROW_COLUMNS = (
+    Prompt.id, Prompt.title, Prompt.description, Prompt.excerpt, Prompt.category_id,
+    Prompt.is_featured, Prompt.is_active, Prompt.like_count, Prompt.copy_count,
+    Prompt.created_at, Prompt.updated_at,
+)
+
+
+# 稀疏字段集：{输出字段名: 列}（提示词的 content 对应 content_markdown）
+CATEGORY_FIELDS: Dict[str, InstrumentedAttribute] = {column.key: column for column in CATEGORY_ROW_COLUMNS}
+
+TAG_FIELDS: Dict[str, InstrumentedAttribute] = {column.key: column for column in TAG_ROW_COLUMNS}
+
+PROMPT_FIELDS: Dict[str, InstrumentedAttribute] = {
+    "id": Prompt.id,
+    "title": Prompt.title,
+    "content": Prompt.content_markdown,
+    "excerpt": Prompt.excerpt,
+    "description": Prompt.description,
+    "category_id": Prompt.category_id,
+    "is_featured": Prompt.is_featured,
+    "is_active": Prompt.is_active,
+    "like_count": Prompt.like_count,
+    "copy_count": Prompt.copy_count,
+    "created_at": Prompt.created_at,
+    "updated_at": Prompt.updated_at,
+}
+
+# 不对应列、需要查询关联表的字段
+PROMPT_TAG_IDS_FIELD = "tag_ids"
+
+# 可展开的关联（计数也视为关联，按需查询）
+CATEGORY_EXPANDS = ("prompt_count",)
+TAG_EXPANDS = ("usage_count",)
+PROMPT_EXPANDS = ("category", "tags")
+
+
+def parse_names(value: Optional[str], allowed: Iterable[str], kind: str) -> Optional[List[str]]:
+    """
+    解析逗号分隔的字段或关联列表
+    - 未指定时返回None，空字符串返回空列表
+    - 去重并保持顺序；包含未知名称时抛出ValueError
+    """
+    if value is None:
+        return None
+    allowed = set(allowed)
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"未知的{kind}: {', '.join(unknown)}（可选: {', '.join(sorted(allowed))}）")
+    return names
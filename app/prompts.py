@@ -2,24 +2,37 @@
 提示词管理API端点
 提供提示词的CRUD操作，需要管理员认证
 """
+import os
+from datetime import timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.models import utcnow_millis
 from app.auth import verify_admin_credentials
 from app.crud import (
-    create_prompt, get_prompt_by_id, get_prompts, 
-    update_prompt, delete_prompt,
-    get_category_by_id, get_tag_by_id
+    create_prompt, get_prompt_by_id, get_prompts, get_prompt_dicts, get_prompt_rows_by_ids,
+    update_prompt, delete_prompt, retag_prompts, bulk_update_prompts, bulk_delete_prompts,
+    compact_prompt_likes
 )
+from app.projections import PROMPT_FIELDS, PROMPT_TAG_IDS_FIELD, PROMPT_EXPANDS, parse_names
+from app.serialization import ORJSONResponse, page_payload, prompt_row_dict
 from app.schemas import (
     PromptCreate, PromptUpdate, PromptRead, PromptList,
+    PromptBatchRequest, PromptBatchResponse, PromptRetag, PromptBulkUpdate, PromptBulkDelete,
+    MAX_BATCH_IDS,
     MessageResponse, ErrorResponse
 )
 
 router = APIRouter(prefix="/admin/prompts", tags=["提示词管理"])
 
+# 点赞去重记录的默认保留天数（超过后可由 /admin/prompts/likes/compact 清理，同一IP可以再次点赞）
+LIKE_RETENTION_DAYS = int(os.getenv("LIKE_RETENTION_DAYS", "365"))
+
+# 稀疏字段集可选的字段（未指定 fields 时返回全部）
+PROMPT_FIELD_NAMES = (*PROMPT_FIELDS, PROMPT_TAG_IDS_FIELD)
+
 
 @router.post("/", 
              response_model=PromptRead,
@@ -33,10 +46,8 @@ async def create_prompt_endpoint(
 ):
     """创建提示词"""
     try:
-        new_prompt = create_prompt(db, prompt_data)
-        # 获取完整的提示词信息（包含关联数据）
-        full_prompt = get_prompt_by_id(db, new_prompt.id, include_relations=True)
-        return full_prompt
+        # 返回写入事务内构造的投影（含分类和标签），无需提交后重新查询
+        return create_prompt(db, prompt_data)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,11 +67,37 @@ async def get_prompts_endpoint(
     is_featured: Optional[bool] = Query(None, description="是否精选"),
     is_active: Optional[bool] = Query(None, description="是否激活"),
     include_relations: bool = Query(True, description="包含分类和标签信息"),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,title,like_count）"),
+    expand: Optional[str] = Query(None, description="展开的关联（逗号分隔：category,tags），指定 fields 或 expand 时不再按 include_relations 加载"),
     admin_verified: bool = Depends(verify_admin_credentials),
     db: Session = Depends(get_db)
 ):
     """获取提示词列表"""
     skip = (page - 1) * per_page
+    
+    # 稀疏字段集：只查询请求的列和关联
+    if fields is not None or expand is not None:
+        try:
+            field_names = parse_names(fields, PROMPT_FIELD_NAMES, "字段")
+            expand_names = parse_names(expand, PROMPT_EXPANDS, "关联")
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        items, total = get_prompt_dicts(
+            db,
+            fields=PROMPT_FIELD_NAMES if field_names is None else field_names,
+            expand=expand_names or (),
+            skip=skip,
+            limit=per_page,
+            category_id=category_id,
+            tag_id=tag_id,
+            is_featured=is_featured,
+            is_active=is_active
+        )
+        return ORJSONResponse(page_payload(items, total, page, per_page))
+    
     prompts, total = get_prompts(
         db, 
         skip=skip, 
@@ -87,6 +124,153 @@ async def get_prompts_endpoint(
     )
 
 
+def batch_response(db: Session, prompt_ids: List[int]) -> ORJSONResponse:
+    """按请求顺序组装批量获取结果（不存在的ID对应null并列入missing）"""
+    found = get_prompt_rows_by_ids(db, prompt_ids)
+    return ORJSONResponse({
+        "items": [prompt_row_dict(found[prompt_id]) if prompt_id in found else None for prompt_id in prompt_ids],
+        "missing": list(dict.fromkeys(prompt_id for prompt_id in prompt_ids if prompt_id not in found)),
+    })
+
+
+# 批量获取路由需要在 /{prompt_id} 之前声明，否则 "batch" 会被当作ID匹配
+@router.get("/batch",
+            response_model=PromptBatchResponse,
+            summary="批量获取提示词",
+            description=f"按ID列表批量获取提示词（逗号分隔，最多 {MAX_BATCH_IDS} 个），结果按请求顺序返回")
+async def get_prompts_batch_endpoint(
+    ids: str = Query(..., description="逗号分隔的提示词ID，如 1,5,3"),
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """批量获取提示词"""
+    try:
+        prompt_ids = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids 必须是逗号分隔的整数"
+        )
+    if not prompt_ids or len(prompt_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"ids 数量必须在 1 到 {MAX_BATCH_IDS} 之间"
+        )
+    return batch_response(db, prompt_ids)
+
+
+@router.post("/batch",
+             response_model=PromptBatchResponse,
+             summary="批量获取提示词（请求体）",
+             description="ID较多、超出URL长度时使用，结果按请求顺序返回")
+async def post_prompts_batch_endpoint(
+    batch: PromptBatchRequest,
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """批量获取提示词"""
+    return batch_response(db, batch.ids)
+
+
+@router.post("/retag",
+             response_model=MessageResponse,
+             summary="批量调整分类和标签",
+             description="对筛选出的一组提示词批量改分类、添加或移除标签，在一个事务内完成")
+async def retag_prompts_endpoint(
+    retag: PromptRetag,
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """批量调整分类和标签"""
+    try:
+        matched = retag_prompts(
+            db, retag.where,
+            category_id=retag.category_id,
+            add_tag_ids=retag.add_tag_ids,
+            remove_tag_ids=retag.remove_tag_ids
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return MessageResponse(
+        message=f"已调整 {matched} 个提示词",
+        success=True,
+        data={"matched": matched}
+    )
+
+
+@router.patch("/",
+              response_model=MessageResponse,
+              summary="批量更新提示词状态",
+              description="对ID列表或筛选条件（分类、标签、精选、激活）选出的提示词批量设置精选/激活状态，一条语句完成")
+async def bulk_update_prompts_endpoint(
+    bulk: PromptBulkUpdate,
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """批量更新提示词状态"""
+    try:
+        affected = bulk_update_prompts(db, bulk.where, bulk.model_dump(exclude_none=True, exclude={"where"}))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return MessageResponse(
+        message=f"已更新 {affected} 个提示词",
+        success=True,
+        data={"affected": affected}
+    )
+
+
+@router.delete("/",
+               response_model=MessageResponse,
+               summary="批量删除提示词",
+               description="删除ID列表或筛选条件选出的提示词，标签关联和点赞记录由数据库级联删除")
+async def bulk_delete_prompts_endpoint(
+    bulk: PromptBulkDelete,
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """批量删除提示词"""
+    try:
+        affected = bulk_delete_prompts(db, bulk.where)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return MessageResponse(
+        message=f"已删除 {affected} 个提示词",
+        success=True,
+        data={"affected": affected}
+    )
+
+
+@router.post("/likes/compact",
+             response_model=MessageResponse,
+             summary="清理过期的点赞记录",
+             description="删除超过保留天数的点赞去重记录，点赞数不变；保留期内同一IP仍不能重复点赞")
+async def compact_likes_endpoint(
+    retention_days: Optional[int] = Query(None, ge=1, description="保留天数（默认 LIKE_RETENTION_DAYS）"),
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """清理过期的点赞记录"""
+    days = retention_days or LIKE_RETENTION_DAYS
+    deleted = compact_prompt_likes(db, utcnow_millis() - timedelta(days=days))
+    return MessageResponse(
+        message=f"已清理 {deleted} 条 {days} 天前的点赞记录",
+        success=True,
+        data={"deleted": deleted, "retention_days": days}
+    )
+
+
 @router.get("/{prompt_id}",
             response_model=PromptRead,
             summary="获取提示词详情",
@@ -125,10 +309,7 @@ async def update_prompt_endpoint(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"提示词 ID {prompt_id} 不存在"
             )
-        
-        # 获取完整的提示词信息（包含关联数据）
-        full_prompt = get_prompt_by_id(db, prompt_id, include_relations=True)
-        return full_prompt
+        return updated_prompt
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
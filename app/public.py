@@ -2,20 +2,112 @@
 公开页面路由
 提供提示词浏览和展示功能
 """
-from typing import Optional
+import os
+from typing import Iterable, List, Optional, Tuple
 from fastapi import APIRouter, Depends, Request, HTTPException, Query
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
+from app.projections import PromptRow
+from app.cache import register_cache, get_cache_stamp, ALL_SCOPES
+from app.http_cache import make_etag, build_validators, is_not_modified, not_modified_response
+from app.compression import minify_html
+from app.assets import manifest
+from app.templating import templates, stream_template, current_template_fingerprint
 from app.crud import (
-    get_prompts, get_prompts_by_category_name, get_prompts_by_tag_name,
-    get_categories, get_tags
+    get_prompt_rows, iter_prompt_rows, count_prompts,
+    get_category_by_name, get_tag_by_name, get_categories, get_tags
 )
 
-templates = Jinja2Templates(directory="templates")
 router = APIRouter(tags=["公开页面"])
 
+# 流式渲染列表页：先发送页头和导航，提示词卡片随游标逐批渲染发送
+STREAM_PAGES = os.getenv("STREAM_PAGES", "0") == "1"
+
+# 导航用分类/标签缓存（计数依赖提示词，因此依赖全部作用域）
+taxonomy_cache = register_cache("public_taxonomy", scopes=ALL_SCOPES, maxsize=1)
+
+# 渲染结果缓存：{ETag: 压缩空白后的HTML}
+# ETag已包含数据版本号，作用域失效只用于及时释放旧版本占用的内存
+page_cache = register_cache("public_pages", scopes=ALL_SCOPES, maxsize=256)
+
+def get_navigation_taxonomy(db: Session) -> Tuple[List[dict], List[dict]]:
+    """获取导航和筛选菜单用的分类、标签列表（带计数，进程内缓存）"""
+    cached = taxonomy_cache.get("nav")
+    if cached is not None:
+        return cached
+    
+    categories, _ = get_categories(db, active_only=True, include_count=True)
+    tags, _ = get_tags(db, active_only=True, include_count=True)
+    
+    # 缓存普通字典而不是ORM对象，避免跨会话使用游离实例
+    cached = (
+        [{"name": c.name, "prompt_count": c.prompt_count} for c in categories],
+        [{"name": t.name, "color": t.color, "usage_count": t.usage_count} for t in tags],
+    )
+    taxonomy_cache.set("nav", cached)
+    return cached
+
+def page_validators(request: Request) -> dict:
+    """
+    计算列表页面的ETag和Last-Modified
+    页面包含全站分类/标签计数，因此使用全局数据版本戳（不查询数据库）
+    """
+    versions, last_modified = get_cache_stamp(ALL_SCOPES)
+    etag = make_etag(
+        current_template_fingerprint(),
+        manifest.fingerprint,  # 静态资源变化后页面中的哈希URL随之变化
+        str(request.base_url),  # 页面中的静态文件URL是绝对地址
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        *versions
+    )
+    return build_validators(etag, last_modified)
+
+def cached_page(validators: dict) -> Optional[HTMLResponse]:
+    """返回当前数据版本下已渲染的页面"""
+    body = page_cache.get(validators["ETag"])
+    if body is None:
+        return None
+    return HTMLResponse(body, headers=validators)
+
+class StreamedPrompts:
+    """
+    渲染时才读取的提示词列表（流式渲染用）
+    请求依赖的数据库会话在流式响应发送前就会关闭，因此迭代时使用独立会话
+    """
+    
+    def __init__(self, **query):
+        self.query = query
+    
+    def __iter__(self):
+        db = SessionLocal()
+        try:
+            yield from iter_prompt_rows(db, **self.query)
+        finally:
+            db.close()
+
+def list_prompts(db: Session, skip: int, limit: int, order_by: str, **filters) -> Tuple[Iterable[PromptRow], int]:
+    """获取列表页的提示词投影和总数（流式渲染时只统计总数，提示词在渲染时逐批读取）"""
+    if STREAM_PAGES:
+        total = count_prompts(db, **filters)
+        return StreamedPrompts(skip=skip, limit=limit, order_by=order_by, **filters), total
+    return get_prompt_rows(db, skip=skip, limit=limit, order_by=order_by, **filters)
+
+def render_page(request: Request, name: str, context: dict, validators: dict):
+    """渲染页面、压缩空白并按ETag缓存（流式渲染时边渲染边发送，不缓存）"""
+    if STREAM_PAGES:
+        return StreamingResponse(
+            stream_template(name, {"request": request, **context}),
+            media_type="text/html",
+            headers=validators
+        )
+    html = templates.get_template(name).render({"request": request, **context})
+    body = minify_html(html).encode("utf-8")
+    page_cache.set(validators["ETag"], body)
+    return HTMLResponse(body, headers=validators)
+
 def get_pagination_info(page: int, per_page: int, total: int) -> dict:
     """计算分页信息"""
     total_pages = (total + per_page - 1) // per_page
@@ -34,6 +126,7 @@ def get_pagination_info(page: int, per_page: int, total: int) -> dict:
         "total_pages": total_pages,
         "has_next": has_next,
         "has_prev": has_prev,
+        "has_items": page <= total_pages,
         "page_range": page_range,
         "start_page": start_page,
         "end_page": end_page
@@ -50,6 +143,15 @@ async def homepage(
     db: Session = Depends(get_db)
 ):
     """主页 - 提示词列表"""
+    # 条件请求：数据版本未变化时直接返回304，不执行任何列表查询
+    validators = page_validators(request)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    
+    rendered = cached_page(validators)
+    if rendered is not None:
+        return rendered
+    
     skip = (page - 1) * per_page
     
     # 获取筛选参数
@@ -57,40 +159,36 @@ async def homepage(
     tag_id = None
     
     if category:
-        from app.crud import get_category_by_name
         cat = get_category_by_name(db, category)
         if cat:
             category_id = cat.id
     
     if tag:
-        from app.crud import get_tag_by_name
         tag_obj = get_tag_by_name(db, tag)
         if tag_obj:
             tag_id = tag_obj.id
     
     # 获取提示词列表
-    prompts, total = get_prompts(
-        db=db,
+    prompts, total = list_prompts(
+        db,
         skip=skip,
         limit=per_page,
+        order_by=sort,
         category_id=category_id,
         tag_id=tag_id,
-        is_active=True,
-        include_relations=True,
-        order_by=sort
+        is_active=True
     )
     
     # 获取分类和标签列表用于筛选菜单
-    categories, _ = get_categories(db, active_only=True, include_count=True)
-    tags, _ = get_tags(db, active_only=True, include_count=True)
+    categories, tags = get_navigation_taxonomy(db)
     
     # 计算分页信息
     pagination = get_pagination_info(page, per_page, total)
     
-    return templates.TemplateResponse(
-        request=request,
-        name="index.html",
-        context={
+    return render_page(
+        request,
+        "index.html",
+        {
             "title": "提示词分享平台",
             "description": "发现和分享优质的AI提示词",
             "prompts": prompts,
@@ -106,7 +204,8 @@ async def homepage(
                 {"value": "like_count", "label": "最多点赞"},
                 {"value": "copy_count", "label": "最多复制"}
             ]
-        }
+        },
+        validators
     )
 
 @router.get("/category/{category_name}")
@@ -119,31 +218,41 @@ async def category_page(
     db: Session = Depends(get_db)
 ):
     """分类筛选页面"""
+    # 条件请求：数据版本未变化时直接返回304，不执行任何列表查询
+    validators = page_validators(request)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    
+    rendered = cached_page(validators)
+    if rendered is not None:
+        return rendered
+    
     skip = (page - 1) * per_page
     
+    category = get_category_by_name(db, category_name)
+    if not category:
+        raise HTTPException(status_code=404, detail=f"分类 '{category_name}' 不存在")
+    
     # 获取该分类下的提示词
-    prompts, total, category = get_prompts_by_category_name(
-        db=db,
-        category_name=category_name,
+    prompts, total = list_prompts(
+        db,
         skip=skip,
         limit=per_page,
-        order_by=sort
+        order_by=sort,
+        category_id=category.id,
+        is_active=True
     )
     
-    if not category:
-        raise HTTPException(status_code=404, detail=f"分类 '{category_name}' 不存在")
-    
     # 获取所有分类和标签用于导航
-    categories, _ = get_categories(db, active_only=True, include_count=True)
-    tags, _ = get_tags(db, active_only=True, include_count=True)
+    categories, tags = get_navigation_taxonomy(db)
     
     # 计算分页信息
     pagination = get_pagination_info(page, per_page, total)
     
-    return templates.TemplateResponse(
-        request=request,
-        name="category.html",
-        context={
+    return render_page(
+        request,
+        "category.html",
+        {
             "title": f"分类：{category.name}",
             "description": category.description or f"浏览 {category.name} 分类的所有提示词",
             "category": category,
@@ -158,7 +267,8 @@ async def category_page(
                 {"value": "like_count", "label": "最多点赞"},
                 {"value": "copy_count", "label": "最多复制"}
             ]
-        }
+        },
+        validators
     )
 
 @router.get("/tag/{tag_name}")
@@ -171,31 +281,41 @@ async def tag_page(
     db: Session = Depends(get_db)
 ):
     """标签筛选页面"""
+    # 条件请求：数据版本未变化时直接返回304，不执行任何列表查询
+    validators = page_validators(request)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    
+    rendered = cached_page(validators)
+    if rendered is not None:
+        return rendered
+    
     skip = (page - 1) * per_page
     
+    tag = get_tag_by_name(db, tag_name)
+    if not tag:
+        raise HTTPException(status_code=404, detail=f"标签 '{tag_name}' 不存在")
+    
     # 获取该标签下的提示词
-    prompts, total, tag = get_prompts_by_tag_name(
-        db=db,
-        tag_name=tag_name,
+    prompts, total = list_prompts(
+        db,
         skip=skip,
         limit=per_page,
-        order_by=sort
+        order_by=sort,
+        tag_id=tag.id,
+        is_active=True
     )
     
-    if not tag:
-        raise HTTPException(status_code=404, detail=f"标签 '{tag_name}' 不存在")
-    
     # 获取所有分类和标签用于导航
-    categories, _ = get_categories(db, active_only=True, include_count=True)
-    tags, _ = get_tags(db, active_only=True, include_count=True)
+    categories, tags = get_navigation_taxonomy(db)
     
     # 计算分页信息
     pagination = get_pagination_info(page, per_page, total)
     
-    return templates.TemplateResponse(
-        request=request,
-        name="tag.html",
-        context={
+    return render_page(
+        request,
+        "tag.html",
+        {
             "title": f"标签：{tag.name}",
             "description": f"浏览带有 {tag.name} 标签的所有提示词",
             "tag": tag,
@@ -210,5 +330,6 @@ async def tag_page(
                 {"value": "like_count", "label": "最多点赞"},
                 {"value": "copy_count", "label": "最多复制"}
             ]
-        }
+        },
+        validators
     ) 
\ No newline at end of file
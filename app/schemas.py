@@ -3,7 +3,7 @@ Pydantic模型定义
 用于API输入输出数据验证和序列化
 """
 from datetime import datetime
-from typing import Optional, List
+from typing import Annotated, Optional, List
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -122,7 +122,8 @@ class PromptRead(TimestampMixin):
     """提示词输出模型"""
     id: int = Field(..., description="提示词ID")
     title: str = Field(..., description="提示词标题")
-    content: str = Field(..., description="提示词内容")
+    content: Optional[str] = Field(None, description="提示词内容（列表投影不含完整内容）")
+    excerpt: Optional[str] = Field(None, description="内容预览摘要")
     description: Optional[str] = Field(None, description="提示词描述")
     category_id: int = Field(..., description="分类ID")
     tag_ids: List[int] = Field(default=[], description="标签ID列表")
@@ -146,6 +147,76 @@ class PromptList(BaseModel):
     has_prev: bool = Field(False, description="是否有上一页")
 
 
+# 批量获取单次最多的提示词ID数
+MAX_BATCH_IDS = 500
+
+
+class PromptBatchRequest(BaseModel):
+    """批量获取提示词的输入模型"""
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS, description="提示词ID列表")
+
+
+class PromptBatchResponse(BaseModel):
+    """批量获取提示词响应模型"""
+    items: List[Optional[PromptRead]] = Field(..., description="按请求顺序排列的提示词，不存在的ID对应null")
+    missing: List[int] = Field(default=[], description="不存在的提示词ID")
+
+
+class PromptSelection(BaseModel):
+    """批量操作的提示词范围（各条件同时提供时取交集，至少需要一个条件）"""
+    ids: Optional[List[int]] = Field(None, min_length=1, description="提示词ID列表")
+    category_id: Optional[int] = Field(None, description="分类ID")
+    tag_id: Optional[int] = Field(None, description="标签ID")
+    is_featured: Optional[bool] = Field(None, description="是否精选")
+    is_active: Optional[bool] = Field(None, description="是否激活")
+
+
+class PromptRetag(BaseModel):
+    """批量调整分类和标签的输入模型"""
+    where: PromptSelection = Field(..., description="要调整的提示词范围")
+    category_id: Optional[int] = Field(None, description="改为该分类")
+    add_tag_ids: List[int] = Field(default=[], description="添加的标签ID列表（已有的关联保持不变）")
+    remove_tag_ids: List[int] = Field(default=[], description="移除的标签ID列表")
+
+
+class PromptBulkUpdate(BaseModel):
+    """批量更新状态的输入模型（只更新提供的字段）"""
+    where: PromptSelection = Field(..., description="要更新的提示词范围")
+    is_featured: Optional[bool] = Field(None, description="是否精选")
+    is_active: Optional[bool] = Field(None, description="是否激活")
+
+
+class PromptBulkDelete(BaseModel):
+    """批量删除的输入模型"""
+    where: PromptSelection = Field(..., description="要删除的提示词范围")
+
+
+class PromptImport(BaseModel):
+    """批量导入的单条提示词（分类、标签可用名称或ID，同时提供时以名称为准）"""
+    title: str = Field(..., min_length=1, max_length=100, description="提示词标题")
+    content: str = Field(..., min_length=1, max_length=5000, description="提示词内容")
+    description: Optional[str] = Field(None, max_length=300, description="提示词描述")
+    category: Optional[str] = Field(None, min_length=1, max_length=50, description="分类名称")
+    category_id: Optional[int] = Field(None, description="分类ID")
+    tags: List[Annotated[str, Field(min_length=1, max_length=30)]] = Field(default=[], description="标签名称列表")
+    tag_ids: List[int] = Field(default=[], description="标签ID列表")
+    is_featured: bool = Field(False, description="是否精选")
+    is_active: bool = Field(True, description="是否激活")
+
+
+class ImportRowError(BaseModel):
+    """导入失败的行"""
+    row: int = Field(..., description="行号（NDJSON）或序号（JSON数组），从1开始")
+    error: str = Field(..., description="失败原因")
+
+
+class ImportResult(BaseModel):
+    """批量导入结果"""
+    created: int = Field(..., description="成功导入的数量")
+    failed: int = Field(..., description="失败的数量")
+    errors: List[ImportRowError] = Field(default=[], description="逐行错误")
+
+
 # 通用响应模型
 class MessageResponse(BaseModel):
     """通用消息响应模型"""
@@ -158,4 +229,18 @@ class ErrorResponse(BaseModel):
     """错误响应模型"""
     detail: str = Field(..., description="错误详情")
     error_code: Optional[str] = Field(None, description="错误代码")
-    timestamp: datetime = Field(default_factory=datetime.now, description="错误时间") 
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=datetime.now, description="错误时间") 
+
+class SyncFileError(BaseModel):
+    """同步失败的源文件"""
+    path: str = Field(..., description="相对于同步目录的文件路径")
+    error: str = Field(..., description="失败原因")
+
+
+class SyncResult(BaseModel):
+    """Markdown目录同步结果"""
+    created: int = Field(0, description="新增的提示词数量")
+    updated: int = Field(0, description="内容变化而更新的数量")
+    deleted: int = Field(0, description="源文件已删除而删除的数量")
+    unchanged: int = Field(0, description="哈希未变化而跳过的数量")
+    errors: List[SyncFileError] = Field(default=[], description="无法解析或应用的文件")
@@ -0,0 +1,73 @@
+"""
+JSON序列化快速路径
+- ORJSONResponse：orjson 直接输出字节，datetime 等类型原生支持
+- 投影行直接转为字典，不经过Pydantic模型重新校验
+- TypeAdapter 按类型缓存（只在构建时有开销，不必每次请求重新生成校验器）
+"""
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.projections import PromptRow
+
+# 非字符串键按字符串输出（与标准库 json 一致）
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """orjson 不支持的类型：Pydantic模型按JSON模式导出"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"无法序列化类型 {type(value).__name__}")
+
+
+def dump_json(content: Any) -> bytes:
+    """序列化为JSON字节"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """orjson 序列化的JSON响应（已序列化的字节原样发送）"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    """获取类型的 TypeAdapter（按类型缓存）"""
+    return TypeAdapter(schema)
+
+
+def dump_models(schema: Any, value: Any) -> bytes:
+    """按Pydantic类型校验并直接输出JSON字节（用于ORM对象等需要校验的数据）"""
+    adapter = type_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def prompt_row_dict(row: PromptRow) -> Dict[str, Any]:
+    """提示词投影行转为字典（字段与 PromptRead 一致）"""
+    data = row._asdict()
+    data["category"] = row.category._asdict() if row.category is not None else None
+    data["tags"] = [tag._asdict() for tag in row.tags]
+    data["tag_ids"] = list(row.tag_ids)
+    return data
+
+
+
+def page_payload(items: List[Any], total: int, page: int, per_page: int) -> Dict[str, Any]:
+    """分页列表响应（字段与 PromptList / CategoryList / TagList 一致）"""
+    total_pages = (total + per_page - 1) // per_page
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "has_next": page < total_pages,
+        "has_prev": page > 1,
+    }
@@ -10,8 +10,10 @@ from app.database import get_db
 from app.auth import verify_admin_credentials
 from app.crud import (
     create_tag, get_tag_by_id, get_tag_by_name, 
-    get_tags, update_tag, delete_tag
+    get_tags, get_tag_dicts, update_tag, delete_tag, merge_tag
 )
+from app.projections import TAG_FIELDS, TAG_EXPANDS, parse_names
+from app.serialization import ORJSONResponse, page_payload
 from app.schemas import (
     TagCreate, TagUpdate, TagRead, TagList,
     MessageResponse, ErrorResponse
@@ -60,11 +62,34 @@ async def get_tags_endpoint(
     per_page: int = Query(20, ge=1, le=100, description="每页数量"),
     active_only: bool = Query(False, description="仅显示激活的标签"),
     include_count: bool = Query(True, description="包含使用次数"),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔，如 id,name）"),
+    expand: Optional[str] = Query(None, description="展开的关联（usage_count），指定 fields 或 expand 时不再按 include_count 统计"),
     admin_verified: bool = Depends(verify_admin_credentials),
     db: Session = Depends(get_db)
 ):
     """获取标签列表"""
     skip = (page - 1) * per_page
+    
+    # 稀疏字段集：只查询请求的列，计数按需统计
+    if fields is not None or expand is not None:
+        try:
+            field_names = parse_names(fields, TAG_FIELDS, "字段")
+            expand_names = parse_names(expand, TAG_EXPANDS, "关联")
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        items, total = get_tag_dicts(
+            db,
+            fields=list(TAG_FIELDS) if field_names is None else field_names,
+            expand=expand_names or (),
+            skip=skip,
+            limit=per_page,
+            active_only=active_only
+        )
+        return ORJSONResponse(page_payload(items, total, page, per_page))
+    
     tags, total = get_tags(
         db, 
         skip=skip, 
@@ -164,4 +189,35 @@ async def delete_tag_endpoint(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
-        ) 
\ No newline at end of file
+        )
+
+
+@router.post("/{tag_id}/merge-into/{target_id}",
+             response_model=MessageResponse,
+             summary="合并标签",
+             description="把标签的全部关联改为目标标签并删除原标签，已有目标标签的提示词不会重复关联")
+async def merge_tag_endpoint(
+    tag_id: int,
+    target_id: int,
+    admin_verified: bool = Depends(verify_admin_credentials),
+    db: Session = Depends(get_db)
+):
+    """合并标签"""
+    try:
+        affected = merge_tag(db, tag_id, target_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if affected is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"标签 ID {tag_id} 不存在"
+        )
+    
+    return MessageResponse(
+        message=f"标签 ID {tag_id} 已合并到标签 ID {target_id}",
+        success=True,
+        data={"affected": affected}
+    )
@@ -0,0 +1,306 @@
+"""
+Tailwind 工具类样式生成模块
+- 扫描模板和脚本中出现的工具类名
+- 只为实际用到的类生成CSS（支持 sm/md/lg/xl 响应式和 hover/focus 变体）
+- 生成一个静态样式表，替代在浏览器中运行时编译的 Tailwind Play CDN
+"""
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TEMPLATES_DIR = Path("templates")
+SCRIPTS_DIR = Path("static/js")
+OUTPUT_PATH = Path("static/css/tailwind.css")
+
+# 调色板（Tailwind v3 默认色值 + 原内联配置中的 primary 主题色）
+COLORS: Dict[str, Dict[str, str]] = {
+    "gray": {
+        "50": "#f9fafb", "100": "#f3f4f6", "200": "#e5e7eb", "300": "#d1d5db", "400": "#9ca3af",
+        "500": "#6b7280", "600": "#4b5563", "700": "#374151", "800": "#1f2937", "900": "#111827",
+    },
+    "blue": {
+        "50": "#eff6ff", "100": "#dbeafe", "200": "#bfdbfe", "300": "#93c5fd", "400": "#60a5fa",
+        "500": "#3b82f6", "600": "#2563eb", "700": "#1d4ed8", "800": "#1e40af", "900": "#1e3a8a",
+    },
+    "green": {
+        "50": "#f0fdf4", "100": "#dcfce7", "200": "#bbf7d0", "300": "#86efac", "400": "#4ade80",
+        "500": "#22c55e", "600": "#16a34a", "700": "#15803d", "800": "#166534", "900": "#14532d",
+    },
+    "yellow": {
+        "50": "#fefce8", "100": "#fef9c3", "200": "#fef08a", "300": "#fde047", "400": "#facc15",
+        "500": "#eab308", "600": "#ca8a04", "700": "#a16207", "800": "#854d0e", "900": "#713f12",
+    },
+    "red": {
+        "50": "#fef2f2", "100": "#fee2e2", "200": "#fecaca", "300": "#fca5a5", "400": "#f87171",
+        "500": "#ef4444", "600": "#dc2626", "700": "#b91c1c", "800": "#991b1b", "900": "#7f1d1d",
+    },
+    "primary": {
+        "50": "#eff6ff", "500": "#3b82f6", "600": "#2563eb", "700": "#1d4ed8",
+    },
+}
+NAMED_COLORS = {"white": "#fff", "black": "#000", "transparent": "transparent"}
+
+# 响应式断点（按顺序输出，保证大屏规则覆盖小屏规则）
+BREAKPOINTS = {"sm": "640px", "md": "768px", "lg": "1024px", "xl": "1280px"}
+PSEUDO_VARIANTS = {"hover": ":hover", "focus": ":focus"}
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"), "sm": ("0.875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem"), "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"),
+}
+
+_TRANSITION = "transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms"
+
+# 固定名称的工具类
+STATIC_UTILITIES: Dict[str, str] = {
+    "block": "display:block",
+    "inline-block": "display:inline-block",
+    "flex": "display:flex",
+    "inline-flex": "display:inline-flex",
+    "grid": "display:grid",
+    "hidden": "display:none",
+    "fixed": "position:fixed",
+    "relative": "position:relative",
+    "absolute": "position:absolute",
+    "flex-1": "flex:1 1 0%",
+    "flex-col": "flex-direction:column",
+    "flex-wrap": "flex-wrap:wrap",
+    "flex-shrink-0": "flex-shrink:0",
+    "items-center": "align-items:center",
+    "items-start": "align-items:flex-start",
+    "justify-between": "justify-content:space-between",
+    "justify-center": "justify-content:center",
+    "text-center": "text-align:center",
+    "truncate": "overflow:hidden;text-overflow:ellipsis;white-space:nowrap",
+    "font-medium": "font-weight:500",
+    "font-semibold": "font-weight:600",
+    "font-bold": "font-weight:700",
+    "rounded": "border-radius:0.25rem",
+    "rounded-md": "border-radius:0.375rem",
+    "rounded-lg": "border-radius:0.5rem",
+    "rounded-full": "border-radius:9999px",
+    "shadow-sm": "box-shadow:0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "shadow": "box-shadow:0 1px 3px 0 rgb(0 0 0 / 0.1),0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "shadow-md": "box-shadow:0 4px 6px -1px rgb(0 0 0 / 0.1),0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "shadow-lg": "box-shadow:0 10px 15px -3px rgb(0 0 0 / 0.1),0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "border": "border-width:1px",
+    "border-t": "border-top-width:1px",
+    "border-b": "border-bottom-width:1px",
+    "h-full": "height:100%",
+    "min-h-full": "min-height:100%",
+    "w-full": "width:100%",
+    "max-w-7xl": "max-width:80rem",
+    "transition-colors": "transition-property:color,background-color,border-color,text-decoration-color,fill,stroke;" + _TRANSITION,
+    "transition-opacity": "transition-property:opacity;" + _TRANSITION,
+    "transition-shadow": "transition-property:box-shadow;" + _TRANSITION,
+}
+
+SPACING_PROPERTIES = {
+    "p": ("padding",), "px": ("padding-left", "padding-right"), "py": ("padding-top", "padding-bottom"),
+    "pt": ("padding-top",), "pb": ("padding-bottom",), "pl": ("padding-left",), "pr": ("padding-right",),
+    "m": ("margin",), "mx": ("margin-left", "margin-right"), "my": ("margin-top", "margin-bottom"),
+    "mt": ("margin-top",), "mb": ("margin-bottom",), "ml": ("margin-left",), "mr": ("margin-right",),
+    "gap": ("gap",), "h": ("height",), "w": ("width",), "top": ("top",), "right": ("right",),
+    "bottom": ("bottom",), "left": ("left",),
+}
+
+_SPACING_RE = re.compile(r"^(%s)-(\d+(?:\.5)?|auto|px)$" % "|".join(
+    sorted(SPACING_PROPERTIES, key=len, reverse=True)
+))
+_COLOR_RE = re.compile(r"^(bg|text|border|ring)-([a-z]+)(?:-(\d{2,3}))?$")
+_CANDIDATE_RE = re.compile(r"[A-Za-z0-9:.\-]+")
+
+
+def _spacing_value(value: str) -> str:
+    if value == "auto":
+        return "auto"
+    if value == "px":
+        return "1px"
+    if value == "0":
+        return "0px"
+    return f"{float(value) * 0.25:g}rem"
+
+
+def _color_value(name: str, shade: Optional[str]) -> Optional[str]:
+    if shade is None:
+        return NAMED_COLORS.get(name)
+    return COLORS.get(name, {}).get(shade)
+
+
+def utility_rule(utility: str) -> Optional[Tuple[str, str]]:
+    """
+    工具类 -> (选择器后缀, 声明)
+    不认识的类返回None（扫描到的普通单词会被忽略）
+    """
+    if utility in STATIC_UTILITIES:
+        return "", STATIC_UTILITIES[utility]
+
+    match = _SPACING_RE.match(utility)
+    if match:
+        prefix, value = match.groups()
+        css_value = _spacing_value(value)
+        return "", ";".join(f"{prop}:{css_value}" for prop in SPACING_PROPERTIES[prefix])
+
+    match = re.match(r"^space-(x|y)-(\d+(?:\.5)?)$", utility)
+    if match:
+        axis, value = match.groups()
+        prop = "margin-left" if axis == "x" else "margin-top"
+        return " > :not([hidden]) ~ :not([hidden])", f"{prop}:{_spacing_value(value)}"
+
+    match = re.match(r"^grid-cols-(\d+)$", utility)
+    if match:
+        return "", f"grid-template-columns:repeat({match.group(1)},minmax(0,1fr))"
+
+    match = re.match(r"^line-clamp-(\d+)$", utility)
+    if match:
+        return "", ("overflow:hidden;display:-webkit-box;-webkit-box-orient:vertical;"
+                    f"-webkit-line-clamp:{match.group(1)}")
+
+    match = re.match(r"^(z|opacity)-(\d+)$", utility)
+    if match:
+        kind, value = match.groups()
+        if kind == "z":
+            return "", f"z-index:{value}"
+        return "", f"opacity:{int(value) / 100:g}"
+
+    match = re.match(r"^ring-(\d+)$", utility)
+    if match:
+        return "", (f"box-shadow:0 0 0 {match.group(1)}px "
+                    "var(--tw-ring-color,rgb(59 130 246 / 0.5))")
+
+    match = re.match(r"^text-(xs|sm|base|lg|\dxl|xl)$", utility)
+    if match and match.group(1) in FONT_SIZES:
+        size, line_height = FONT_SIZES[match.group(1)]
+        return "", f"font-size:{size};line-height:{line_height}"
+
+    match = _COLOR_RE.match(utility)
+    if match:
+        kind, name, shade = match.groups()
+        color = _color_value(name, shade)
+        if color is None:
+            return None
+        prop = {
+            "bg": "background-color", "text": "color",
+            "border": "border-color", "ring": "--tw-ring-color",
+        }[kind]
+        return "", f"{prop}:{color}"
+
+    return None
+
+
+def _escape(class_name: str) -> str:
+    return re.sub(r"([:.\/])", r"\\\1", class_name)
+
+
+def scan_classes(paths: Iterable[Path]) -> List[str]:
+    """扫描文件中的候选类名"""
+    candidates = set()
+    for path in paths:
+        candidates.update(_CANDIDATE_RE.findall(path.read_text(encoding="utf-8")))
+    return sorted(candidates)
+
+
+def build_stylesheet(class_names: Iterable[str]) -> str:
+    """为可识别的工具类生成样式表"""
+    rules = []
+    breakpoint_order = list(BREAKPOINTS)
+    for class_name in class_names:
+        *variants, utility = class_name.split(":")
+        if len(variants) > 2:
+            continue
+        rule = utility_rule(utility)
+        if rule is None:
+            continue
+        breakpoint = None
+        pseudo = ""
+        valid = True
+        for variant in variants:
+            if variant in BREAKPOINTS and breakpoint is None:
+                breakpoint = variant
+            elif variant in PSEUDO_VARIANTS and not pseudo:
+                pseudo = PSEUDO_VARIANTS[variant]
+            else:
+                valid = False
+        if not valid:
+            continue
+        suffix, declarations = rule
+        selector = f".{_escape(class_name)}{pseudo}{suffix}"
+        order = breakpoint_order.index(breakpoint) + 1 if breakpoint else 0
+        rules.append((order, bool(pseudo), class_name, f"{selector}{{{declarations}}}"))
+
+    rules.sort()
+    lines = [PREFLIGHT, _palette_variables()]
+    current_breakpoint = 0
+    for order, _, _, css in rules:
+        if order != current_breakpoint:
+            if current_breakpoint:
+                lines.append("}")
+            lines.append(f"@media (min-width:{BREAKPOINTS[breakpoint_order[order - 1]]}){{")
+            current_breakpoint = order
+        lines.append(css)
+    if current_breakpoint:
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _palette_variables() -> str:
+    """以CSS变量形式导出主题色，供自定义样式引用"""
+    declarations = ";".join(
+        f"--color-primary-{shade}:{value}" for shade, value in COLORS["primary"].items()
+    )
+    return f":root{{{declarations}}}"
+
+
+def source_files() -> List[Path]:
+    """需要扫描类名的文件：模板和前端脚本"""
+    return sorted(TEMPLATES_DIR.glob("*.html")) + sorted(SCRIPTS_DIR.glob("*.js"))
+
+
+def generate_stylesheet(output: Path = OUTPUT_PATH) -> bool:
+    """
+    生成静态样式表
+    内容未变化时不重写文件（保持mtime，避免预压缩文件失效），返回是否写入
+    """
+    css = build_stylesheet(scan_classes(source_files()))
+    if output.exists() and output.read_text(encoding="utf-8") == css:
+        return False
+    output.parent.mkdir(parents=True, exist_ok=True)
+    # 原子替换，避免多个worker同时启动时读到半个文件
+    fd, temp_path = tempfile.mkstemp(dir=output.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+        temp_file.write(css)
+    os.replace(temp_path, output)
+    return True
+
+
+# 精简版 Tailwind preflight
+PREFLIGHT = """*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:ui-sans-serif,system-ui,-apple-system,"Segoe UI",Roboto,"Helvetica Neue",Arial,"Noto Sans","PingFang SC","Microsoft YaHei",sans-serif}
+body{margin:0;line-height:inherit}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,monospace;font-size:1em}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,[type='button'],[type='submit']{-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+ol,ul{list-style:none;margin:0;padding:0}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+[hidden]{display:none}"""
+
+
+if __name__ == "__main__":
+    # 用法: python -m app.tailwind [输出路径]
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else OUTPUT_PATH
+    written = generate_stylesheet(target)
+    print(f"✅ 样式表{'已生成' if written else '无变化'}: {target}")
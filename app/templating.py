@@ -0,0 +1,104 @@
+"""
+模板引擎模块
+- 全站共用一个 Jinja2 环境
+- 编译后的模板字节码持久化到磁盘，重启后不必重新解析、编译模板
+- 启动时预编译全部模板，首个请求不再承担编译开销
+- 生产环境关闭自动重载，渲染时不再逐次检查模板文件的修改时间
+- 可选的流式渲染：边渲染边发送，不必先拼出完整页面
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterator
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+from app.assets import install_asset_helpers
+from app.fragments import install_fragment_helpers
+
+TEMPLATES_DIR = Path("templates")
+
+# 运行环境：production 时关闭模板自动重载
+APP_ENV = os.getenv("APP_ENV", "development")
+TEMPLATE_AUTO_RELOAD = os.getenv(
+    "TEMPLATE_AUTO_RELOAD", "0" if APP_ENV == "production" else "1"
+) == "1"
+
+# 模板字节码缓存目录
+TEMPLATE_CACHE_DIR = Path(os.getenv("TEMPLATE_CACHE_DIR", ".cache/jinja2"))
+
+# 流式渲染刷新点：模板中 {{ stream_flush() }} 处把已渲染的内容立即发送
+# 非流式渲染时它只是一个HTML注释，会被空白压缩删除
+STREAM_FLUSH_MARKER = "<!--stream-flush-->"
+
+# 流式渲染时累积到该字符数即发送一块
+STREAM_CHUNK_SIZE = 8192
+
+
+def create_environment(
+    directory: Path = TEMPLATES_DIR,
+    cache_dir: Path = TEMPLATE_CACHE_DIR,
+    auto_reload: bool = TEMPLATE_AUTO_RELOAD,
+) -> Environment:
+    """创建带字节码缓存的Jinja2环境"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(directory),
+        autoescape=select_autoescape(),
+        bytecode_cache=FileSystemBytecodeCache(str(cache_dir)),
+        auto_reload=auto_reload,
+        # 常驻内存的已编译模板数量不设上限（模板数量很少）
+        cache_size=-1,
+    )
+
+
+def precompile_templates(environment: Environment) -> int:
+    """加载全部模板（命中字节码缓存时跳过编译），返回模板数量"""
+    names = environment.list_templates(extensions=["html"])
+    for name in names:
+        environment.get_template(name)
+    return len(names)
+
+
+def template_fingerprint(directory: Path = TEMPLATES_DIR) -> str:
+    """模板文件内容指纹（模板变更后页面ETag随之变化）"""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(Path(directory).glob("*.html")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def stream_template(name: str, context: dict, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """逐块生成模板输出：遇到刷新点或累积到 chunk_size 时发送一块"""
+    buffer = []
+    size = 0
+    for piece in templates.get_template(name).generate(context):
+        if piece == STREAM_FLUSH_MARKER:
+            if buffer:
+                yield "".join(buffer).encode("utf-8")
+                buffer, size = [], 0
+            continue
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+templates = Jinja2Templates(env=create_environment())
+templates.env.globals["stream_flush"] = lambda: Markup(STREAM_FLUSH_MARKER)
+install_asset_helpers(templates)
+install_fragment_helpers(templates)
+
+TEMPLATE_FINGERPRINT = template_fingerprint()
+
+
+def current_template_fingerprint() -> str:
+    """当前模板指纹（开启自动重载时每次重新计算，模板修改后页面ETag和渲染缓存随之失效）"""
+    if templates.env.auto_reload:
+        return template_fingerprint()
+    return TEMPLATE_FINGERPRINT
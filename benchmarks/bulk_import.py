@@ -0,0 +1,92 @@
+"""
+批量导入基准测试
+在临时数据库中对比逐条创建（create_prompt）与批量导入（import_prompts）的吞吐量
+
+用法: python -m benchmarks.bulk_import [提示词数量]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import create_prompt, get_taxonomy_names, import_prompts
+from app.database import Base
+from app.schemas import PromptCreate, PromptImport
+
+
+def temporary_session():
+    """在临时文件中创建全部表，返回 (会话, 清理函数)"""
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    def cleanup():
+        db.close()
+        engine.dispose()
+        os.unlink(path)
+
+    return db, cleanup
+
+
+def make_items(count: int):
+    return [
+        (row, PromptImport(
+            title=f"基准提示词{row}",
+            content="基准测试内容。" * 40,
+            category="基准分类",
+            tags=[f"基准标签{row % 20}", f"基准标签{(row + 7) % 20}"],
+        ))
+        for row in range(1, count + 1)
+    ]
+
+
+def measure_import(items) -> float:
+    db, cleanup = temporary_session()
+    try:
+        started = time.perf_counter()
+        created, errors = import_prompts(db, items, create_missing=True)
+        elapsed = time.perf_counter() - started
+        assert created == len(items) and not errors
+        return elapsed
+    finally:
+        cleanup()
+
+
+def measure_single(items) -> float:
+    db, cleanup = temporary_session()
+    try:
+        # 先用批量导入建好分类和标签，只计量逐条创建提示词的耗时
+        all_tags = sorted({name for _, item in items for name in item.tags})
+        import_prompts(db, [(0, items[0][1].model_copy(update={"tags": all_tags}))], create_missing=True)
+        category_names, tag_names = get_taxonomy_names(db)
+        tag_ids = {name: tag_id for tag_id, name in tag_names.items()}
+        category_id = next(iter(category_names))
+        started = time.perf_counter()
+        for _, item in items:
+            create_prompt(db, PromptCreate(
+                title=item.title, content=item.content, category_id=category_id,
+                tag_ids=[tag_ids[name] for name in item.tags],
+            ))
+        return time.perf_counter() - started
+    finally:
+        cleanup()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    items = make_items(count)
+    single_count = min(count, 1000)
+
+    single = measure_single(items[:single_count])
+    bulk = measure_import(items)
+    print(f"逐条创建 {single_count:>7} 条: {single:7.2f} s  {single_count / single:10.0f} 条/秒")
+    print(f"批量导入 {count:>7} 条: {bulk:7.2f} s  {count / bulk:10.0f} 条/秒")
+
+
+if __name__ == "__main__":
+    main()
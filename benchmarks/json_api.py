@@ -0,0 +1,65 @@
+"""
+JSON序列化基准测试
+对比同一页提示词列表的三种序列化方式：
+- 逐条 PromptRead.model_validate + 标准库 json（当前管理接口的方式）
+- 缓存的 TypeAdapter 校验后直接输出JSON字节
+- 投影行直接转为字典 + orjson（公开API的快速路径）
+（使用当前数据库中的数据，不足一页时结果只反映已有条数）
+
+用法: python -m benchmarks.json_api [每页数量]
+"""
+import json
+import statistics
+import sys
+import time
+from typing import List
+
+from app.crud import get_prompt_rows
+from app.database import SessionLocal
+from app.schemas import PromptRead
+from app.serialization import dump_json, dump_models, prompt_row_dict
+
+
+def pydantic_path(rows) -> bytes:
+    items = [PromptRead.model_validate(row).model_dump(mode="json") for row in rows]
+    return json.dumps({"items": items}, ensure_ascii=False).encode("utf-8")
+
+
+def adapter_path(rows) -> bytes:
+    return dump_models(List[PromptRead], rows)
+
+
+def fast_path(rows) -> bytes:
+    return dump_json({"items": [prompt_row_dict(row) for row in rows]})
+
+
+def measure(func, rows, rounds: int = 200) -> float:
+    """返回单次序列化耗时的中位数（毫秒）"""
+    func(rows)
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func(rows)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    per_page = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    db = SessionLocal()
+    try:
+        rows, _ = get_prompt_rows(db, limit=per_page, is_active=True)
+    finally:
+        db.close()
+
+    print(f"序列化 {len(rows)} 条提示词")
+    for label, func in (
+        ("PromptRead 逐条校验", pydantic_path),
+        ("TypeAdapter(缓存)", adapter_path),
+        ("投影字典 + orjson", fast_path),
+    ):
+        print(f"{label:<20} {measure(func, rows):8.3f} ms  {len(func(rows)):>8} 字节")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+列表页流式渲染基准测试
+对比整页渲染与流式渲染下的首字节时间、总耗时和渲染峰值内存
+（使用当前数据库中的数据，提示词越多差异越明显）
+
+用法: python -m benchmarks.streaming_pages [路径]
+"""
+import statistics
+import sys
+import time
+import tracemalloc
+
+import anyio
+
+from app import public
+from app.main import app as asgi_app
+from app.public import page_cache
+
+
+async def request_page(path: str) -> tuple:
+    """直接调用ASGI应用，返回 (首字节耗时, 总耗时)，单位毫秒"""
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "root_path": "",
+        "path": raw_path, "raw_path": raw_path.encode(), "query_string": query.encode(),
+        "headers": [(b"host", b"benchmark")],
+        "server": ("benchmark", 80), "client": ("benchmark", 50000),
+    }
+    requested = False
+    first_byte = None
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            await anyio.sleep_forever()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body" and message.get("body") and first_byte is None:
+            first_byte = time.perf_counter()
+
+    started = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    finished = time.perf_counter()
+    return (first_byte - started) * 1000, (finished - started) * 1000
+
+
+def measure(path: str, stream: bool, rounds: int = 20) -> tuple:
+    public.STREAM_PAGES = stream
+    samples = []
+    for _ in range(rounds):
+        page_cache.clear()
+        samples.append(anyio.run(request_page, path))
+
+    page_cache.clear()
+    tracemalloc.start()
+    anyio.run(request_page, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    first_byte, total = (statistics.median(column) for column in zip(*samples))
+    return first_byte, total, peak / 1024
+
+
+def main(path: str = "/?per_page=50") -> None:
+    print(f"{'模式':<12}{'首字节(ms)':>14}{'总耗时(ms)':>14}{'峰值内存(KB)':>16}")
+    for label, stream in (("整页渲染", False), ("流式渲染", True)):
+        first_byte, total, peak = measure(path, stream)
+        print(f"{label:<12}{first_byte:>14.2f}{total:>14.2f}{peak:>16.1f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,80 @@
+"""
+模板启动耗时基准测试
+对比默认配置（懒编译、无字节码缓存）与共享环境（字节码缓存 + 预编译）下：
+- 启动阶段耗时
+- 首个请求的渲染耗时
+- 后续请求的渲染耗时
+
+用法: python -m benchmarks.template_startup [重复次数]
+"""
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.templating import TEMPLATES_DIR, create_environment, precompile_templates
+
+PAGE = "index.html"
+
+CONTEXT = {
+    "url_for": lambda name, **params: f"/{name}{params.get('path', '')}",
+    "prompts": [],
+    "categories": [],
+    "tags": [],
+    "pagination": {
+        "page": 1, "per_page": 20, "total": 0, "total_pages": 0,
+        "has_next": False, "has_prev": False, "page_range": [],
+        "start_page": 1, "end_page": 0,
+    },
+    "current_sort": "created_at",
+    "current_category": None,
+    "current_tag": None,
+}
+
+
+def measure(make_environment, startup) -> tuple:
+    """返回 (启动耗时, 首个请求耗时, 后续请求平均耗时)，单位毫秒"""
+    started = time.perf_counter()
+    environment = make_environment()
+    startup(environment)
+    startup_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    environment.get_template(PAGE).render(CONTEXT)
+    first_ms = (time.perf_counter() - started) * 1000
+
+    samples = []
+    for _ in range(50):
+        started = time.perf_counter()
+        environment.get_template(PAGE).render(CONTEXT)
+        samples.append((time.perf_counter() - started) * 1000)
+    return startup_ms, first_ms, statistics.mean(samples)
+
+
+def main(rounds: int = 5) -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # 预热字节码缓存（模拟上次运行留下的缓存）
+        precompile_templates(create_environment(cache_dir=Path(cache_dir)))
+
+        scenarios = {
+            "默认配置": (
+                lambda: Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape()),
+                lambda environment: None,
+            ),
+            "字节码缓存+预编译": (
+                lambda: create_environment(cache_dir=Path(cache_dir), auto_reload=False),
+                precompile_templates,
+            ),
+        }
+        print(f"{'场景':<20}{'启动(ms)':>12}{'首个请求(ms)':>16}{'后续请求(ms)':>16}")
+        for label, (make_environment, startup) in scenarios.items():
+            results = [measure(make_environment, startup) for _ in range(rounds)]
+            startup_ms, first_ms, steady_ms = (statistics.median(column) for column in zip(*results))
+            print(f"{label:<20}{startup_ms:>12.2f}{first_ms:>16.2f}{steady_ms:>16.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -153,10 +153,30 @@ const API = {
     }
 };
 
+// 提示词原文缓存：{原文URL: 内容}（URL带版本号，内容修改后URL随之变化）
+const rawPromptCache = new Map();
+
+// 按需获取提示词原文（列表页只输出预览摘要）
+async function fetchPromptRaw(promptId, rawUrl) {
+    const url = rawUrl || `/api/prompts/${promptId}/raw`;
+    if (rawPromptCache.has(url)) {
+        return rawPromptCache.get(url);
+    }
+    
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+    const content = await response.text();
+    rawPromptCache.set(url, content);
+    return content;
+}
+
 // 复制功能
-async function copyPrompt(promptId, content) {
+async function copyPrompt(promptId, rawUrl) {
     try {
-        // 复制到剪贴板
+        // 获取原文并复制到剪贴板
+        const content = await fetchPromptRaw(promptId, rawUrl);
         const success = await Utils.copyToClipboard(content);
         
         if (success) {
@@ -180,14 +200,18 @@ async function copyPrompt(promptId, content) {
 // 点赞功能
 async function likePrompt(promptId) {
     try {
-        await API.post(`/api/prompts/${promptId}/like`);
-        Utils.showToast('点赞成功！', 'success');
+        const result = await API.post(`/api/prompts/${promptId}/like`);
+        const { liked, like_count: likeCount } = result.data;
+        if (liked) {
+            Utils.showToast('点赞成功！', 'success');
+        } else {
+            Utils.showToast('您已经点赞过了', 'warning');
+        }
         
-        // 更新点赞数显示
+        // 以服务端返回的点赞数为准
         const likeCountElement = document.querySelector(`#like-count-${promptId}`);
         if (likeCountElement) {
-            const currentCount = parseInt(likeCountElement.textContent) || 0;
-            likeCountElement.textContent = currentCount + 1;
+            likeCountElement.textContent = likeCount;
         }
         
         // 更新按钮状态
@@ -249,5 +273,6 @@ document.addEventListener('DOMContentLoaded', function() {
 // 导出到全局作用域
 window.Utils = Utils;
 window.API = API;
+window.fetchPromptRaw = fetchPromptRaw;
 window.copyPrompt = copyPrompt;
 window.likePrompt = likePrompt; 
\ No newline at end of file
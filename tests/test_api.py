@@ -0,0 +1,191 @@
+"""
+公开API测试
+测试提示词原文接口和只读JSON接口的缓存头、条件请求和序列化结果
+"""
+import base64
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.api import raw_cache
+from app.assets import IMMUTABLE_CACHE_CONTROL
+from app.crud import get_prompt_rows
+from app.database import SessionLocal, engine
+from app.schemas import PromptRead
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def create_test_prompt(content: str, is_active: bool = True):
+    """创建测试提示词"""
+    timestamp = int(time.time() * 1000000)
+    category = client.post(
+        "/admin/categories/", json={"name": f"API分类_{timestamp}"}, headers=get_auth_headers()
+    ).json()
+    return client.post(
+        "/admin/prompts/",
+        json={
+            "title": f"API提示词_{timestamp}",
+            "content": content,
+            "category_id": category["id"],
+            "is_active": is_active,
+        },
+        headers=get_auth_headers()
+    ).json()
+
+
+class TestPromptRaw:
+    """测试提示词原文接口"""
+
+    def test_returns_full_text(self):
+        """测试返回完整原文"""
+        content = "第一行\n" + "完整内容" * 300
+        prompt = create_test_prompt(content)
+
+        response = client.get(f"/api/prompts/{prompt['id']}/raw")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/plain; charset=utf-8"
+        assert response.text == content
+        assert response.headers["cache-control"] == "public, max-age=300"
+        assert response.headers["etag"].strip('W/"')
+
+    def test_conditional_request(self):
+        """测试ETag命中返回304"""
+        prompt = create_test_prompt("条件请求内容")
+        etag = client.get(f"/api/prompts/{prompt['id']}/raw").headers["etag"]
+
+        response = client.get(f"/api/prompts/{prompt['id']}/raw", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_versioned_url_is_immutable(self):
+        """测试卡片中带版本号的URL可永久缓存，版本过期后不再永久缓存"""
+        prompt = create_test_prompt("版本内容")
+        page = client.get("/").text
+        marker = f"/api/prompts/{prompt['id']}/raw?v="
+        assert marker in page
+        raw_url = marker + page.split(marker)[1].split("'")[0]
+
+        response = client.get(raw_url)
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+        client.put(f"/admin/prompts/{prompt['id']}", json={"content": "新版本内容"}, headers=get_auth_headers())
+        response = client.get(raw_url)
+        assert response.text == "新版本内容"
+        assert response.headers["cache-control"] == "public, max-age=300"
+
+    def test_cached_until_content_changes(self):
+        """测试原文按内容版本缓存"""
+        prompt = create_test_prompt("缓存内容")
+        first = client.get(f"/api/prompts/{prompt['id']}/raw")
+        assert len([key for key in raw_cache._data if key[0] == prompt["id"]]) == 1
+
+        client.put(f"/admin/prompts/{prompt['id']}", json={"content": "修改后的内容"}, headers=get_auth_headers())
+        second = client.get(f"/api/prompts/{prompt['id']}/raw")
+        assert second.text == "修改后的内容"
+        assert second.headers["etag"] != first.headers["etag"]
+
+    def test_inactive_or_missing_not_found(self):
+        """测试未激活或不存在的提示词返回404"""
+        prompt = create_test_prompt("未激活内容", is_active=False)
+        assert client.get(f"/api/prompts/{prompt['id']}/raw").status_code == 404
+        assert client.get("/api/prompts/999999999/raw").status_code == 404
+
+    def test_list_page_has_no_full_content(self):
+        """测试列表页只输出预览摘要"""
+        tail = "只在原文中出现的结尾"
+        prompt = create_test_prompt("开头" * 100 + tail)
+        page = client.get("/").text
+        assert prompt["title"] in page
+        assert tail not in page
+
+
+class TestJsonApi:
+    """测试只读JSON接口"""
+
+    def test_prompts_match_pydantic_output(self):
+        """测试快速路径输出与 PromptRead 序列化结果一致"""
+        prompt = create_test_prompt("JSON接口内容")
+        tag = client.post(
+            "/admin/tags/", json={"name": f"JSON标签_{prompt['id']}"}, headers=get_auth_headers()
+        ).json()
+        client.put(f"/admin/prompts/{prompt['id']}", json={"tag_ids": [tag["id"]]}, headers=get_auth_headers())
+
+        response = client.get(f"/api/prompts?category_id={prompt['category_id']}")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        data = response.json()
+        assert data["total"] == 1
+        assert data["has_next"] is False
+
+        db = SessionLocal()
+        try:
+            rows, _ = get_prompt_rows(db, category_id=prompt["category_id"], is_active=True)
+        finally:
+            db.close()
+        expected = PromptRead.model_validate(rows[0]).model_dump(mode="json")
+        assert data["items"] == [expected]
+
+    def test_inactive_prompts_hidden(self):
+        """测试只返回激活的提示词"""
+        prompt = create_test_prompt("未激活JSON内容", is_active=False)
+        data = client.get(f"/api/prompts?category_id={prompt['category_id']}").json()
+        assert data["items"] == []
+        assert data["total"] == 0
+
+    def test_conditional_request_and_invalidation(self):
+        """测试ETag命中返回304，数据变化后ETag更新"""
+        prompt = create_test_prompt("ETag内容")
+        url = f"/api/prompts?category_id={prompt['category_id']}"
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        client.put(f"/admin/prompts/{prompt['id']}", json={"title": f"改名_{prompt['id']}"}, headers=get_auth_headers())
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["items"][0]["title"] == f"改名_{prompt['id']}"
+
+    def test_serialized_once_per_version(self):
+        """测试同一数据版本只查询一次"""
+        prompt = create_test_prompt("缓存JSON内容")
+        url = f"/api/prompts?category_id={prompt['category_id']}&per_page=5"
+        first = client.get(url)
+
+        statements = []
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record_statement)
+        try:
+            second = client.get(url)
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+
+        assert second.content == first.content
+        assert statements == []
+
+    def test_categories_and_tags_with_counts(self):
+        """测试分类和标签列表带激活提示词数量"""
+        prompt = create_test_prompt("计数内容")
+        create_test_prompt("另一个分类的未激活内容", is_active=False)
+        category_name = client.get(f"/admin/categories/{prompt['category_id']}", headers=get_auth_headers()).json()["name"]
+        tag = client.post(
+            "/admin/tags/", json={"name": f"计数标签_{prompt['id']}"}, headers=get_auth_headers()
+        ).json()
+        client.put(f"/admin/prompts/{prompt['id']}", json={"tag_ids": [tag["id"]]}, headers=get_auth_headers())
+
+        categories = {item["name"]: item for item in client.get("/api/categories").json()["items"]}
+        assert categories[category_name]["prompt_count"] == 1
+        assert categories[category_name]["id"] == prompt["category_id"]
+
+        tags = {item["name"]: item for item in client.get("/api/tags").json()["items"]}
+        assert tags[tag["name"]]["usage_count"] == 1
+        assert tags[tag["name"]]["color"] == "#3b82f6"
@@ -0,0 +1,136 @@
+"""
+静态资源指纹测试
+测试资源清单、带哈希URL、immutable缓存头和预压缩文件发送
+"""
+import gzip
+import os
+import re
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.assets import (
+    AssetManifest, FingerprintedStaticFiles, precompress_static,
+    manifest, IMMUTABLE_CACHE_CONTROL
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    """创建临时静态目录"""
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("body { color: red; }\n" * 100)
+    (tmp_path / ".gitkeep").write_text("")
+    return tmp_path
+
+
+def make_static_client(directory):
+    """挂载临时静态目录的测试客户端"""
+    asset_manifest = AssetManifest(directory).build()
+    static_app = FastAPI()
+    static_app.mount(
+        "/static",
+        FingerprintedStaticFiles(directory=str(directory), manifest=asset_manifest),
+        name="static"
+    )
+    return TestClient(static_app), asset_manifest
+
+
+class TestAssetManifest:
+    """测试资源清单"""
+
+    def test_build_hashes_files(self, static_dir):
+        """测试为文件生成带哈希的名称，忽略隐藏文件"""
+        asset_manifest = AssetManifest(static_dir).build()
+
+        assert set(asset_manifest.files) == {"css/site.css"}
+        assert re.fullmatch(r"css/site\.[0-9a-f]{10}\.css", asset_manifest.files["css/site.css"])
+        assert asset_manifest.resolve(asset_manifest.files["css/site.css"]) == "css/site.css"
+
+    def test_hash_follows_content(self, static_dir):
+        """测试内容变化后哈希和清单指纹变化"""
+        first = AssetManifest(static_dir).build()
+        (static_dir / "css" / "site.css").write_text("body { color: blue; }")
+        second = AssetManifest(static_dir).build()
+
+        assert first.files["css/site.css"] != second.files["css/site.css"]
+        assert first.fingerprint != second.fingerprint
+
+    def test_url_path(self, static_dir):
+        """测试URL映射保留前导斜杠，未知路径原样返回"""
+        asset_manifest = AssetManifest(static_dir).build()
+        assert asset_manifest.url_path("/css/site.css") == "/" + asset_manifest.files["css/site.css"]
+        assert asset_manifest.url_path("/css/missing.css") == "/css/missing.css"
+
+    def test_precompressed_siblings_not_fingerprinted(self, static_dir):
+        """测试预压缩文件不进入清单"""
+        precompress_static(static_dir)
+        asset_manifest = AssetManifest(static_dir).build()
+        assert set(asset_manifest.files) == {"css/site.css"}
+        assert (static_dir / "css" / "site.css.gz").exists()
+
+
+class TestFingerprintedStaticFiles:
+    """测试带哈希URL的静态文件服务"""
+
+    def test_pages_use_hashed_urls(self):
+        """测试页面中的静态资源使用带哈希的URL"""
+        response = client.get("/")
+        assert "/static/" + manifest.files["css/custom.css"] in response.text
+        assert "/static/" + manifest.files["js/main.js"] in response.text
+
+    def test_hashed_url_is_immutable(self):
+        """测试带哈希的URL返回永久缓存头"""
+        response = client.get("/static/" + manifest.files["css/custom.css"])
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert "提示词分享平台自定义样式" in response.text
+
+    def test_plain_url_still_revalidates(self):
+        """测试原始URL依然可访问且不带永久缓存头"""
+        response = client.get("/static/css/custom.css")
+        assert response.status_code == 200
+        assert "immutable" not in response.headers.get("cache-control", "")
+
+    def test_unknown_hash_not_found(self):
+        """测试不存在的哈希文件返回404"""
+        response = client.get("/static/css/custom.0000000000.css")
+        assert response.status_code == 404
+
+    def test_serves_precompressed_sibling(self, static_dir):
+        """测试客户端接受gzip时发送预压缩文件"""
+        original = (static_dir / "css" / "site.css").read_bytes()
+        (static_dir / "css" / "site.css.gz").write_bytes(gzip.compress(original))
+        static_client, asset_manifest = make_static_client(static_dir)
+
+        response = static_client.get(
+            "/static/" + asset_manifest.files["css/site.css"],
+            headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/css")
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.content == original
+
+        response = static_client.get(
+            "/static/css/site.css", headers={"Accept-Encoding": "identity"}
+        )
+        assert "content-encoding" not in response.headers
+        assert response.content == original
+
+    def test_ignores_stale_sibling(self, static_dir):
+        """测试比原文件旧的预压缩文件不被使用"""
+        sibling = static_dir / "css" / "site.css.gz"
+        sibling.write_bytes(gzip.compress(b"stale"))
+        past = time.time() - 3600
+        os.utime(sibling, (past, past))
+        static_client, _ = make_static_client(static_dir)
+
+        response = static_client.get("/static/css/site.css", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert b"color: red" in response.content
@@ -0,0 +1,183 @@
+"""
+进程内缓存与跨进程失效测试
+测试LRU缓存、作用域失效、写事务版本递增和 data_version 轮询
+"""
+import base64
+import os
+import sqlite3
+import tempfile
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, set_sqlite_pragma
+from app.cache import (
+    LocalCache, CacheVersionWatcher, register_cache, invalidate, touch,
+    sync_cache_versions, get_cache_versions, SCOPE_PROMPTS, SCOPE_TAGS
+)
+from app.public import taxonomy_cache
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+@pytest.fixture
+def temp_db_path():
+    """创建带表结构的临时数据库"""
+    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+    temp_db.close()
+    engine = create_engine(
+        f"sqlite:///{temp_db.name}",
+        connect_args={"check_same_thread": False}
+    )
+    event.listen(engine, "connect", set_sqlite_pragma)
+    Base.metadata.create_all(bind=engine)
+
+    yield temp_db.name, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(temp_db.name + suffix):
+            os.unlink(temp_db.name + suffix)
+
+
+class TestLocalCache:
+    """测试进程内LRU缓存"""
+
+    def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = LocalCache("test_lru", scopes=[SCOPE_PROMPTS], maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # a 变为最近使用
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_invalidate_by_scope(self):
+        """测试只失效依赖对应作用域的缓存"""
+        prompts_cache = register_cache("test_scope_prompts", scopes=[SCOPE_PROMPTS])
+        tags_cache = register_cache("test_scope_tags", scopes=[SCOPE_TAGS])
+        prompts_cache.set("k", "v")
+        tags_cache.set("k", "v")
+
+        invalidate([SCOPE_TAGS])
+
+        assert prompts_cache.get("k") == "v"
+        assert tags_cache.get("k") is None
+
+
+class TestVersionWatcher:
+    """测试跨进程版本检测"""
+
+    def test_touch_bumps_version_in_transaction(self, temp_db_path):
+        """测试版本号随写事务提交而递增"""
+        _, SessionLocal = temp_db_path
+        db = SessionLocal()
+        touch(db, SCOPE_PROMPTS)
+        db.commit()
+        touch(db, SCOPE_PROMPTS)
+        db.commit()
+
+        version = db.execute(
+            text("SELECT version FROM cache_versions WHERE scope = 'prompts'")
+        ).scalar()
+        assert version == 2
+        db.close()
+
+    def test_rollback_discards_bump(self, temp_db_path):
+        """测试回滚的事务不递增版本号"""
+        _, SessionLocal = temp_db_path
+        db = SessionLocal()
+        touch(db, SCOPE_PROMPTS)
+        db.rollback()
+
+        version = db.execute(
+            text("SELECT version FROM cache_versions WHERE scope = 'prompts'")
+        ).scalar()
+        assert version is None
+        db.close()
+
+    def test_detects_commit_from_other_connection(self, temp_db_path):
+        """测试其他连接（模拟其他worker）提交后能检测到变化的作用域"""
+        path, _ = temp_db_path
+        watcher = CacheVersionWatcher(path, poll_interval=0)
+        assert watcher.poll() == []
+
+        other = sqlite3.connect(path)
+        other.execute("INSERT INTO cache_versions (scope, version) VALUES ('tags', 1)")
+        other.commit()
+
+        assert watcher.poll() == ["tags"]
+        # 没有新的提交时不再报告变化
+        assert watcher.poll() == []
+
+        other.execute("UPDATE cache_versions SET version = version + 1 WHERE scope = 'tags'")
+        other.commit()
+        assert watcher.poll() == ["tags"]
+        assert watcher.versions() == {"tags": 2}
+
+        other.close()
+        watcher.close()
+
+    def test_poll_interval_bounds_checks(self, temp_db_path):
+        """测试轮询间隔内不重复检查"""
+        path, _ = temp_db_path
+        watcher = CacheVersionWatcher(path, poll_interval=60)
+        watcher.poll()
+
+        other = sqlite3.connect(path)
+        other.execute("INSERT INTO cache_versions (scope, version) VALUES ('tags', 1)")
+        other.commit()
+        other.close()
+
+        assert watcher.poll() == []
+        assert watcher.poll(force=True) == ["tags"]
+        watcher.close()
+
+
+class TestAppInvalidation:
+    """测试应用写入后的缓存失效"""
+
+    def test_admin_write_invalidates_taxonomy(self):
+        """测试管理端创建分类后导航缓存失效"""
+        client.get("/")
+        assert len(taxonomy_cache) == 1
+
+        timestamp = int(time.time() * 1000000)
+        response = client.post(
+            "/admin/categories/",
+            json={"name": f"缓存分类_{timestamp}", "is_active": True},
+            headers=get_auth_headers()
+        )
+        assert response.status_code == 201
+        assert len(taxonomy_cache) == 0
+
+        # 新分类出现在页面筛选菜单中
+        response = client.get("/")
+        assert f"缓存分类_{timestamp}" in response.text
+
+    def test_versions_advance_after_write(self):
+        """测试写入后本进程看到的版本号递增"""
+        sync_cache_versions(force=True)
+        before = get_cache_versions().get("tags", 0)
+
+        timestamp = int(time.time() * 1000000)
+        client.post(
+            "/admin/tags/",
+            json={"name": f"缓存标签_{timestamp}", "is_active": True},
+            headers=get_auth_headers()
+        )
+
+        assert get_cache_versions()["tags"] == before + 1
@@ -0,0 +1,162 @@
+"""
+级联删除测试
+测试外键 ON DELETE CASCADE 的数据库级联删除和旧库外键升级
+"""
+import base64
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+from app.main import app
+from app.database import engine
+from app.migrations import migrate
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def create_category_with_prompts(count: int):
+    """创建分类、标签和若干带标签和点赞的提示词"""
+    timestamp = int(time.time() * 1000000)
+    category = client.post(
+        "/admin/categories/", json={"name": f"级联分类_{timestamp}"}, headers=get_auth_headers()
+    ).json()
+    tag = client.post("/admin/tags/", json={"name": f"级联标签_{timestamp}"}, headers=get_auth_headers()).json()
+    prompts = [
+        client.post(
+            "/admin/prompts/",
+            json={"title": f"级联提示词{i}", "content": "内容", "category_id": category["id"], "tag_ids": [tag["id"]]},
+            headers=get_auth_headers()
+        ).json()
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        for prompt in prompts:
+            conn.execute(
+                text("INSERT INTO prompt_likes (prompt_id, ip_key, created_at) VALUES (:prompt_id, :ip_key, 0)"),
+                {"prompt_id": prompt["id"], "ip_key": timestamp}
+            )
+    return category, tag, prompts
+
+
+def count_rows(table: str, column: str, values) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f"SELECT COUNT(*) FROM {table} WHERE {column} IN ({','.join(str(v) for v in values)})")
+        ).scalar()
+
+
+def record_deletes(func):
+    """执行请求并记录期间执行的DELETE语句"""
+    statements = []
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("DELETE"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        response = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return response, statements
+
+
+class TestCascadeDeletes:
+    """测试数据库级联删除"""
+
+    def test_force_delete_category(self):
+        """测试强制删除分类只执行一条DELETE，提示词、标签关联和点赞记录由数据库级联删除"""
+        category, tag, prompts = create_category_with_prompts(5)
+        prompt_ids = [prompt["id"] for prompt in prompts]
+        assert count_rows("prompt_likes", "prompt_id", prompt_ids) == 5
+
+        response, deletes = record_deletes(lambda: client.delete(
+            f"/admin/categories/{category['id']}?force=true", headers=get_auth_headers()
+        ))
+        assert response.status_code == 200
+        assert len(deletes) == 1 and "categories" in deletes[0]
+        assert count_rows("prompts", "id", prompt_ids) == 0
+        assert count_rows("prompt_tags", "prompt_id", prompt_ids) == 0
+        assert count_rows("prompt_likes", "prompt_id", prompt_ids) == 0
+        assert client.get(f"/admin/tags/{tag['id']}", headers=get_auth_headers()).json()["usage_count"] == 0
+
+    def test_delete_prompt(self):
+        """测试删除提示词只执行一条DELETE"""
+        _, tag, prompts = create_category_with_prompts(1)
+        prompt_id = prompts[0]["id"]
+        response, deletes = record_deletes(lambda: client.delete(
+            f"/admin/prompts/{prompt_id}", headers=get_auth_headers()
+        ))
+        assert response.status_code == 200
+        assert len(deletes) == 1
+        assert count_rows("prompt_tags", "prompt_id", [prompt_id]) == 0
+        assert count_rows("prompt_likes", "prompt_id", [prompt_id]) == 0
+        assert client.delete(f"/admin/prompts/{prompt_id}", headers=get_auth_headers()).status_code == 404
+
+    def test_force_delete_tag(self):
+        """测试强制删除标签由数据库级联删除关联"""
+        _, tag, prompts = create_category_with_prompts(2)
+        response, deletes = record_deletes(lambda: client.delete(
+            f"/admin/tags/{tag['id']}?force=true", headers=get_auth_headers()
+        ))
+        assert response.status_code == 200
+        assert len(deletes) == 1
+        assert count_rows("prompt_tags", "tag_id", [tag["id"]]) == 0
+        assert count_rows("prompts", "id", [prompt["id"] for prompt in prompts]) == 2
+
+
+def test_migrate_adds_cascades():
+    """测试旧数据库的外键重建为 ON DELETE CASCADE，数据和索引保留"""
+    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    temp_db.close()
+    old_engine = create_engine(f"sqlite:///{temp_db.name}")
+    try:
+        with old_engine.begin() as conn:
+            for statement in (
+                "CREATE TABLE categories (id INTEGER PRIMARY KEY, name VARCHAR(50) NOT NULL, "
+                "description VARCHAR(200), is_active BOOLEAN NOT NULL, created_at DATETIME, updated_at DATETIME)",
+                "CREATE TABLE tags (id INTEGER PRIMARY KEY, name VARCHAR(30) NOT NULL, color VARCHAR(7), "
+                "is_active BOOLEAN NOT NULL, created_at DATETIME, updated_at DATETIME)",
+                "CREATE TABLE prompts (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, "
+                "content_markdown TEXT NOT NULL, description VARCHAR(300), "
+                "category_id INTEGER REFERENCES categories(id), is_featured BOOLEAN NOT NULL, "
+                "is_active BOOLEAN NOT NULL, like_count INTEGER, copy_count INTEGER, "
+                "created_at DATETIME, updated_at DATETIME)",
+                "CREATE TABLE prompt_tags (id INTEGER PRIMARY KEY, prompt_id INTEGER NOT NULL REFERENCES prompts(id), "
+                "tag_id INTEGER NOT NULL REFERENCES tags(id), created_at DATETIME, UNIQUE (prompt_id, tag_id))",
+                "CREATE TABLE prompt_likes (id INTEGER PRIMARY KEY, prompt_id INTEGER NOT NULL REFERENCES prompts(id), "
+                "ip_hash VARCHAR(64) NOT NULL, created_at DATETIME, UNIQUE (prompt_id, ip_hash))",
+                "INSERT INTO categories (id, name, is_active) VALUES (1, '旧分类', 1)",
+                "INSERT INTO tags (id, name, is_active) VALUES (1, '旧标签', 1)",
+                "INSERT INTO prompts (id, title, content_markdown, category_id, is_featured, is_active, like_count) "
+                "VALUES (1, '旧提示词', '旧内容', 1, 0, 1, 1)",
+                "INSERT INTO prompt_tags (prompt_id, tag_id) VALUES (1, 1)",
+                "INSERT INTO prompt_likes (prompt_id, ip_hash) VALUES (1, 'hash')",
+            ):
+                conn.execute(text(statement))
+
+        migrate(old_engine)
+        migrate(old_engine)  # 重复执行不报错
+
+        with old_engine.connect() as conn:
+            for table in ("prompts", "prompt_tags", "prompt_likes"):
+                actions = [row[6] for row in conn.execute(text(f"PRAGMA foreign_key_list({table})"))]
+                assert actions and all(action == "CASCADE" for action in actions)
+            indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(prompt_tags)"))}
+            assert "ix_prompt_tags_tag_prompt" in indexes
+            assert conn.execute(text("SELECT title, excerpt, like_count FROM prompts")).one() == ("旧提示词", "旧内容", 1)
+
+            conn.execute(text("DELETE FROM categories WHERE id = 1"))
+            assert [conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                    for table in ("prompts", "prompt_tags", "prompt_likes")] == [0, 0, 0]
+    finally:
+        old_engine.dispose()
+        os.unlink(temp_db.name)
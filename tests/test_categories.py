@@ -366,4 +366,40 @@ class TestCategoryFiltering:
         data = response.json()
         # 验证返回的分类都是激活状态
         for category in data["items"]:
-            assert category["is_active"] is True 
\ No newline at end of file
+            assert category["is_active"] is True
+
+
+class TestCategorySparseFields:
+    """测试分类列表的稀疏字段集"""
+    
+    def find_item(self, query, item_id):
+        """逐页查找指定分类"""
+        page = 1
+        while True:
+            data = client.get(f"/admin/categories/?per_page=100&page={page}&{query}", headers=get_auth_headers()).json()
+            for item in data["items"]:
+                if item["id"] == item_id:
+                    return item
+            assert data["has_next"]
+            page += 1
+    
+    def test_fields_and_count(self):
+        """测试只返回请求的字段，计数按需统计"""
+        created = client.post("/admin/categories/", json=get_unique_category_data(), headers=get_auth_headers()).json()
+        
+        assert self.find_item("fields=name", created["id"]) == {"id": created["id"], "name": created["name"]}
+        
+        assert self.find_item("fields=name,description&expand=prompt_count", created["id"]) == {
+            "id": created["id"], "name": created["name"], "description": created["description"], "prompt_count": 0
+        }
+    
+    def test_count_matches_full_listing(self):
+        """测试按需统计的计数与完整列表一致"""
+        full = client.get("/admin/categories/?per_page=100", headers=get_auth_headers()).json()["items"]
+        sparse = client.get("/admin/categories/?per_page=100&fields=id&expand=prompt_count", headers=get_auth_headers()).json()["items"]
+        assert [(item["id"], item["prompt_count"]) for item in sparse] == [(item["id"], item["prompt_count"]) for item in full]
+    
+    def test_unknown_field(self):
+        """测试未知字段返回400"""
+        response = client.get("/admin/categories/?fields=name,secret", headers=get_auth_headers())
+        assert response.status_code == 400
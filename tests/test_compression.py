@@ -0,0 +1,161 @@
+"""
+响应压缩功能测试
+测试编码协商、压缩结果缓存、流式压缩和HTML空白压缩
+"""
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import app.compression as compression
+from app.main import app
+from app.compression import (
+    CompressionMiddleware, choose_encoding, minify_html, AVAILABLE_ENCODINGS
+)
+
+client = TestClient(app)
+
+
+class TestEncodingNegotiation:
+    """测试Accept-Encoding协商"""
+
+    def test_prefers_best_available(self):
+        """测试按服务端优先级选择编码"""
+        assert choose_encoding("gzip, deflate, br, zstd") == AVAILABLE_ENCODINGS[0]
+        assert choose_encoding("gzip") == "gzip"
+
+    def test_respects_quality(self):
+        """测试q=0表示拒绝该编码"""
+        assert choose_encoding("br;q=0, zstd;q=0, gzip") == "gzip"
+        assert choose_encoding("gzip;q=0") is None
+        assert choose_encoding("identity") is None
+        assert choose_encoding("") is None
+
+    def test_wildcard(self):
+        """测试通配符"""
+        assert choose_encoding("*") == AVAILABLE_ENCODINGS[0]
+
+
+class TestResponseCompression:
+    """测试应用响应压缩"""
+
+    def test_gzip_page(self):
+        """测试HTML页面gzip压缩"""
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert "提示词分享平台" in response.text
+
+    @pytest.mark.skipif(compression.brotli is None, reason="未安装brotli")
+    def test_brotli_page(self):
+        """测试HTML页面Brotli压缩"""
+        response = client.get("/", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert "提示词分享平台" in response.text
+
+    @pytest.mark.skipif(compression.zstandard is None, reason="未安装zstandard")
+    def test_zstd_when_offered(self):
+        """测试客户端只接受zstd时使用zstd"""
+        response = client.get("/openapi.json", headers={"Accept-Encoding": "zstd"})
+        assert response.headers["content-encoding"] == "zstd"
+        assert response.json()["info"]["version"] == "0.3.0"
+
+    def test_identity_without_accept_encoding(self):
+        """测试客户端不接受压缩时原样返回"""
+        response = client.get("/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["vary"]
+
+    def test_small_body_not_compressed(self):
+        """测试过小的响应体不压缩"""
+        response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_not_modified_passthrough(self):
+        """测试304响应不经过压缩"""
+        etag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        response = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert response.status_code == 304
+        assert "content-encoding" not in response.headers
+
+    def test_static_variant_compressed_once(self, monkeypatch):
+        """测试静态文件每个内容版本只压缩一次"""
+        calls = []
+        original = compression.compress
+
+        def counting_compress(body, encoding):
+            calls.append(encoding)
+            return original(body, encoding)
+
+        monkeypatch.setattr(compression, "compress", counting_compress)
+        compression.compressed_variants.clear()
+
+        first = client.get("/static/css/custom.css", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/static/css/custom.css", headers={"Accept-Encoding": "gzip"})
+
+        assert first.headers["content-encoding"] == "gzip"
+        assert first.headers["etag"].startswith("W/")
+        assert first.text == second.text
+        assert calls == ["gzip"]
+
+    def test_variant_lookup_skips_version_poll(self, monkeypatch):
+        """测试压缩结果缓存不依赖数据版本，读取时不检查 data_version"""
+        import app.cache
+
+        polls = []
+        monkeypatch.setattr(app.cache, "sync_cache_versions", lambda force=False: polls.append(force))
+        compression.compressed_variants.get("missing")
+        assert polls == []
+
+    def test_compressed_static_revalidates(self):
+        """测试压缩后的弱ETag依然可以命中304"""
+        etag = client.get("/static/js/main.js", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        response = client.get(
+            "/static/js/main.js",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    def test_streaming_response_compressed_incrementally(self):
+        """测试流式响应逐块压缩"""
+        stream_app = FastAPI()
+        stream_app.add_middleware(CompressionMiddleware, minimum_size=10)
+
+        @stream_app.get("/stream")
+        def stream():
+            return StreamingResponse(
+                (f"<p>第{i}块</p>\n" * 50 for i in range(5)), media_type="text/html"
+            )
+
+        raw_chunks = []
+        with TestClient(stream_app) as stream_client:
+            with stream_client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+                assert response.headers["content-encoding"] == "gzip"
+                assert "content-length" not in response.headers
+                raw_chunks = list(response.iter_raw())
+
+        body = zlib.decompressobj(31).decompress(b"".join(raw_chunks)).decode()
+        assert body == "".join(f"<p>第{i}块</p>\n" * 50 for i in range(5))
+
+
+class TestMinifyHtml:
+    """测试HTML空白压缩"""
+
+    def test_strips_indentation_and_comments(self):
+        """测试删除缩进、空行和注释"""
+        html = "<div>\n    <!-- 注释 -->\n    <p>内容</p>\n\n\n    <span>a</span> <span>b</span>\n</div>\n"
+        assert minify_html(html) == "<div>\n<p>内容</p>\n<span>a</span> <span>b</span>\n</div>"
+
+    def test_preserves_pre_blocks(self):
+        """测试保留<pre>中的空白"""
+        html = "<div>\n    <pre>\n  缩进\n    保留\n</pre>\n</div>"
+        assert "<pre>\n  缩进\n    保留\n</pre>" in minify_html(html)
+
+    def test_rendered_page_is_minified(self):
+        """测试渲染后的页面已压缩空白"""
+        response = client.get("/")
+        assert "\n    " not in response.text
+        assert "<!-- 导航栏 -->" not in response.text
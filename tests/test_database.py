@@ -9,7 +9,7 @@ from pathlib import Path
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from app.database import Base, set_sqlite_pragma
-from app.models import Category, Tag, Prompt, PromptTag, PromptLike
+from app.models import Category, Tag, Prompt, PromptTag, PromptLike, utcnow_millis
 from app.crud import (
     create_category, get_category_by_name, get_categories,
     create_tag, get_tag_by_name, get_tags,
@@ -161,13 +161,36 @@ def test_indexes_created(test_db):
     indexes_to_check = [
         "ix_categories_name",
         "ix_tags_name", 
-        "ix_prompts_title",
-        "ix_prompts_like_count",
-        "ix_prompts_created_at"
+        "ix_prompts_active_created",
+        "ix_prompts_active_likes",
+        "ix_prompts_active_category_created",
+        "ix_prompt_tags_tag_prompt"
     ]
     
     for index_name in indexes_to_check:
         result = test_db.execute(
             text(f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index_name}'")
         ).fetchone()
-        assert result is not None, f"索引 {index_name} 未创建" 
\ No newline at end of file
+        assert result is not None, f"索引 {index_name} 未创建" 
+
+def test_prompt_timestamps_stored_as_epoch_millis(test_db):
+    """测试提示词时间戳按整数毫秒存储，读回仍是 datetime"""
+    from datetime import datetime
+    category = Category(name="时间戳分类")
+    test_db.add(category)
+    test_db.flush()
+    created = datetime(2024, 5, 6, 7, 8, 9, 123456)
+    prompt = Prompt(title="时间戳", content_markdown="内容", category_id=category.id, created_at=created)
+    test_db.add(prompt)
+    test_db.commit()
+    
+    row = test_db.execute(text(
+        "SELECT typeof(created_at), created_at, typeof(updated_at) FROM prompts WHERE id = :id"
+    ), {"id": prompt.id}).one()
+    assert row == ("integer", 1714979289123, "integer")
+    
+    test_db.expire_all()
+    stored = test_db.get(Prompt, prompt.id)
+    assert stored.created_at == datetime(2024, 5, 6, 7, 8, 9, 123000)
+    assert stored.updated_at.microsecond % 1000 == 0
+    assert utcnow_millis().microsecond % 1000 == 0
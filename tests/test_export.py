@@ -0,0 +1,120 @@
+"""
+数据导出测试
+测试NDJSON/CSV流式导出的内容、顺序和分批读取
+"""
+import base64
+import csv
+import io
+import json
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app import export
+from app.database import engine
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def create_test_prompt(is_active: bool = True):
+    """创建带分类和两个标签的测试提示词"""
+    timestamp = int(time.time() * 1000000)
+    category = client.post(
+        "/admin/categories/", json={"name": f"导出分类_{timestamp}"}, headers=get_auth_headers()
+    ).json()
+    tags = [
+        client.post("/admin/tags/", json={"name": f"导出标签_{timestamp}_{i}"}, headers=get_auth_headers()).json()
+        for i in range(2)
+    ]
+    prompt = client.post(
+        "/admin/prompts/",
+        json={
+            "title": f"导出提示词_{timestamp}",
+            "content": "第一行\n第二行，含\"引号\"和,逗号",
+            "category_id": category["id"],
+            "tag_ids": [tag["id"] for tag in tags],
+            "is_active": is_active,
+        },
+        headers=get_auth_headers()
+    ).json()
+    return category, tags, prompt
+
+
+def export_ndjson(query: str = ""):
+    response = client.get(f"/admin/export.ndjson{query}", headers=get_auth_headers())
+    assert response.status_code == 200
+    return response, [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestExport:
+    """测试提示词导出"""
+
+    def test_ndjson_contains_relations(self):
+        """测试NDJSON每行一条提示词，包含完整内容、分类和标签名称"""
+        category, tags, prompt = create_test_prompt()
+        response, records = export_ndjson()
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert "attachment" in response.headers["content-disposition"]
+        record = next(record for record in records if record["id"] == prompt["id"])
+        assert list(record) == list(export.EXPORT_FIELDS)
+        assert record["content"] == prompt["content"]
+        assert record["category"] == category["name"]
+        assert record["tags"] == [tag["name"] for tag in tags]
+        assert record["tag_ids"] == [tag["id"] for tag in tags]
+        assert [r["id"] for r in records] == sorted(r["id"] for r in records)
+
+    def test_active_filter(self):
+        """测试按激活状态筛选"""
+        _, _, inactive = create_test_prompt(is_active=False)
+        _, records = export_ndjson("?is_active=true")
+        assert all(record["is_active"] for record in records)
+        assert inactive["id"] not in {record["id"] for record in records}
+
+    def test_csv(self):
+        """测试CSV表头、转义和标签分隔"""
+        category, tags, prompt = create_test_prompt()
+        response = client.get("/admin/export.csv", headers=get_auth_headers())
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        assert response.content.startswith("\ufeff".encode("utf-8"))
+
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+        row = next(row for row in rows if row["id"] == str(prompt["id"]))
+        assert row["content"] == prompt["content"]
+        assert row["category"] == category["name"]
+        assert row["tags"] == export.CSV_LIST_SEPARATOR.join(tag["name"] for tag in tags)
+
+    def test_reads_in_batches(self, monkeypatch):
+        """测试按批读取：标签关联查询次数随批数增加，导出结果不变"""
+        for _ in range(3):
+            create_test_prompt()
+        _, expected = export_ndjson()
+
+        monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+        statements = []
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record_statement)
+        try:
+            _, records = export_ndjson()
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+
+        assert records == expected
+        tag_queries = [statement for statement in statements if "FROM prompt_tags" in statement]
+        assert len(tag_queries) == (len(records) + 1) // 2
+
+    def test_requires_auth(self):
+        """测试导出需要认证"""
+        assert client.get("/admin/export.ndjson").status_code == 401
+        assert client.get("/admin/export.csv").status_code == 401
@@ -0,0 +1,137 @@
+"""
+页面片段缓存测试
+测试提示词卡片跨页面复用、计数填入和失效
+"""
+import base64
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.cache import touch, SCOPE_PROMPTS
+from app.database import SessionLocal
+from app.fragments import card_cache
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def create_test_prompt():
+    """创建带分类和标签的测试提示词"""
+    timestamp = int(time.time() * 1000000)
+    category = client.post(
+        "/admin/categories/", json={"name": f"片段分类_{timestamp}"}, headers=get_auth_headers()
+    ).json()
+    tag = client.post(
+        "/admin/tags/", json={"name": f"片段标签_{timestamp}", "color": "#10b981"}, headers=get_auth_headers()
+    ).json()
+    prompt = client.post(
+        "/admin/prompts/",
+        json={
+            "title": f"片段提示词_{timestamp}",
+            "content": "卡片片段缓存测试内容",
+            "category_id": category["id"],
+            "tag_ids": [tag["id"]],
+        },
+        headers=get_auth_headers()
+    ).json()
+    return category, tag, prompt
+
+
+@pytest.fixture
+def card_renders(monkeypatch):
+    """记录卡片实际渲染（写入缓存）的次数"""
+    renders = []
+    original_set = card_cache.set
+
+    def counting_set(key, value):
+        renders.append(key[1:])
+        original_set(key, value)
+
+    monkeypatch.setattr(card_cache, "set", counting_set)
+    return renders
+
+
+class TestPromptCardCache:
+    """测试提示词卡片片段缓存"""
+
+    def test_card_reused_across_pages_and_sorts(self, card_renders):
+        """测试同一卡片在不同排序和页面间复用"""
+        category, tag, prompt = create_test_prompt()
+        url = f"/category/{category['name']}"
+
+        assert prompt["title"] in client.get(url).text
+        assert prompt["title"] in client.get(url + "?sort=hot").text
+        assert prompt["title"] in client.get(url + "?sort=like_count").text
+
+        assert len([key for key in card_renders if key[0] == prompt["id"]]) == 1
+
+    def test_variants_rendered_separately(self):
+        """测试分类页不显示分类徽章，标签页高亮当前标签"""
+        category, tag, prompt = create_test_prompt()
+
+        category_page = client.get(f"/category/{category['name']}").text
+        tag_page = client.get(f"/tag/{tag['name']}").text
+
+        assert f'href="/category/{category["name"]}"' not in category_page.split(prompt["title"])[1].split("查看详情")[0]
+        card = tag_page.split(prompt["title"])[1].split("查看详情")[0]
+        assert "background-color: #10b981; color: white;" in card
+        assert f'href="/category/{category["name"]}"' in card
+
+    def test_counts_filled_without_rerender(self, card_renders):
+        """测试计数变化时只填入新值，不重新渲染卡片"""
+        category, tag, prompt = create_test_prompt()
+        url = f"/category/{category['name']}"
+        client.get(url)
+        rendered_before = len(card_renders)
+
+        db = SessionLocal()
+        db.execute(text("UPDATE prompts SET like_count = 7, copy_count = 3 WHERE id = :id"), {"id": prompt["id"]})
+        touch(db, SCOPE_PROMPTS)
+        db.commit()
+        db.close()
+
+        content = client.get(url).text
+        assert "👍 7" in content
+        assert "📋 3" in content
+        assert "slot:" not in content
+        assert len(card_renders) == rendered_before
+
+    def test_prompt_update_rerenders_card(self):
+        """测试提示词内容或标签变化后卡片重新渲染"""
+        category, tag, prompt = create_test_prompt()
+        other_tag = client.post(
+            "/admin/tags/", json={"name": f"新增标签_{prompt['id']}"}, headers=get_auth_headers()
+        ).json()
+        url = f"/category/{category['name']}"
+        client.get(url)
+
+        # 只修改标签关联（不修改提示词字段，也不触发标签作用域失效）
+        client.put(
+            f"/admin/prompts/{prompt['id']}",
+            json={"tag_ids": [tag["id"], other_tag["id"]]},
+            headers=get_auth_headers()
+        )
+        assert other_tag["name"] in client.get(url).text
+
+    def test_tag_rename_invalidates_cards(self):
+        """测试标签改名后包含该标签的卡片失效"""
+        category, tag, prompt = create_test_prompt()
+        url = f"/category/{category['name']}"
+        client.get(url)
+
+        client.put(
+            f"/admin/tags/{tag['id']}",
+            json={"name": f"改名标签_{prompt['id']}"},
+            headers=get_auth_headers()
+        )
+        content = client.get(url).text
+        assert f"改名标签_{prompt['id']}" in content
+        assert tag["name"] not in content
@@ -0,0 +1,152 @@
+"""
+数据导入测试
+测试NDJSON/JSON批量导入、分类标签解析、逐行错误和分批写入
+"""
+import base64
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app import importer
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def unique_name(prefix: str) -> str:
+    return f"{prefix}_{int(time.time() * 1000000)}"
+
+
+def post_ndjson(records, query: str = ""):
+    body = "\n".join(record if isinstance(record, str) else json.dumps(record) for record in records)
+    return client.post(
+        f"/admin/import{query}",
+        content=body.encode("utf-8"),
+        headers={**get_auth_headers(), "Content-Type": "application/x-ndjson"}
+    )
+
+
+def find_prompts(category_id: int):
+    """按分类获取导入的提示词（含标签）"""
+    return client.get(
+        f"/admin/prompts/?category_id={category_id}&per_page=100&expand=tags,category",
+        headers=get_auth_headers()
+    ).json()["items"]
+
+
+class TestImport:
+    """测试批量导入"""
+
+    def test_import_with_names(self):
+        """测试按名称导入并自动创建分类和标签"""
+        category = unique_name("导入分类")
+        tags = [unique_name("导入标签"), unique_name("导入标签")]
+        response = post_ndjson(
+            [{"title": f"导入提示词{i}", "content": "内容" * 100, "category": category, "tags": tags} for i in range(3)],
+            "?create_missing=true"
+        )
+        assert response.status_code == 200
+        assert response.json() == {"created": 3, "failed": 0, "errors": []}
+
+        category_id = next(
+            item["id"] for item in client.get("/api/categories").json()["items"] if item["name"] == category
+        )
+        prompts = find_prompts(category_id)
+        assert sorted(prompt["title"] for prompt in prompts) == ["导入提示词0", "导入提示词1", "导入提示词2"]
+        for prompt in prompts:
+            assert [tag["name"] for tag in prompt["tags"]] == tags
+            assert prompt["excerpt"] == "内容" * 75 + "..."
+            assert prompt["created_at"] is not None
+            assert prompt["like_count"] == 0
+
+    def test_per_row_errors(self):
+        """测试逐行报告错误，其他行照常导入"""
+        category = client.post(
+            "/admin/categories/", json={"name": unique_name("导入分类")}, headers=get_auth_headers()
+        ).json()
+        good = {"title": "有效行", "content": "内容", "category_id": category["id"]}
+        response = post_ndjson([
+            good,
+            "{不是JSON",
+            {"content": "缺少标题", "category_id": category["id"]},
+            "",
+            {"title": "未知分类", "content": "内容", "category": unique_name("不存在的分类")},
+            {"title": "未知标签", "content": "内容", "category_id": category["id"], "tag_ids": [999999]},
+            {"title": "缺少分类", "content": "内容"},
+            good,
+        ])
+        data = response.json()
+        assert data["created"] == 2
+        assert data["failed"] == 5
+        assert [error["row"] for error in data["errors"]] == [2, 3, 5, 6, 7]
+        assert "title" in data["errors"][1]["error"]
+        assert "999999" in data["errors"][3]["error"]
+        assert len(find_prompts(category["id"])) == 2
+
+    def test_json_array(self):
+        """测试JSON数组请求体，同一标签重复引用只关联一次"""
+        category = client.post(
+            "/admin/categories/", json={"name": unique_name("导入分类")}, headers=get_auth_headers()
+        ).json()
+        tag = client.post("/admin/tags/", json={"name": unique_name("导入标签")}, headers=get_auth_headers()).json()
+        response = client.post(
+            "/admin/import",
+            json=[{"title": "数组导入", "content": "内容", "category": category["name"],
+                   "tags": [tag["name"]], "tag_ids": [tag["id"]]}],
+            headers=get_auth_headers()
+        )
+        assert response.json()["created"] == 1
+        prompt, = find_prompts(category["id"])
+        assert [t["id"] for t in prompt["tags"]] == [tag["id"]]
+
+        response = client.post("/admin/import", json={"title": "不是数组"}, headers=get_auth_headers())
+        assert response.status_code == 400
+
+    def test_export_round_trip(self):
+        """测试导出文件可以直接导入"""
+        category = client.post(
+            "/admin/categories/", json={"name": unique_name("导入分类")}, headers=get_auth_headers()
+        ).json()
+        tag = client.post("/admin/tags/", json={"name": unique_name("导入标签")}, headers=get_auth_headers()).json()
+        client.post(
+            "/admin/prompts/",
+            json={"title": "往返提示词", "content": "往返内容", "category_id": category["id"], "tag_ids": [tag["id"]]},
+            headers=get_auth_headers()
+        )
+        lines = [
+            line for line in client.get("/admin/export.ndjson", headers=get_auth_headers()).text.splitlines()
+            if json.loads(line)["category_id"] == category["id"]
+        ]
+        assert post_ndjson(lines).json()["created"] == 1
+
+        prompts = find_prompts(category["id"])
+        assert len(prompts) == 2
+        for prompt in prompts:
+            assert prompt["content"] == "往返内容"
+            assert [t["name"] for t in prompt["tags"]] == [tag["name"]]
+
+    def test_batches(self, monkeypatch):
+        """测试分批写入，并让公开接口缓存失效"""
+        category = client.post(
+            "/admin/categories/", json={"name": unique_name("导入分类")}, headers=get_auth_headers()
+        ).json()
+        etag = client.get("/api/prompts").headers["etag"]
+
+        monkeypatch.setattr(importer, "IMPORT_BATCH_SIZE", 2)
+        response = post_ndjson([
+            {"title": f"分批{i}", "content": "内容", "category_id": category["id"]} for i in range(5)
+        ])
+        assert response.json()["created"] == 5
+        assert len(find_prompts(category["id"])) == 5
+        assert client.get("/api/prompts").headers["etag"] != etag
+
+    def test_requires_auth(self):
+        """测试导入需要认证"""
+        assert client.post("/admin/import", content=b"{}").status_code == 401
@@ -0,0 +1,136 @@
+"""
+点赞测试
+测试按IP去重的点赞、点赞不影响更新时间、过期记录清理和点赞表结构
+"""
+import base64
+import time
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.auth import hash_ip, like_key
+from app.database import SessionLocal, engine
+from app.crud import compact_prompt_likes
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def create_prompt(**overrides):
+    timestamp = int(time.time() * 1000000)
+    category = client.post(
+        "/admin/categories/", json={"name": f"点赞分类_{timestamp}"}, headers=get_auth_headers()
+    ).json()
+    data = {"title": f"点赞提示词_{timestamp}", "content": "内容", "category_id": category["id"], **overrides}
+    return client.post("/admin/prompts/", json=data, headers=get_auth_headers()).json()
+
+
+def like(prompt_id: int, ip: str):
+    return client.post(f"/api/prompts/{prompt_id}/like", headers={"X-Forwarded-For": ip})
+
+
+def get_detail(prompt_id: int):
+    return client.get(f"/admin/prompts/{prompt_id}", headers=get_auth_headers()).json()
+
+
+def test_like_key_matches_hash_ip():
+    """测试点赞去重键与十六进制IP哈希取同样的前8字节"""
+    ip = "203.0.113.7"
+    assert like_key(ip) == int.from_bytes(bytes.fromhex(hash_ip(ip)), "big", signed=True)
+    assert -2 ** 63 <= like_key(ip) < 2 ** 63
+
+
+class TestLikePrompt:
+    """测试点赞接口"""
+
+    def test_like_once_per_ip(self):
+        """测试同一IP只计一次，不同IP分别计数"""
+        prompt = create_prompt()
+        first = like(prompt["id"], "198.51.100.1")
+        assert first.status_code == 200
+        assert first.json()["data"] == {"liked": True, "like_count": 1}
+        assert like(prompt["id"], "198.51.100.1").json()["data"] == {"liked": False, "like_count": 1}
+        assert like(prompt["id"], "198.51.100.2").json()["data"] == {"liked": True, "like_count": 2}
+        assert get_detail(prompt["id"])["like_count"] == 2
+
+    def test_duplicate_like(self):
+        """测试同一IP重复点赞返回未点赞和原点赞数，点赞数不变"""
+        prompt = create_prompt()
+        like(prompt["id"], "198.51.100.7")
+        response = like(prompt["id"], "198.51.100.7")
+        assert response.status_code == 200
+        assert response.json()["data"] == {"liked": False, "like_count": 1}
+        assert get_detail(prompt["id"])["like_count"] == 1
+
+    def test_like_keeps_updated_at(self):
+        """测试点赞不修改更新时间，公开列表的ETag随点赞数变化"""
+        prompt = create_prompt()
+        etag = client.get("/api/prompts").headers["etag"]
+        like(prompt["id"], "198.51.100.3")
+        assert get_detail(prompt["id"])["updated_at"] == prompt["updated_at"]
+        assert client.get("/api/prompts").headers["etag"] != etag
+
+    def test_like_missing_or_inactive(self):
+        """测试不存在或未激活的提示词"""
+        assert like(999999, "198.51.100.4").status_code == 404
+        prompt = create_prompt(is_active=False)
+        assert like(prompt["id"], "198.51.100.4").status_code == 404
+
+
+    def test_like_rate_limited(self):
+        """测试同一IP频繁点赞时返回429"""
+        prompt = create_prompt()
+        statuses = [like(prompt["id"], "198.51.100.8").status_code for _ in range(11)]
+        assert statuses[:10] == [200] * 10
+        assert statuses[10] == 429
+
+
+class TestCompactLikes:
+    """测试点赞记录清理"""
+
+    def test_compact_keeps_like_count(self):
+        """测试清理过期记录后点赞数不变，同一IP可以再次点赞"""
+        prompt = create_prompt()
+        like(prompt["id"], "198.51.100.5")
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE prompt_likes SET created_at = 0 WHERE prompt_id = :id"), {"id": prompt["id"]})
+
+        db = SessionLocal()
+        try:
+            assert compact_prompt_likes(db, datetime(1970, 1, 2)) >= 1
+        finally:
+            db.close()
+        with engine.connect() as conn:
+            assert conn.execute(
+                text("SELECT COUNT(*) FROM prompt_likes WHERE prompt_id = :id"), {"id": prompt["id"]}
+            ).scalar() == 0
+        assert get_detail(prompt["id"])["like_count"] == 1
+        assert like(prompt["id"], "198.51.100.5").json()["data"] == {"liked": True, "like_count": 2}
+
+    def test_compact_endpoint(self):
+        """测试清理接口只删除保留期之前的记录"""
+        prompt = create_prompt()
+        like(prompt["id"], "198.51.100.6")
+        response = client.post("/admin/prompts/likes/compact?retention_days=1", headers=get_auth_headers())
+        assert response.status_code == 200
+        assert response.json()["data"]["retention_days"] == 1
+        assert like(prompt["id"], "198.51.100.6").json()["data"]["liked"] is False
+        assert client.post("/admin/prompts/likes/compact").status_code == 401
+
+
+def test_prompt_likes_table_is_compact():
+    """测试点赞表为 WITHOUT ROWID 表，主键之外没有索引"""
+    with engine.connect() as conn:
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'prompt_likes'")).scalar()
+        indexes = [row[1] for row in conn.execute(text("PRAGMA index_list(prompt_likes)"))]
+        columns = [row[1] for row in conn.execute(text("PRAGMA table_info(prompt_likes)"))]
+    assert sql.rstrip().endswith("WITHOUT ROWID")
+    assert columns == ["prompt_id", "ip_key", "created_at"]
+    assert all(name.startswith("sqlite_autoindex") for name in indexes)
@@ -0,0 +1,152 @@
+"""
+Markdown目录同步测试
+测试 front-matter 解析、按哈希增量同步（新增/修改/删除/跳过）和同步接口
+"""
+import base64
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app import markdown_sync
+from app.database import engine
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def write_prompt(directory, name: str, category: str, tags=(), body: str = "正文内容", title=None):
+    path = directory / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = ["---"]
+    if title:
+        lines.append(f"title: {title}")
+    lines.append(f"category: {category}")
+    if tags:
+        lines.append(f"tags: [{', '.join(tags)}]")
+    lines += ["---", body]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def sync():
+    response = client.post("/admin/sync", headers=get_auth_headers())
+    assert response.status_code == 200
+    return response.json()
+
+
+def find_prompts(category_name: str):
+    """按分类名称获取同步的提示词（含标签）"""
+    category_id = next(
+        (item["id"] for item in client.get("/api/categories").json()["items"] if item["name"] == category_name),
+        None
+    )
+    if category_id is None:
+        return []
+    return client.get(
+        f"/admin/prompts/?category_id={category_id}&per_page=100&expand=tags",
+        headers=get_auth_headers()
+    ).json()["items"]
+
+
+@pytest.fixture
+def source_dir(tmp_path, monkeypatch):
+    """每个测试使用独立的同步目录，并清理之前测试同步的提示词"""
+    monkeypatch.setattr(markdown_sync, "PROMPT_SOURCE_DIR", str(tmp_path))
+    sync()
+    return tmp_path
+
+
+class TestFrontMatter:
+    """测试 front-matter 解析"""
+
+    def test_parse(self):
+        meta, body = markdown_sync.parse_front_matter(
+            "---\ntitle: \"标题: 冒号\"\ntags: [a, 'b']\nlist:\n  - x\n  - y\nis_featured: true\n---\n\n# 正文\n"
+        )
+        assert meta == {"title": "标题: 冒号", "tags": ["a", "b"], "list": ["x", "y"], "is_featured": True}
+        assert body == "# 正文"
+
+    def test_without_front_matter(self):
+        assert markdown_sync.parse_front_matter("只有正文") == ({}, "只有正文")
+
+    def test_unterminated(self):
+        with pytest.raises(ValueError):
+            markdown_sync.parse_front_matter("---\ntitle: 没有结束\n正文")
+
+
+class TestMarkdownSync:
+    """测试增量同步"""
+
+    def test_create_update_delete(self, source_dir):
+        """测试新增、修改、删除和未变化的文件"""
+        category = f"同步分类_{int(time.time() * 1000000)}"
+        tag = f"同步标签_{int(time.time() * 1000000)}"
+        write_prompt(source_dir, "a.md", category, [tag], title="提示词A")
+        write_prompt(source_dir, "sub/b.md", category, body="B的内容")
+        write_prompt(source_dir, "c.md", category)
+
+        assert sync() == {"created": 3, "updated": 0, "deleted": 0, "unchanged": 0, "errors": []}
+        prompts = {prompt["title"]: prompt for prompt in find_prompts(category)}
+        assert set(prompts) == {"提示词A", "b", "c"}
+        assert [t["name"] for t in prompts["提示词A"]["tags"]] == [tag]
+        assert prompts["b"]["content"] == "B的内容"
+
+        write_prompt(source_dir, "sub/b.md", category, [tag], body="B的新内容")
+        (source_dir / "c.md").unlink()
+        assert sync() == {"created": 0, "updated": 1, "deleted": 1, "unchanged": 1, "errors": []}
+        prompts = {prompt["title"]: prompt for prompt in find_prompts(category)}
+        assert set(prompts) == {"提示词A", "b"}
+        assert prompts["b"]["content"] == "B的新内容"
+        assert prompts["b"]["excerpt"] == "B的新内容"
+        assert [t["name"] for t in prompts["b"]["tags"]] == [tag]
+
+    def test_unchanged_files_are_not_written(self, source_dir):
+        """测试文件未变化时不写数据库，公开接口缓存保持有效"""
+        category = f"同步分类_{int(time.time() * 1000000)}"
+        for i in range(3):
+            write_prompt(source_dir, f"p{i}.md", category)
+        sync()
+        etag = client.get("/api/prompts").headers["etag"]
+
+        statements = []
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record_statement)
+        try:
+            result = sync()
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+
+        assert result["unchanged"] == 3 and result["created"] == result["updated"] == 0
+        assert not [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))]
+        assert client.get("/api/prompts").headers["etag"] == etag
+
+    def test_invalid_files_are_reported(self, source_dir):
+        """测试无法解析的文件单独报告，对应的提示词保持不变"""
+        category = f"同步分类_{int(time.time() * 1000000)}"
+        write_prompt(source_dir, "good.md", category)
+        write_prompt(source_dir, "broken.md", category)
+        sync()
+
+        (source_dir / "broken.md").write_text("---\ncategory 缺少冒号\n---\n正文", encoding="utf-8")
+        (source_dir / "no_category.md").write_text("没有分类", encoding="utf-8")
+        (source_dir / "notes.txt").write_text("不参与同步", encoding="utf-8")
+        result = sync()
+        assert [error["path"] for error in result["errors"]] == ["broken.md", "no_category.md"]
+        assert result["unchanged"] == 1 and result["deleted"] == 0
+        assert {prompt["title"] for prompt in find_prompts(category)} == {"good", "broken"}
+
+    def test_requires_directory(self, monkeypatch):
+        """测试未配置同步目录和认证"""
+        monkeypatch.setattr(markdown_sync, "PROMPT_SOURCE_DIR", None)
+        assert client.post("/admin/sync", headers=get_auth_headers()).status_code == 400
+        assert client.post("/admin/sync").status_code == 401
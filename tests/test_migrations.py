@@ -0,0 +1,194 @@
+"""
+结构迁移测试
+测试新数据库建表、旧数据库按顺序迁移、重复执行和启动时的版本检查
+"""
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.database import init_database
+from app.migrations import LATEST_VERSION, MIGRATIONS, current_version, migrate
+
+
+@pytest.fixture
+def temp_engine():
+    """临时数据库"""
+    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    temp_db.close()
+    temp = create_engine(f"sqlite:///{temp_db.name}")
+    yield temp
+    temp.dispose()
+    os.unlink(temp_db.name)
+
+
+def schema_objects(bind) -> set:
+    """表和索引（不含版本表和自动索引）"""
+    with bind.connect() as conn:
+        return set(conn.execute(text(
+            "SELECT type, name, tbl_name FROM sqlite_master "
+            "WHERE name NOT LIKE 'sqlite_%' AND name != 'schema_migrations'"
+        )))
+
+
+def applied_versions(bind) -> list:
+    with bind.connect() as conn:
+        return list(conn.execute(text("SELECT version FROM schema_migrations ORDER BY version")).scalars())
+
+
+def test_migrations_are_ordered():
+    """测试迁移版本号连续递增"""
+    assert [migration.version for migration in MIGRATIONS] == list(range(1, LATEST_VERSION + 1))
+
+
+def test_fresh_database(temp_engine):
+    """测试新数据库直接按模型建表，记录全部版本"""
+    assert current_version(temp_engine) == 0
+    assert migrate(temp_engine) == list(range(1, LATEST_VERSION + 1))
+    assert current_version(temp_engine) == LATEST_VERSION
+    assert applied_versions(temp_engine) == list(range(1, LATEST_VERSION + 1))
+    assert migrate(temp_engine) == []
+
+
+def test_legacy_database_matches_fresh(temp_engine, tmp_path):
+    """测试没有版本记录的旧数据库按顺序迁移后，表和索引与新数据库一致"""
+    with temp_engine.begin() as conn:
+        for statement in (
+            "CREATE TABLE categories (id INTEGER PRIMARY KEY, name VARCHAR(50) NOT NULL, "
+            "description VARCHAR(200), is_active BOOLEAN NOT NULL, created_at DATETIME, updated_at DATETIME)",
+            "CREATE INDEX ix_categories_id ON categories (id)",
+            "CREATE UNIQUE INDEX ix_categories_name ON categories (name)",
+            "CREATE INDEX ix_categories_is_active ON categories (is_active)",
+            "CREATE TABLE prompts (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, "
+            "content_markdown TEXT NOT NULL, description VARCHAR(300), "
+            "category_id INTEGER REFERENCES categories(id), is_featured BOOLEAN NOT NULL, "
+            "is_active BOOLEAN NOT NULL, like_count INTEGER, copy_count INTEGER, "
+            "created_at DATETIME, updated_at DATETIME)",
+            "CREATE INDEX ix_prompts_is_active ON prompts (is_active)",
+            "CREATE INDEX ix_prompts_created ON prompts (created_at)",
+            "INSERT INTO categories (id, name, is_active) VALUES (1, '旧分类', 1)",
+            "INSERT INTO prompts (id, title, content_markdown, category_id, is_featured, is_active) "
+            "VALUES (1, '旧提示词', '旧内容', 1, 0, 1)",
+        ):
+            conn.execute(text(statement))
+
+    assert migrate(temp_engine, target=2) == [1, 2]
+    assert current_version(temp_engine) == 2
+    assert migrate(temp_engine) == list(range(3, LATEST_VERSION + 1))
+    assert migrate(temp_engine) == []
+
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    try:
+        migrate(fresh)
+        assert schema_objects(temp_engine) == schema_objects(fresh)
+    finally:
+        fresh.dispose()
+    with temp_engine.connect() as conn:
+        assert conn.execute(text("SELECT title, excerpt FROM prompts")).one() == ("旧提示词", "旧内容")
+
+
+def test_startup_check_reads_version_only(temp_engine):
+    """测试已是最新版本时，启动检查只执行一条读取版本号的查询"""
+    migrate(temp_engine)
+
+    statements = []
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(temp_engine, "before_cursor_execute", record_statement)
+    try:
+        init_database(temp_engine)
+    finally:
+        event.remove(temp_engine, "before_cursor_execute", record_statement)
+    assert statements == ["SELECT MAX(version) FROM schema_migrations"]
+
+
+def test_prompt_tags_rebuilt_without_rowid(temp_engine):
+    """测试旧的 prompt_tags（代理主键）重建为 WITHOUT ROWID 表，关联保留"""
+    with temp_engine.begin() as conn:
+        for statement in (
+            "CREATE TABLE tags (id INTEGER PRIMARY KEY, name VARCHAR(30) NOT NULL, color VARCHAR(7), "
+            "is_active BOOLEAN NOT NULL, created_at DATETIME, updated_at DATETIME)",
+            "CREATE TABLE prompt_tags (id INTEGER NOT NULL, prompt_id INTEGER NOT NULL, tag_id INTEGER NOT NULL, "
+            "created_at DATETIME, PRIMARY KEY (id), CONSTRAINT uq_prompt_tag UNIQUE (prompt_id, tag_id), "
+            "FOREIGN KEY(prompt_id) REFERENCES prompts (id) ON DELETE CASCADE, "
+            "FOREIGN KEY(tag_id) REFERENCES tags (id) ON DELETE CASCADE)",
+            "CREATE INDEX ix_prompt_tags_tag_prompt ON prompt_tags (tag_id, prompt_id)",
+        ):
+            conn.execute(text(statement))
+    migrate(temp_engine, target=5)
+    with temp_engine.begin() as conn:
+        conn.execute(text("INSERT INTO categories (id, name, is_active) VALUES (1, '分类', 1)"))
+        conn.execute(text(
+            "INSERT INTO prompts (id, title, content_markdown, category_id, is_featured, is_active) "
+            "VALUES (1, '提示词', '内容', 1, 0, 1)"
+        ))
+        conn.execute(text("INSERT INTO tags (id, name, is_active) VALUES (1, 'a', 1), (2, 'b', 1)"))
+        conn.execute(text("INSERT INTO prompt_tags (prompt_id, tag_id) VALUES (1, 2), (1, 1)"))
+
+    assert migrate(temp_engine) == list(range(6, LATEST_VERSION + 1))
+    with temp_engine.connect() as conn:
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'prompt_tags'")).scalar()
+        assert sql.rstrip().endswith("WITHOUT ROWID")
+        assert "id" not in {row[1] for row in conn.execute(text("PRAGMA table_info(prompt_tags)"))}
+        assert conn.execute(text("SELECT prompt_id, tag_id FROM prompt_tags")).all() == [(1, 1), (1, 2)]
+        indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(prompt_tags)"))}
+        assert "ix_prompt_tags_tag_prompt" in indexes
+
+
+def test_prompt_timestamps_converted_to_epoch_millis(temp_engine):
+    """测试旧数据库中ISO文本格式的提示词时间戳换算为整数毫秒"""
+    with temp_engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE prompts (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, "
+            "content_markdown TEXT NOT NULL, category_id INTEGER, is_featured BOOLEAN NOT NULL, "
+            "is_active BOOLEAN NOT NULL, like_count INTEGER, copy_count INTEGER, "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO prompts (id, title, content_markdown, is_featured, is_active, created_at, updated_at) VALUES "
+            "(1, 'a', 'a', 0, 1, '2024-05-06 07:08:09.123456', '2024-05-06 07:08:10'), "
+            "(2, 'b', 'b', 0, 1, NULL, NULL)"
+        ))
+
+    migrate(temp_engine)
+    with temp_engine.connect() as conn:
+        assert conn.execute(text("SELECT created_at, updated_at FROM prompts ORDER BY id")).all() == [
+            (1714979289123, 1714979290000), (None, None)
+        ]
+
+
+def test_prompt_likes_compacted(temp_engine):
+    """测试旧的点赞记录换算为整数键，已有的去重记录继续有效"""
+    from app.auth import hash_ip, like_key
+
+    with temp_engine.begin() as conn:
+        for statement in (
+            "CREATE TABLE prompt_likes (id INTEGER NOT NULL, prompt_id INTEGER NOT NULL, "
+            "ip_hash VARCHAR(64) NOT NULL, created_at DATETIME, PRIMARY KEY (id), "
+            "CONSTRAINT uq_prompt_like UNIQUE (prompt_id, ip_hash), "
+            "FOREIGN KEY(prompt_id) REFERENCES prompts (id) ON DELETE CASCADE)",
+            "CREATE INDEX ix_prompt_likes_ip ON prompt_likes (ip_hash)",
+        ):
+            conn.execute(text(statement))
+    migrate(temp_engine, target=7)
+    with temp_engine.begin() as conn:
+        conn.execute(text("INSERT INTO categories (id, name, is_active) VALUES (1, '分类', 1)"))
+        conn.execute(text(
+            "INSERT INTO prompts (id, title, content_markdown, category_id, is_featured, is_active) "
+            "VALUES (1, '提示词', '内容', 1, 0, 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO prompt_likes (prompt_id, ip_hash, created_at) VALUES "
+            "(1, :hash, '2024-05-06 07:08:09.123456'), (1, 'hash', NULL)"
+        ), {"hash": hash_ip("192.0.2.1")})
+
+    assert migrate(temp_engine) == list(range(8, LATEST_VERSION + 1))
+    with temp_engine.connect() as conn:
+        rows = conn.execute(text("SELECT ip_key, created_at FROM prompt_likes")).all()
+        indexes = [row[1] for row in conn.execute(text("PRAGMA index_list(prompt_likes)"))]
+    assert len(rows) == 2
+    assert (like_key("192.0.2.1"), 1714979289123) in rows
+    assert all(isinstance(created_at, int) for _, created_at in rows)
+    assert "ix_prompt_likes_ip" not in indexes
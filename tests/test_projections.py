@@ -0,0 +1,134 @@
+"""
+列表投影测试
+测试预览摘要同步、投影查询列和旧库补列
+"""
+import base64
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+from app.main import app
+from app.crud import get_prompt_rows
+from app.database import SessionLocal, engine
+from app.migrations import migrate
+from app.models import EXCERPT_LENGTH, make_excerpt
+from app.projections import PromptRow, CategoryRow, TagRow
+from app.schemas import PromptRead
+
+client = TestClient(app)
+
+
+def get_auth_headers():
+    """获取管理员认证头"""
+    credentials = base64.b64encode(b"admin:admin123").decode("ascii")
+    return {"Authorization": f"Basic {credentials}"}
+
+
+def create_test_prompt(content: str):
+    """创建带分类和标签的测试提示词"""
+    timestamp = int(time.time() * 1000000)
+    category = client.post(
+        "/admin/categories/", json={"name": f"投影分类_{timestamp}"}, headers=get_auth_headers()
+    ).json()
+    tag = client.post(
+        "/admin/tags/", json={"name": f"投影标签_{timestamp}"}, headers=get_auth_headers()
+    ).json()
+    prompt = client.post(
+        "/admin/prompts/",
+        json={
+            "title": f"投影提示词_{timestamp}",
+            "content": content,
+            "category_id": category["id"],
+            "tag_ids": [tag["id"]],
+        },
+        headers=get_auth_headers()
+    ).json()
+    return category, tag, prompt
+
+
+def test_make_excerpt():
+    """测试预览摘要截断"""
+    assert make_excerpt("短内容") == "短内容"
+    assert make_excerpt("字" * 200) == "字" * EXCERPT_LENGTH + "..."
+
+
+def test_excerpt_follows_content():
+    """测试创建和修改内容时同步预览摘要"""
+    _, _, prompt = create_test_prompt("甲" * 300)
+    assert prompt["excerpt"] == "甲" * EXCERPT_LENGTH + "..."
+
+    response = client.put(
+        f"/admin/prompts/{prompt['id']}", json={"content": "新的内容"}, headers=get_auth_headers()
+    )
+    assert response.json()["excerpt"] == "新的内容"
+
+
+def test_rows_skip_full_content():
+    """测试投影查询不读取完整内容，返回命名元组"""
+    category, tag, prompt = create_test_prompt("乙" * 3000)
+
+    statements = []
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        rows, total = get_prompt_rows(db, category_id=category["id"], is_active=True)
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+        db.close()
+
+    assert total == 1
+    row = rows[0]
+    assert isinstance(row, PromptRow)
+    assert isinstance(row.category, CategoryRow)
+    assert all(isinstance(tag_row, TagRow) for tag_row in row.tags)
+    assert row.excerpt == "乙" * EXCERPT_LENGTH + "..."
+    assert row.content is None
+    assert row.tag_ids == (tag["id"],)
+    assert not any("content_markdown" in statement for statement in statements)
+
+
+def test_prompt_read_accepts_rows():
+    """测试 PromptRead 可以直接校验投影行"""
+    category, tag, prompt = create_test_prompt("丙")
+    db = SessionLocal()
+    try:
+        rows, _ = get_prompt_rows(db, category_id=category["id"])
+    finally:
+        db.close()
+
+    item = PromptRead.model_validate(rows[0])
+    assert item.id == prompt["id"]
+    assert item.category.name == category["name"]
+    assert [t.name for t in item.tags] == [tag["name"]]
+    assert item.tag_ids == [tag["id"]]
+
+
+def test_migrate_backfills_excerpt():
+    """测试旧数据库补充 excerpt 列并回填"""
+    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    temp_db.close()
+    old_engine = create_engine(f"sqlite:///{temp_db.name}")
+    try:
+        with old_engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE prompts (id INTEGER PRIMARY KEY, content_markdown TEXT NOT NULL, "
+                "category_id INTEGER, is_active BOOLEAN, like_count INTEGER, copy_count INTEGER, created_at DATETIME)"
+            ))
+            conn.execute(text("INSERT INTO prompts (content_markdown) VALUES (:short), (:long)"),
+                         {"short": "短", "long": "长" * 200})
+
+        migrate(old_engine)
+        migrate(old_engine)  # 重复执行不报错
+
+        with old_engine.connect() as conn:
+            excerpts = [row[0] for row in conn.execute(text("SELECT excerpt FROM prompts ORDER BY id"))]
+        assert excerpts == ["短", "长" * EXCERPT_LENGTH + "..."]
+    finally:
+        old_engine.dispose()
+        os.unlink(temp_db.name)
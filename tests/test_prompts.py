@@ -5,7 +5,9 @@
 import pytest
 import base64
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from app.main import app
+from app.database import engine
 
 client = TestClient(app)
 
@@ -485,4 +487,350 @@ class TestPromptRelations:
         assert response.status_code == 200
         
         data = response.json()
-        assert len(data["tags"]) == 0 
\ No newline at end of file
+        assert len(data["tags"]) == 0
+
+
+def record_statements(func):
+    """执行请求并记录期间执行的SQL语句"""
+    statements = []
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        response = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return response, statements
+
+
+class TestPromptSparseFields:
+    """测试提示词列表的稀疏字段集和关联展开"""
+    
+    def create_prompt(self):
+        test_data = get_unique_prompt_data()
+        response = client.post("/admin/prompts/", json=test_data, headers=get_auth_headers())
+        return test_data, response.json()
+    
+    def test_fields_only(self):
+        """测试只返回请求的字段，不查询完整内容和关联"""
+        test_data, prompt = self.create_prompt()
+        url = f"/admin/prompts/?category_id={test_data['category_id']}&fields=title,like_count"
+        response, statements = record_statements(lambda: client.get(url, headers=get_auth_headers()))
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"] == [{"id": prompt["id"], "title": prompt["title"], "like_count": 0}]
+        assert not any("content_markdown" in statement for statement in statements)
+        assert not any("prompt_tags" in statement for statement in statements)
+    
+    def test_expand_relations(self):
+        """测试展开分类和标签，每种关联只查询一次"""
+        test_data, prompt = self.create_prompt()
+        url = f"/admin/prompts/?category_id={test_data['category_id']}&fields=id&expand=category,tags"
+        response, statements = record_statements(lambda: client.get(url, headers=get_auth_headers()))
+        
+        item = response.json()["items"][0]
+        assert set(item) == {"id", "category", "tags"}
+        assert item["category"]["id"] == test_data["category_id"]
+        assert [tag["id"] for tag in item["tags"]] == test_data["tag_ids"]
+        selects = [statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 4  # 总数、提示词、分类、标签
+    
+    def test_tag_ids_field(self):
+        """测试 tag_ids 只查询关联表"""
+        test_data, prompt = self.create_prompt()
+        url = f"/admin/prompts/?category_id={test_data['category_id']}&fields=tag_ids"
+        item = client.get(url, headers=get_auth_headers()).json()["items"][0]
+        assert item == {"id": prompt["id"], "tag_ids": test_data["tag_ids"]}
+    
+    def test_expand_without_fields(self):
+        """测试只指定 expand 时返回全部字段"""
+        test_data, prompt = self.create_prompt()
+        url = f"/admin/prompts/?category_id={test_data['category_id']}&expand=tags"
+        item = client.get(url, headers=get_auth_headers()).json()["items"][0]
+        assert item["content"] == test_data["content"]
+        assert item["tag_ids"] == test_data["tag_ids"]
+        assert len(item["tags"]) == 2
+        assert "category" not in item
+    
+    def test_unknown_field(self):
+        """测试未知字段返回400"""
+        response = client.get("/admin/prompts/?fields=title,secret", headers=get_auth_headers())
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+        
+        response = client.get("/admin/prompts/?expand=likes", headers=get_auth_headers())
+        assert response.status_code == 400
+
+
+class TestPromptBatch:
+    """测试批量获取提示词"""
+    
+    def create_prompts(self, count):
+        prompts = []
+        for _ in range(count):
+            response = client.post("/admin/prompts/", json=get_unique_prompt_data(), headers=get_auth_headers())
+            prompts.append(response.json())
+        return prompts
+    
+    def test_batch_in_request_order(self):
+        """测试结果按请求顺序返回，不存在的ID对应null"""
+        first, second = self.create_prompts(2)
+        ids = [second["id"], 999999, first["id"], second["id"]]
+        response = client.get(
+            f"/admin/prompts/batch?ids={','.join(map(str, ids))}", headers=get_auth_headers()
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] if item else None for item in data["items"]] == [second["id"], None, first["id"], second["id"]]
+        assert data["missing"] == [999999]
+    
+    def test_batch_matches_detail(self):
+        """测试批量结果与单个获取一致"""
+        prompt, = self.create_prompts(1)
+        detail = client.get(f"/admin/prompts/{prompt['id']}", headers=get_auth_headers()).json()
+        item = client.post(
+            "/admin/prompts/batch", json={"ids": [prompt["id"]]}, headers=get_auth_headers()
+        ).json()["items"][0]
+        
+        assert item["content"] == detail["content"]
+        assert item["category"]["name"] == detail["category"]["name"]
+        assert [(tag["id"], tag["usage_count"]) for tag in item["tags"]] == \
+            [(tag["id"], tag["usage_count"]) for tag in detail["tags"]]
+        assert item["tag_ids"] == [tag["id"] for tag in detail["tags"]]
+    
+    def test_batch_query_count_constant(self):
+        """测试查询次数不随ID数量增加"""
+        prompts = self.create_prompts(6)
+        def fetch(items):
+            ids = ",".join(str(prompt["id"]) for prompt in items)
+            return client.get(f"/admin/prompts/batch?ids={ids}", headers=get_auth_headers())
+        
+        _, few = record_statements(lambda: fetch(prompts[:2]))
+        _, many = record_statements(lambda: fetch(prompts))
+        assert len(many) == len(few)
+    
+    def test_batch_invalid_ids(self):
+        """测试非法或超量的ID列表"""
+        assert client.get("/admin/prompts/batch?ids=1,abc", headers=get_auth_headers()).status_code == 400
+        too_many = ",".join(str(i) for i in range(1, 502))
+        assert client.get(f"/admin/prompts/batch?ids={too_many}", headers=get_auth_headers()).status_code == 400
+        assert client.post("/admin/prompts/batch", json={"ids": []}, headers=get_auth_headers()).status_code == 422
+    
+    def test_batch_requires_auth(self):
+        """测试批量获取需要认证"""
+        assert client.get("/admin/prompts/batch?ids=1").status_code == 401
+
+
+class TestPromptWritePath:
+    """测试创建/更新的单事务写入路径"""
+    
+    def test_create_query_count_constant(self):
+        """测试标签校验为一次IN查询，语句数不随标签数量增加"""
+        category_id = create_test_category()
+        few_tags = create_test_tags()
+        many_tags = few_tags + create_test_tags() + create_test_tags()
+        def create(tag_ids):
+            data = {**get_unique_prompt_data(), "category_id": category_id, "tag_ids": tag_ids}
+            return lambda: client.post("/admin/prompts/", json=data, headers=get_auth_headers())
+        
+        response, few = record_statements(create(few_tags))
+        assert response.status_code == 201
+        response, many = record_statements(create(many_tags))
+        assert response.status_code == 201
+        assert len(many) == len(few)
+        assert response.json()["tag_ids"] == many_tags
+    
+    def test_create_response_matches_detail(self):
+        """测试创建的响应（不重新查询）与单个获取一致"""
+        data = get_unique_prompt_data()
+        created = client.post("/admin/prompts/", json=data, headers=get_auth_headers()).json()
+        detail = client.get(f"/admin/prompts/{created['id']}", headers=get_auth_headers()).json()
+        assert created == {**detail, "tag_ids": data["tag_ids"]}
+        assert [tag["usage_count"] for tag in created["tags"]] == [1, 1]
+    
+    def test_update_tags_as_set_diff(self):
+        """测试只删除移除的标签关联、只插入新增的关联"""
+        data = get_unique_prompt_data()
+        prompt = client.post("/admin/prompts/", json=data, headers=get_auth_headers()).json()
+        kept, removed = data["tag_ids"]
+        added, _ = create_test_tags()
+        
+        def update(tag_ids):
+            return lambda: client.put(
+                f"/admin/prompts/{prompt['id']}", json={"tag_ids": tag_ids}, headers=get_auth_headers()
+            )
+        
+        response, statements = record_statements(update([added, kept]))
+        assert response.status_code == 200
+        assert response.json()["tag_ids"] == [kept, added]
+        tag_writes = [s for s in statements if s.startswith(("INSERT INTO prompt_tags", "DELETE FROM prompt_tags"))]
+        assert len(tag_writes) == 2
+        assert "tag_id IN" in next(s for s in tag_writes if s.startswith("DELETE"))
+        
+        response, statements = record_statements(update([kept, added]))
+        assert response.json()["updated_at"] == client.get(
+            f"/admin/prompts/{prompt['id']}", headers=get_auth_headers()
+        ).json()["updated_at"]
+        assert not [s for s in statements if "INTO prompt_tags" in s or "FROM prompt_tags" in s and s.startswith("DELETE")]
+        
+        detail = client.get(f"/admin/prompts/{prompt['id']}", headers=get_auth_headers()).json()
+        assert [tag["id"] for tag in detail["tags"]] == [kept, added]
+        assert removed not in [tag["id"] for tag in detail["tags"]]
+    
+    def test_update_invalid_tag_rolls_back(self):
+        """测试存在无效标签时整个更新回滚"""
+        data = get_unique_prompt_data()
+        prompt = client.post("/admin/prompts/", json=data, headers=get_auth_headers()).json()
+        response = client.put(
+            f"/admin/prompts/{prompt['id']}",
+            json={"title": "不应保存", "tag_ids": [data["tag_ids"][0], 999999]},
+            headers=get_auth_headers()
+        )
+        assert response.status_code == 400
+        assert "999999" in response.json()["detail"]
+        detail = client.get(f"/admin/prompts/{prompt['id']}", headers=get_auth_headers()).json()
+        assert detail["title"] == data["title"]
+        assert [tag["id"] for tag in detail["tags"]] == data["tag_ids"]
+
+
+class TestPromptRetag:
+    """测试批量调整分类和标签"""
+    
+    def create_prompts(self, count):
+        data = get_unique_prompt_data()
+        prompts = [
+            client.post("/admin/prompts/", json=data, headers=get_auth_headers()).json() for _ in range(count)
+        ]
+        return data, prompts
+    
+    def retag(self, body):
+        return client.post("/admin/prompts/retag", json=body, headers=get_auth_headers())
+    
+    def detail(self, prompt_id):
+        return client.get(f"/admin/prompts/{prompt_id}", headers=get_auth_headers()).json()
+    
+    def test_move_category_and_tags(self):
+        """测试按分类筛选后改分类、添加和移除标签"""
+        data, prompts = self.create_prompts(3)
+        kept, removed = data["tag_ids"]
+        added, _ = create_test_tags()
+        new_category = create_test_category()
+        
+        response, statements = record_statements(lambda: self.retag({
+            "where": {"category_id": data["category_id"]},
+            "category_id": new_category,
+            "add_tag_ids": [added, kept],
+            "remove_tag_ids": [removed],
+        }))
+        assert response.status_code == 200
+        assert response.json()["data"] == {"matched": 3}
+        writes = [s for s in statements if s.startswith(("INSERT", "UPDATE", "DELETE"))]
+        assert len(writes) == 4  # 缓存版本号 + 添加标签 + 移除标签 + 更新提示词
+        
+        for prompt in prompts:
+            detail = self.detail(prompt["id"])
+            assert detail["category_id"] == new_category
+            assert [tag["id"] for tag in detail["tags"]] == [kept, added]
+            assert detail["updated_at"] > prompt["updated_at"]
+    
+    def test_filter_by_removed_tag(self):
+        """测试按标签筛选并移除该标签（范围先解析为ID，不受后续语句影响）"""
+        data, prompts = self.create_prompts(2)
+        tag_id = data["tag_ids"][0]
+        new_category = create_test_category()
+        response = self.retag({
+            "where": {"tag_id": tag_id, "ids": [prompts[0]["id"]]},
+            "category_id": new_category,
+            "remove_tag_ids": [tag_id],
+        })
+        assert response.json()["data"] == {"matched": 1}
+        assert self.detail(prompts[0]["id"])["category_id"] == new_category
+        assert tag_id not in [tag["id"] for tag in self.detail(prompts[0]["id"])["tags"]]
+        assert self.detail(prompts[1]["id"])["category_id"] == data["category_id"]
+    
+    def test_invalid_requests(self):
+        """测试空范围、无操作、无效引用"""
+        data, prompts = self.create_prompts(1)
+        where = {"ids": [prompts[0]["id"]]}
+        assert self.retag({"where": {}, "add_tag_ids": data["tag_ids"]}).status_code == 400
+        assert self.retag({"where": where}).status_code == 400
+        assert self.retag({"where": where, "category_id": 999999}).status_code == 400
+        assert self.retag({"where": where, "add_tag_ids": [999999]}).status_code == 400
+        assert self.retag({
+            "where": where, "add_tag_ids": data["tag_ids"], "remove_tag_ids": data["tag_ids"]
+        }).status_code == 400
+        assert self.retag({"where": {"ids": [999999]}, "add_tag_ids": data["tag_ids"]}).json()["data"] == {"matched": 0}
+        assert client.post("/admin/prompts/retag", json={"where": where}).status_code == 401
+
+
+class TestPromptBulkWrite:
+    """测试批量更新和删除"""
+    
+    def create_prompts(self, count, **overrides):
+        data = {**get_unique_prompt_data(), **overrides}
+        return data, [
+            client.post("/admin/prompts/", json=data, headers=get_auth_headers()).json() for _ in range(count)
+        ]
+    
+    def bulk(self, method, body):
+        return client.request(method, "/admin/prompts/", json=body, headers=get_auth_headers())
+    
+    def detail(self, prompt_id):
+        return client.get(f"/admin/prompts/{prompt_id}", headers=get_auth_headers())
+    
+    def test_bulk_update_by_filter(self):
+        """测试按分类和精选状态筛选后批量取消精选，一条UPDATE完成"""
+        data, prompts = self.create_prompts(3)
+        other, = self.create_prompts(1, is_featured=False)[1]
+        etag = client.get("/api/prompts").headers["etag"]
+        
+        response, statements = record_statements(lambda: self.bulk("PATCH", {
+            "where": {"category_id": data["category_id"], "is_featured": True},
+            "is_featured": False,
+        }))
+        assert response.status_code == 200
+        assert response.json()["data"] == {"affected": 3}
+        assert len([s for s in statements if s.startswith("UPDATE prompts")]) == 1
+        for prompt in prompts:
+            detail = self.detail(prompt["id"]).json()
+            assert detail["is_featured"] is False
+            assert detail["updated_at"] > prompt["updated_at"]
+        assert self.detail(other["id"]).json()["updated_at"] == other["updated_at"]
+        assert client.get("/api/prompts").headers["etag"] != etag
+    
+    def test_bulk_update_by_ids(self):
+        """测试按ID列表批量停用"""
+        _, prompts = self.create_prompts(3)
+        ids = [prompt["id"] for prompt in prompts[:2]]
+        response = self.bulk("PATCH", {"where": {"ids": ids + [999999]}, "is_active": False})
+        assert response.json()["data"] == {"affected": 2}
+        assert [self.detail(prompt["id"]).json()["is_active"] for prompt in prompts] == [False, False, True]
+    
+    def test_bulk_delete_by_tag(self):
+        """测试按标签批量删除"""
+        data, prompts = self.create_prompts(2)
+        _, others = self.create_prompts(1)
+        response = self.bulk("DELETE", {"where": {"tag_id": data["tag_ids"][0]}})
+        assert response.status_code == 200
+        assert response.json()["data"] == {"affected": 2}
+        assert all(self.detail(prompt["id"]).status_code == 404 for prompt in prompts)
+        assert self.detail(others[0]["id"]).status_code == 200
+        
+        tag = client.get(f"/admin/tags/{data['tag_ids'][0]}", headers=get_auth_headers()).json()
+        assert tag["usage_count"] == 0
+    
+    def test_no_match_does_not_invalidate(self):
+        """测试没有匹配时不写入、不使缓存失效"""
+        etag = client.get("/api/prompts").headers["etag"]
+        assert self.bulk("DELETE", {"where": {"ids": [999999]}}).json()["data"] == {"affected": 0}
+        assert self.bulk("PATCH", {"where": {"ids": [999999]}, "is_active": True}).json()["data"] == {"affected": 0}
+        assert client.get("/api/prompts").headers["etag"] == etag
+    
+    def test_invalid_requests(self):
+        """测试空范围、没有字段和认证"""
+        assert self.bulk("DELETE", {"where": {}}).status_code == 400
+        assert self.bulk("PATCH", {"where": {"ids": [1]}}).status_code == 400
+        assert client.request("DELETE", "/admin/prompts/", json={"where": {"ids": [1]}}).status_code == 401
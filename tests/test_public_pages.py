@@ -318,4 +318,186 @@ class TestErrorHandling:
         """测试标签不存在"""
         response = client.get("/tag/不存在的标签123")
         assert response.status_code == 404
-        assert "不存在" in response.json()["detail"] 
\ No newline at end of file
+        assert "不存在" in response.json()["detail"] 
+
+class TestConditionalRequests:
+    """测试基于数据版本的HTTP条件缓存"""
+    
+    def test_list_pages_carry_validators(self):
+        """测试列表页面带有ETag和缓存控制头"""
+        test_data = create_test_data()
+        
+        for url in ["/", f"/category/{test_data['category']['name']}", f"/tag/{test_data['tag']['name']}"]:
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.headers["etag"].startswith('W/"')
+            assert response.headers["cache-control"] == "no-cache"
+            assert "last-modified" in response.headers
+    
+    def test_if_none_match_returns_304_without_queries(self):
+        """测试ETag命中时返回304且不执行SQL查询"""
+        from sqlalchemy import event
+        from app.database import engine
+        
+        create_test_data()
+        etag = client.get("/?page=1").headers["etag"]
+        
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            response = client.get("/?page=1", headers={"If-None-Match": etag})
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert statements == []
+    
+    def test_etag_differs_by_query(self):
+        """测试不同查询参数的页面ETag不同"""
+        etag_first = client.get("/?sort=created_at").headers["etag"]
+        etag_second = client.get("/?sort=hot").headers["etag"]
+        assert etag_first != etag_second
+    
+    def test_write_changes_etag(self):
+        """测试数据写入后ETag变化，旧ETag返回200"""
+        test_data = create_test_data()
+        url = f"/category/{test_data['category']['name']}"
+        etag = client.get(url).headers["etag"]
+        
+        client.put(
+            f"/admin/prompts/{test_data['prompts'][0]['id']}",
+            json={"title": "更新后的标题_条件缓存"},
+            headers=get_auth_headers()
+        )
+        
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert "更新后的标题_条件缓存" in response.text
+    
+    def test_if_modified_since(self):
+        """测试 If-Modified-Since 条件请求"""
+        create_test_data()
+        last_modified = client.get("/").headers["last-modified"]
+        
+        response = client.get("/", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+        
+        response = client.get("/", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+        assert response.status_code == 200
+
+
+def collect_body_chunks(path):
+    """直接调用ASGI应用，按发送顺序收集响应体消息（TestClient会合并响应体）"""
+    import anyio
+    
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "root_path": "",
+        "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "server": ("testserver", 80), "client": ("testclient", 50000),
+    }
+    chunks = []
+    requested = False
+    
+    async def receive():
+        nonlocal requested
+        if requested:
+            # 请求体已发送完毕，客户端保持连接直到响应结束
+            await anyio.sleep_forever()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+    
+    anyio.run(app, scope, receive, send)
+    return chunks
+
+
+class TestStreamingRender:
+    """测试列表页面流式渲染"""
+    
+    @pytest.fixture
+    def streaming(self, monkeypatch):
+        import app.public
+        monkeypatch.setattr(app.public, "STREAM_PAGES", True)
+    
+    def test_iter_prompt_rows_loads_relations_per_batch(self):
+        """测试逐批迭代与列表查询结果一致，且每批只用固定次数的查询加载关联"""
+        from sqlalchemy import event
+        from app.database import engine, SessionLocal
+        from app.crud import get_prompts, iter_prompt_rows
+        
+        test_data = create_test_data()
+        category_id = test_data["category"]["id"]
+        
+        db = SessionLocal()
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        try:
+            expected, _ = get_prompts(db, category_id=category_id, include_relations=True)
+            event.listen(engine, "before_cursor_execute", count_statement)
+            try:
+                streamed = list(iter_prompt_rows(db, category_id=category_id, batch_size=2))
+            finally:
+                event.remove(engine, "before_cursor_execute", count_statement)
+            
+            assert [p.id for p in streamed] == [p.id for p in expected]
+            for prompt in streamed:
+                assert prompt.category.name == test_data["category"]["name"]
+                assert [t.name for t in prompt.tags] == [test_data["tag"]["name"]]
+            # 1次列表查询 + 2批 × (分类 + 标签)
+            assert len(statements) == 5
+        finally:
+            db.close()
+    
+    def test_streamed_page_matches_rendered_page(self, streaming, monkeypatch):
+        """测试流式渲染与整页渲染的内容一致"""
+        import app.public
+        from app.compression import minify_html
+        
+        test_data = create_test_data()
+        url = f"/tag/{test_data['tag']['name']}"
+        
+        streamed = client.get(url)
+        assert streamed.status_code == 200
+        assert streamed.headers["content-type"].startswith("text/html")
+        assert streamed.headers["etag"].startswith('W/"')
+        assert "stream-flush" not in streamed.text
+        for prompt in test_data["prompts"]:
+            assert prompt["title"] in streamed.text
+        
+        monkeypatch.setattr(app.public, "STREAM_PAGES", False)
+        rendered = client.get(url)
+        assert rendered.headers["etag"] == streamed.headers["etag"]
+        assert minify_html(streamed.text) == rendered.text
+    
+    def test_head_sent_before_cards(self, streaming):
+        """测试页头和导航先于提示词卡片发送"""
+        test_data = create_test_data()
+        
+        chunks = collect_body_chunks(f"/category/{test_data['category']['name']}")
+        assert len(chunks) > 1
+        first = chunks[0].decode("utf-8")
+        assert "</nav>" in first
+        assert "/static/css/tailwind." in first
+        assert test_data["prompts"][0]["title"] not in first
+        assert test_data["prompts"][0]["title"] in b"".join(chunks).decode("utf-8")
+    
+    def test_streamed_empty_state(self, streaming):
+        """测试页码超出范围时流式渲染显示空状态"""
+        test_data = create_test_data()
+        
+        response = client.get(f"/category/{test_data['category']['name']}?page=99")
+        assert response.status_code == 200
+        assert "此分类暂无提示词" in response.text
+        assert test_data["prompts"][0]["title"] not in response.text
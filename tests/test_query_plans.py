@@ -0,0 +1,109 @@
+"""
+查询计划回归测试
+对公开列表的每种筛选/排序组合检查 EXPLAIN QUERY PLAN，确保走预期的索引
+"""
+from sqlalchemy import func, select, text
+
+from app.main import app  # noqa: F401  导入应用时初始化数据库
+from app.crud import _filter_prompts, _order_prompts
+from app.database import engine
+from app.models import Prompt, PromptTag, Tag
+from app.projections import PROMPT_ROW_COLUMNS, TAG_ROW_COLUMNS
+
+# 排序方式 -> 无筛选时应使用的部分索引
+SORT_INDEXES = {
+    "created_at": "ix_prompts_active_created",
+    "like_count": "ix_prompts_active_likes",
+    "copy_count": "ix_prompts_active_copies",
+    "hot": "ix_prompts_active_hot",
+}
+
+
+def query_plan(statement) -> list:
+    """返回查询计划的各步骤说明"""
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def list_plan(order_by: str, **filters) -> list:
+    """公开列表页查询（只查激活的提示词，分页）的查询计划"""
+    statement = _filter_prompts(select(*PROMPT_ROW_COLUMNS), is_active=True, **filters)
+    return query_plan(_order_prompts(statement, order_by).limit(20).offset(40))
+
+
+def count_plan(**filters) -> list:
+    """公开列表页总数查询的查询计划"""
+    return query_plan(_filter_prompts(select(func.count(Prompt.id)), is_active=True, **filters))
+
+
+class TestPromptListPlans:
+    """测试提示词列表的查询计划"""
+
+    def test_unfiltered_sorts_use_partial_indexes(self):
+        """测试无筛选时每种排序都按部分索引顺序扫描，不需要临时排序"""
+        for order_by, index in SORT_INDEXES.items():
+            plan = list_plan(order_by)
+            assert plan == [f"SCAN prompts USING INDEX {index}"], order_by
+
+    def test_featured_filter(self):
+        """测试精选筛选沿用排序索引"""
+        for order_by, index in SORT_INDEXES.items():
+            plan = list_plan(order_by, is_featured=True)
+            assert plan == [f"SCAN prompts USING INDEX {index}"], order_by
+
+    def test_category_latest(self):
+        """测试分类页按时间排序由分类部分索引同时完成筛选和排序"""
+        plan = list_plan("created_at", category_id=1)
+        assert plan == ["SEARCH prompts USING INDEX ix_prompts_active_category_created (category_id=?)"]
+
+    def test_category_other_sorts_search_by_category(self):
+        """测试分类页其他排序按分类查找后排序，不扫描全表"""
+        for order_by in ("like_count", "copy_count", "hot"):
+            plan = list_plan(order_by, category_id=1)
+            assert plan[0].startswith("SEARCH prompts USING INDEX ix_prompts_"), order_by
+            assert "(category_id=?)" in plan[0], order_by
+
+    def test_tag_filter_uses_covering_index(self):
+        """测试标签页用覆盖索引查找关联，再按主键取提示词"""
+        for order_by in SORT_INDEXES:
+            plan = list_plan(order_by, tag_id=1)
+            assert plan[0] == "SEARCH prompt_tags USING COVERING INDEX ix_prompt_tags_tag_prompt (tag_id=?)", order_by
+            assert plan[1] == "SEARCH prompts USING INTEGER PRIMARY KEY (rowid=?)", order_by
+
+    def test_counts(self):
+        """测试总数查询只读索引"""
+        assert count_plan()[0].startswith("SCAN prompts USING INDEX ix_prompts_active_")
+        assert count_plan(category_id=1) == [
+            "SEARCH prompts USING INDEX ix_prompts_active_category_created (category_id=?)"
+        ]
+        assert count_plan(tag_id=1)[0] == \
+            "SEARCH prompt_tags USING COVERING INDEX ix_prompt_tags_tag_prompt (tag_id=?)"
+
+
+def test_prompt_tags_load_by_primary_key():
+    """测试按提示词加载标签直接按聚集主键查找，排序不需要临时B树"""
+    statement = (
+        select(PromptTag.prompt_id, *TAG_ROW_COLUMNS)
+        .join(Tag, Tag.id == PromptTag.tag_id)
+        .where(PromptTag.prompt_id.in_([1, 2, 3]))
+        .order_by(PromptTag.prompt_id, PromptTag.tag_id)
+    )
+    assert query_plan(statement) == [
+        "SEARCH prompt_tags USING PRIMARY KEY (prompt_id=?)",
+        "SEARCH tags USING INTEGER PRIMARY KEY (rowid=?)",
+    ]
+
+
+def test_no_redundant_indexes():
+    """测试主键和唯一约束之外没有重复的索引"""
+    with engine.connect() as conn:
+        indexes = {
+            name: table for name, table in conn.execute(text(
+                "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+            ))
+        }
+    for name in ("ix_prompts_id", "ix_prompts_created", "ix_prompts_created_at",
+                 "ix_prompt_tags_prompt", "ix_prompt_likes_prompt", "ix_categories_id", "ix_tags_id"):
+        assert name not in indexes
+    assert indexes["ix_prompts_category_id"] == "prompts"  # 外键级联删除按分类查找
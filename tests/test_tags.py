@@ -398,4 +398,89 @@ class TestTagColors:
         assert response.status_code == 201
         
         data = response.json()
-        assert data["color"] == "#3b82f6"  # 默认颜色 
\ No newline at end of file
+        assert data["color"] == "#3b82f6"  # 默认颜色
+
+
+class TestTagSparseFields:
+    """测试标签列表的稀疏字段集"""
+    
+    def find_item(self, query, item_id):
+        """逐页查找指定标签"""
+        page = 1
+        while True:
+            data = client.get(f"/admin/tags/?per_page=100&page={page}&{query}", headers=get_auth_headers()).json()
+            for item in data["items"]:
+                if item["id"] == item_id:
+                    return item
+            assert data["has_next"]
+            page += 1
+    
+    def test_fields_and_count(self):
+        """测试只返回请求的字段，计数按需统计"""
+        created = client.post("/admin/tags/", json=get_unique_tag_data(), headers=get_auth_headers()).json()
+        
+        assert self.find_item("fields=name", created["id"]) == {"id": created["id"], "name": created["name"]}
+        
+        assert self.find_item("fields=name,color&expand=usage_count", created["id"]) == {
+            "id": created["id"], "name": created["name"], "color": created["color"], "usage_count": 0
+        }
+    
+    def test_count_matches_full_listing(self):
+        """测试按需统计的计数与完整列表一致"""
+        full = client.get("/admin/tags/?per_page=100", headers=get_auth_headers()).json()["items"]
+        sparse = client.get("/admin/tags/?per_page=100&fields=id&expand=usage_count", headers=get_auth_headers()).json()["items"]
+        assert [(item["id"], item["usage_count"]) for item in sparse] == [(item["id"], item["usage_count"]) for item in full]
+    
+    def test_unknown_field(self):
+        """测试未知字段返回400"""
+        response = client.get("/admin/tags/?fields=name,secret", headers=get_auth_headers())
+        assert response.status_code == 400
+
+
+class TestTagMerge:
+    """测试标签合并"""
+    
+    def create_tag(self):
+        return client.post("/admin/tags/", json=get_unique_tag_data(), headers=get_auth_headers()).json()
+    
+    def create_prompt(self, category_id, tag_ids):
+        return client.post(
+            "/admin/prompts/",
+            json={"title": "合并测试", "content": "内容", "category_id": category_id, "tag_ids": tag_ids},
+            headers=get_auth_headers()
+        ).json()
+    
+    def prompt_tag_ids(self, prompt_id):
+        prompt = client.get(f"/admin/prompts/{prompt_id}", headers=get_auth_headers()).json()
+        return [tag["id"] for tag in prompt["tags"]]
+    
+    def test_merge_into(self):
+        """测试关联改为目标标签，已有目标标签的提示词不重复关联"""
+        import time
+        category = client.post(
+            "/admin/categories/", json={"name": f"合并分类_{int(time.time() * 1000000)}"}, headers=get_auth_headers()
+        ).json()
+        source, target = self.create_tag(), self.create_tag()
+        only_source = self.create_prompt(category["id"], [source["id"]])
+        both = self.create_prompt(category["id"], [source["id"], target["id"]])
+        
+        response = client.post(f"/admin/tags/{source['id']}/merge-into/{target['id']}", headers=get_auth_headers())
+        assert response.status_code == 200
+        assert response.json()["data"] == {"affected": 2}
+        
+        assert self.prompt_tag_ids(only_source["id"]) == [target["id"]]
+        assert self.prompt_tag_ids(both["id"]) == [target["id"]]
+        assert client.get(f"/admin/tags/{source['id']}", headers=get_auth_headers()).status_code == 404
+        target_read = client.get(f"/admin/tags/{target['id']}", headers=get_auth_headers()).json()
+        assert target_read["usage_count"] == 2
+        updated = client.get(f"/admin/prompts/{only_source['id']}", headers=get_auth_headers()).json()
+        assert updated["updated_at"] > only_source["updated_at"]
+    
+    def test_merge_errors(self):
+        """测试合并到自身、标签不存在"""
+        tag = self.create_tag()
+        url = f"/admin/tags/{tag['id']}/merge-into"
+        assert client.post(f"{url}/{tag['id']}", headers=get_auth_headers()).status_code == 400
+        assert client.post(f"{url}/999999", headers=get_auth_headers()).status_code == 400
+        assert client.post(f"/admin/tags/999999/merge-into/{tag['id']}", headers=get_auth_headers()).status_code == 404
+        assert client.post(f"{url}/999999").status_code == 401
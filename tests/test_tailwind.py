@@ -0,0 +1,110 @@
+"""
+Tailwind 样式生成测试
+测试工具类解析、变体处理以及模板用到的类全部被覆盖
+"""
+import re
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.assets import manifest
+from app.tailwind import (
+    utility_rule, build_stylesheet, generate_stylesheet, scan_classes, source_files
+)
+
+client = TestClient(app)
+
+
+class TestUtilityRules:
+    """测试单个工具类解析"""
+
+    def test_spacing(self):
+        """测试间距类按0.25rem步进"""
+        assert utility_rule("px-4") == ("", "padding-left:1rem;padding-right:1rem")
+        assert utility_rule("py-0.5") == ("", "padding-top:0.125rem;padding-bottom:0.125rem")
+        assert utility_rule("mx-auto") == ("", "margin-left:auto;margin-right:auto")
+
+    def test_colors(self):
+        """测试调色板颜色和自定义primary主题色"""
+        assert utility_rule("bg-gray-50") == ("", "background-color:#f9fafb")
+        assert utility_rule("text-white") == ("", "color:#fff")
+        assert utility_rule("text-primary-600") == ("", "color:#2563eb")
+        assert utility_rule("bg-primary-300") is None
+
+    def test_font_size_not_parsed_as_color(self):
+        """测试字号类"""
+        assert utility_rule("text-sm") == ("", "font-size:0.875rem;line-height:1.25rem")
+        assert utility_rule("text-3xl") == ("", "font-size:1.875rem;line-height:2.25rem")
+
+    def test_space_between(self):
+        """测试子元素间距选择器"""
+        suffix, declarations = utility_rule("space-x-4")
+        assert suffix == " > :not([hidden]) ~ :not([hidden])"
+        assert declarations == "margin-left:1rem"
+
+    def test_unknown_words_ignored(self):
+        """测试普通单词和未知类不生成规则"""
+        assert utility_rule("提示词") is None
+        assert utility_rule("const") is None
+        assert utility_rule("bg-unknown-500") is None
+
+
+class TestBuildStylesheet:
+    """测试样式表生成"""
+
+    def test_variants(self):
+        """测试hover/focus变体和响应式断点"""
+        css = build_stylesheet(["hover:bg-gray-50", "focus:ring-2", "md:grid-cols-3", "grid-cols-1"])
+        assert ".hover\\:bg-gray-50:hover{background-color:#f9fafb}" in css
+        assert ".focus\\:ring-2:focus{" in css
+        assert "@media (min-width:768px){\n.md\\:grid-cols-3{" in css
+        # 响应式规则在基础规则之后，保证能覆盖
+        assert css.index(".grid-cols-1{") < css.index(".md\\:grid-cols-3{")
+
+    def test_unknown_variant_ignored(self):
+        """测试不支持的变体不生成规则"""
+        css = build_stylesheet(["dark:bg-gray-900", "hover:md:lg:flex"])
+        assert "dark" not in css
+        assert "hover\\:md" not in css
+
+    def test_primary_palette_exported(self):
+        """测试primary主题色以CSS变量导出"""
+        css = build_stylesheet([])
+        assert "--color-primary-500:#3b82f6" in css
+
+    def test_templates_fully_covered(self):
+        """测试模板class属性中的每个工具类都有对应规则"""
+        css = build_stylesheet(scan_classes(source_files()))
+        for path in Path("templates").glob("*.html"):
+            for attribute in re.findall(r'class="([^"{]*)"', path.read_text(encoding="utf-8")):
+                for class_name in attribute.split():
+                    selector = "." + re.sub(r"([:.])", r"\\\1", class_name)
+                    assert selector in css, f"{path.name}: {class_name}"
+
+    def test_unchanged_stylesheet_not_rewritten(self, tmp_path):
+        """测试内容未变化时不重写文件"""
+        output = tmp_path / "tailwind.css"
+        assert generate_stylesheet(output) is True
+        assert generate_stylesheet(output) is False
+
+
+class TestServedStylesheet:
+    """测试样式表以带指纹的静态资源提供"""
+
+    def test_no_runtime_compilation(self):
+        """测试页面不再加载Tailwind CDN脚本"""
+        content = client.get("/").text
+        assert "cdn.tailwindcss.com" not in content
+        assert "tailwind.config" not in content
+
+    def test_fingerprinted_stylesheet(self):
+        """测试样式表通过带哈希的URL提供"""
+        hashed = manifest.files["css/tailwind.css"]
+        assert f"/static/{hashed}" in client.get("/").text
+
+        response = client.get(f"/static/{hashed}")
+        assert response.status_code == 200
+        assert "text/css" in response.headers["content-type"]
+        assert "immutable" in response.headers["cache-control"]
+        assert ".bg-gray-50{" in response.text
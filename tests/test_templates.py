@@ -2,6 +2,7 @@
 模板系统和静态文件功能测试
 测试Jinja2模板渲染和静态文件服务
 """
+import re
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
@@ -23,15 +24,16 @@ def test_homepage_template_rendering():
     assert "发现优质" in content
     assert "AI提示词" in content
     
-    # 检查Tailwind CSS引用
-    assert "tailwindcss.com" in content
+    # 检查Tailwind CSS引用（服务端生成的静态样式表，不再加载CDN运行时编译脚本）
+    assert "cdn.tailwindcss.com" not in content
+    assert re.search(r"/static/css/tailwind\.[0-9a-f]{10}\.css", content)
     
     # 检查Alpine.js引用
     assert "alpinejs" in content
     
-    # 检查静态文件引用
-    assert "/static/css/custom.css" in content
-    assert "/static/js/main.js" in content
+    # 检查静态文件引用（带内容哈希的URL）
+    assert re.search(r"/static/css/custom\.[0-9a-f]{10}\.css", content)
+    assert re.search(r"/static/js/main\.[0-9a-f]{10}\.js", content)
 
 def test_static_css_accessible():
     """测试CSS静态文件可访问"""
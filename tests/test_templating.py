@@ -0,0 +1,80 @@
+"""
+模板引擎测试
+测试共享环境、字节码缓存、预编译和自动重载配置
+"""
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.public import templates as public_templates
+from app.templating import (
+    templates, create_environment, precompile_templates, template_fingerprint, TEMPLATES_DIR
+)
+
+client = TestClient(app)
+
+
+def test_single_shared_environment():
+    """测试公开页面使用共享的模板环境"""
+    assert public_templates is templates
+    assert templates.env.bytecode_cache is not None
+
+
+def test_precompile_writes_bytecode_cache(tmp_path):
+    """测试预编译后字节码写入缓存目录"""
+    environment = create_environment(cache_dir=tmp_path)
+    count = precompile_templates(environment)
+
+    assert count == len(list(TEMPLATES_DIR.glob("*.html")))
+    assert len(list(tmp_path.iterdir())) == count
+
+
+def test_bytecode_cache_reused(tmp_path):
+    """测试新环境从字节码缓存加载模板而不重新编译"""
+    precompile_templates(create_environment(cache_dir=tmp_path))
+
+    environment = create_environment(cache_dir=tmp_path)
+    compiled = []
+    original_compile = environment.compile
+    environment.compile = lambda *args, **kwargs: compiled.append(args) or original_compile(*args, **kwargs)
+    precompile_templates(environment)
+
+    assert compiled == []
+
+
+def test_auto_reload_configurable(tmp_path):
+    """测试自动重载可关闭"""
+    assert create_environment(cache_dir=tmp_path, auto_reload=False).auto_reload is False
+    assert create_environment(cache_dir=tmp_path, auto_reload=True).auto_reload is True
+
+
+def test_template_fingerprint_follows_content(tmp_path):
+    """测试模板内容变化后指纹变化"""
+    (tmp_path / "page.html").write_text("<p>1</p>")
+    first = template_fingerprint(tmp_path)
+    (tmp_path / "page.html").write_text("<p>2</p>")
+    assert template_fingerprint(tmp_path) != first
+
+
+def test_pages_render_with_shared_environment():
+    """测试页面使用共享环境正常渲染"""
+    response = client.get("/")
+    assert response.status_code == 200
+    assert "提示词" in response.text
+
+
+def test_page_etag_follows_templates_when_auto_reload(monkeypatch):
+    """测试开启自动重载时模板修改后页面ETag变化，关闭时使用启动时的指纹"""
+    import app.templating
+
+    fingerprints = iter(["first", "second"])
+    monkeypatch.setattr(app.templating, "template_fingerprint", lambda: next(fingerprints))
+
+    monkeypatch.setattr(templates.env, "auto_reload", True)
+    first = client.get("/").headers["etag"]
+    second = client.get("/", headers={"If-None-Match": first})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first
+
+    monkeypatch.setattr(templates.env, "auto_reload", False)
+    etag = client.get("/").headers["etag"]
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304